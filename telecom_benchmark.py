@@ -0,0 +1,318 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from telecom_cache import AGGREGATES, DERIVED_TABLES, TABLE_CLEANERS
+from telecom_cleaning import clean_data, clean_usage, impute_data_usage, load_raw_data
+from telecom_cubes import active_mask, build_usage_daily
+from telecom_data_gen import (BILLING_COUNT, CITIES, OUTAGES_COUNT, PLAN_NAMES, PLAN_TYPES, STATUSES,
+                              SUBSCRIBERS_COUNT, TICKETS_COUNT, USAGE_COUNT, generate_all)
+from telecom_filters import build_filter_index, filter_mask, filter_positions, filter_rows, match_rows
+from telecom_polars import pl, polars_clean
+from telecom_schema import apply_schema
+from telecom_storage import TABLES, read_table
+from telecom_streaming import peak_memory_mb
+from telecom_views import (FILTER_INDEXES, daily_ticket_volume, executive_data, executive_figures, manager_data,
+                           manager_figures, selected_subscribers, usage_data, usage_figures)
+
+DEFAULT_USAGE_SIZES = [50_000, 500_000, 5_000_000]
+DEFAULT_FILTER_ROWS = 10_000_000
+DEFAULT_SCALES = [1, 10, 100]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def generate_dataset(data_dir, usage_rows, fmt='csv'):
+    """Default-sized dataset with usage_rows usage records, generated quietly"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_all(usage=usage_rows, output_dir=data_dir, fmt=fmt)
+
+
+def bench_cleaning(sizes=DEFAULT_USAGE_SIZES):
+    """Cleaning time versus usage row count, with the Polars cleaner's time
+    alongside when polars is installed
+    """
+    print(f"{'usage rows':>12} {'impute s':>10} {'clean s':>10} {'rows/s':>12}" + (f" {'polars s':>10}" if pl else ''))
+    results = []
+    for usage_rows in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate_dataset(data_dir, usage_rows)
+            frames = load_raw_data(data_dir, 'csv')
+            polars_s = timed(polars_clean, TABLES, data_dir, 'csv')[1] if pl else None
+
+        _, impute_s = timed(impute_data_usage, frames[1].copy())
+        _, clean_s = timed(clean_data, *frames)
+        results.append({'usage_rows': usage_rows, 'impute_s': impute_s, 'clean_s': clean_s, 'polars_s': polars_s})
+        print(f"{usage_rows:>12,} {impute_s:>10.3f} {clean_s:>10.3f} {usage_rows / clean_s:>12,.0f}"
+              + (f" {polars_s:>10.3f}" if pl else ''))
+    return results
+
+
+def bench_filters(rows=DEFAULT_FILTER_ROWS, repeats=5):
+    """Sidebar filter time, isin masks versus a filter index, on a synthetic
+    billing-shaped frame of the given size
+    """
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'billing_month': pd.to_datetime('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'city': pd.Categorical.from_codes(rng.integers(0, len(CITIES), rows), sorted(CITIES)),
+        'plan_type': pd.Categorical.from_codes(rng.integers(0, len(PLAN_TYPES), rows), sorted(PLAN_TYPES)),
+        'plan_name': pd.Categorical.from_codes(rng.integers(0, len(PLAN_NAMES), rows), sorted(PLAN_NAMES)),
+        'status': pd.Categorical.from_codes(rng.integers(0, len(STATUSES), rows), sorted(STATUSES)),
+    })
+    index, build_s = timed(build_filter_index, frame, ['city', 'plan_type', 'plan_name', 'status'], 'billing_month')
+    print(f"{rows:,} rows, index built in {build_s:.2f}s")
+
+    start, end = pd.Timestamp('2025-03-01'), pd.Timestamp('2025-08-31')
+    cases = {
+        'defaults': {'city': CITIES, 'plan_type': PLAN_TYPES, 'plan_name': PLAN_NAMES, 'status': STATUSES},
+        'one city': {'city': CITIES[:1], 'plan_type': PLAN_TYPES, 'plan_name': PLAN_NAMES, 'status': STATUSES},
+        'narrow': {'city': CITIES[:2], 'plan_type': PLAN_TYPES[:1], 'plan_name': PLAN_NAMES[:2], 'status': STATUSES[:1]},
+    }
+    # "match" resolves the bitmaps; "positions" also lists the matching rows
+    print(f"{'selection':>10} {'isin ms':>10} {'match ms':>10} {'positions ms':>13} {'rows':>12}")
+    results = []
+    for label, selections in cases.items():
+        def isin():
+            mask = (frame['billing_month'] >= start) & (frame['billing_month'] <= end)
+            for col, values in selections.items():
+                mask &= frame[col].isin(values)
+            return frame.index[mask]
+
+        def match():
+            return match_rows(index, start, end, **selections)
+
+        def positions():
+            return filter_positions(index, start, end, **selections)
+
+        isin_s = min(timed(isin)[1] for _ in range(repeats))
+        match_s = min(timed(match)[1] for _ in range(repeats))
+        rows_found, positions_s = min((timed(positions) for _ in range(repeats)), key=lambda result: result[1])
+        results.append({'selection': label, 'isin_ms': isin_s * 1000, 'match_ms': match_s * 1000,
+                        'positions_ms': positions_s * 1000, 'rows': len(rows_found)})
+        print(f"{label:>10} {isin_s * 1000:>10.1f} {match_s * 1000:>10.1f} {positions_s * 1000:>13.1f} {len(rows_found):>12,}")
+    return results
+
+
+# Dashboard stage benchmark: every step between the raw files and the figures
+# the browser receives, timed one by one on generated datasets at multiples of
+# the generator's default row counts. Each stage records its wall time and the
+# process's peak resident memory while it ran (Linux resets the peak between
+# stages; elsewhere the figure is the peak so far). Results go to a JSON file
+# that later runs can be compared against with --compare.
+
+
+def reset_peak_memory():
+    """Start a new peak resident memory measurement; False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def scaled_counts(scale):
+    """generate_all row counts at scale times the defaults"""
+    return {
+        'subscribers': SUBSCRIBERS_COUNT * scale,
+        'usage': USAGE_COUNT * scale,
+        'billing': BILLING_COUNT * scale,
+        'tickets': TICKETS_COUNT * scale,
+        'outages': OUTAGES_COUNT * scale,
+    }
+
+
+def stage_recorder(results, scale, repeats=1):
+    """measure(stage, fn, *args): run fn, add its wall time and peak memory
+    to results and return its value. Stages run repeats times and keep the
+    fastest time; pass repeats=1 for stages that change their inputs.
+    """
+    def measure(stage, fn, *args, repeats=repeats):
+        per_stage = reset_peak_memory()
+        started = time.perf_counter()
+        value = fn(*args)
+        seconds = time.perf_counter() - started
+        peak = peak_memory_mb()
+        for _ in range(repeats - 1):
+            seconds = min(seconds, timed(fn, *args)[1])
+        results.append({'scale': scale, 'stage': stage, 'seconds': seconds, 'peak_mb': peak,
+                        'peak_per_stage': per_stage})
+        peak_text = f"{peak:>10,.0f}" if peak is not None else f"{'-':>10}"
+        print(f"{scale:>5}x {stage:<34} {seconds:>10.4f} {peak_text}")
+        return value
+    return measure
+
+
+def bench_load(data_dir, measure):
+    """Read, clean, schema, derive and aggregate steps of a cold data load;
+    returns every dataset by name
+    """
+    raw = {name: measure(f'load/read {name}', read_table, name, data_dir, 'csv', repeats=1) for name in TABLES}
+
+    cleaned = {}
+    for name in TABLES:
+        if name == 'usage_records':
+            # the activation date check needs subscribers as cleaned, before the schema
+            clean, args = clean_usage, (raw[name], cleaned['subscribers'])
+        else:
+            clean, args = TABLE_CLEANERS[name], (raw[name],)
+        cleaned[name] = measure(f'load/clean {name}', clean, *args, repeats=1)
+
+    datasets = {name: measure(f'load/schema {name}', apply_schema, table, name, repeats=1)
+                for name, table in cleaned.items()}
+    datasets['usage_daily'] = measure('load/usage daily rollup', build_usage_daily, datasets['usage_records'],
+                                      repeats=1)
+    for name, (derive, inputs) in DERIVED_TABLES.items():
+        datasets[name] = measure(f'load/derive {name}', derive, datasets[name], *[datasets[dep] for dep in inputs],
+                                 repeats=1)
+    for name, (build, inputs) in AGGREGATES.items():
+        datasets[name] = measure(f'load/aggregate {name}', build, *[datasets[dep] for dep in inputs], repeats=1)
+    return datasets
+
+
+def render(figures):
+    """Figures serialized as Streamlit sends them to the browser"""
+    return [pio.to_json(fig, validate=False) for fig in figures.values()]
+
+
+def bench_views(datasets, measure):
+    """Sidebar filtering, then each view's aggregations, figures and
+    serialization, with the dashboard's default selections
+    """
+    subscribers, ops_cube = datasets['subscribers'], datasets['ops_cube']
+    start, end = datasets['date_range']
+    selections = {
+        'city': sorted(subscribers['city'].unique()),
+        'plan_type': ['Prepaid', 'Postpaid'],
+        'plan_name': sorted(subscribers['plan_name'].unique()),
+        'status': ['Active', 'Suspended', 'Churned'],
+    }
+    ticket_categories = sorted(ops_cube['ticket_category'].unique())
+
+    indexes = {}
+    for name, (dataset, columns, date_column) in FILTER_INDEXES.items():
+        indexes[name] = measure(f'filter/index {name}', build_filter_index, datasets[dataset], columns, date_column,
+                                repeats=1)
+
+    def filter_subscribers():
+        initial = filter_mask(indexes['subscribers'], **selections)
+        active = initial & active_mask(datasets['activity_index'], start, end)
+        return selected_subscribers(subscribers, initial, active)
+
+    filtered_subs = measure('filter/subscribers', filter_subscribers)
+    filtered_revenue = measure('filter/revenue', lambda: filter_rows(indexes['revenue'], start, end, **selections))
+    filtered_ops = measure('filter/ops', lambda: filter_rows(
+        indexes['ops'], start, end, city=selections['city'], plan_type=selections['plan_type'],
+        ticket_category=ticket_categories
+    ))
+    filtered_outages = measure('filter/outages', lambda: filter_rows(
+        indexes['outages'], start, end, city=selections['city']
+    ))
+    filtered_usage = measure('filter/usage', lambda: filter_rows(indexes['usage'], start, end, **selections))
+
+    data = measure('executive/data', executive_data, filtered_revenue, filtered_subs)
+    figures = measure('executive/figures', executive_figures, data)
+    measure('executive/render', render, figures)
+
+    data = measure('manager/data', manager_data, filtered_ops, filtered_outages, filtered_subs)
+    daily_tickets = measure('manager/daily tickets', daily_ticket_volume, filtered_ops)
+    figures = measure('manager/figures', manager_figures, data, daily_tickets)
+    measure('manager/render', render, figures)
+
+    data = measure('usage/data', usage_data, filtered_usage)
+    figures = measure('usage/figures', usage_figures, data)
+    measure('usage/render', render, figures)
+
+
+def bench_stages(scales=DEFAULT_SCALES, output='benchmark_results.json', repeats=3):
+    """Time every dashboard stage at each dataset scale and write the results
+    to output as JSON
+    """
+    print(f"{'scale':>6} {'stage':<34} {'seconds':>10} {'peak MB':>10}")
+    results, datasets = [], {}
+    for scale in scales:
+        counts = scaled_counts(scale)
+        with tempfile.TemporaryDirectory() as data_dir:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = generate_all(output_dir=data_dir, **counts)
+            print(f"{scale:>5}x generated {rows['usage_records']:,} usage rows in {time.perf_counter() - started:.1f}s")
+            datasets[scale] = rows
+
+            measure = stage_recorder(results, scale, repeats)
+            bench_views(bench_load(data_dir, measure), measure)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'datasets': {str(scale): rows for scale, rows in datasets.items()},
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {output}")
+    return report
+
+
+def compare_stages(report, baseline, tolerance=0.2):
+    """Print each stage's time against the same stage and scale in a baseline
+    report; returns the stages more than tolerance slower
+    """
+    before = {(row['scale'], row['stage']): row for row in baseline['results']}
+    print(f"{'scale':>6} {'stage':<34} {'before s':>10} {'after s':>10} {'ratio':>7}")
+    slower = []
+    for row in report['results']:
+        old = before.get((row['scale'], row['stage']))
+        if old is None:
+            continue
+        ratio = row['seconds'] / old['seconds'] if old['seconds'] > 0 else float('inf')
+        flag = ' slower' if ratio > 1 + tolerance else ''
+        print(f"{row['scale']:>5}x {row['stage']:<34} {old['seconds']:>10.4f} {row['seconds']:>10.4f} {ratio:>6.2f}x{flag}")
+        if flag:
+            slower.append(f"{row['scale']}x {row['stage']}")
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard pipeline benchmarks")
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+    cleaning = sub.add_parser('cleaning', help="Cleaning time versus usage row count")
+    cleaning.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_USAGE_SIZES)
+    filters = sub.add_parser('filters', help="Sidebar filter time, isin versus filter index")
+    filters.add_argument('--rows', type=int, default=DEFAULT_FILTER_ROWS)
+    stages = sub.add_parser('stages', help="Load, filter, aggregation and figure time per dashboard stage")
+    stages.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="Dataset sizes as multiples of the generator defaults")
+    stages.add_argument('--output', default='benchmark_results.json', help="JSON results file to write")
+    stages.add_argument('--repeats', type=int, default=3, help="Runs per filter and view stage, fastest kept")
+    stages.add_argument('--compare', help="Earlier results file to compare against")
+    stages.add_argument('--tolerance', type=float, default=0.2, help="Slowdown ratio above 1 reported as slower")
+    args = parser.parse_args()
+
+    if args.benchmark == 'cleaning':
+        bench_cleaning(args.sizes)
+    elif args.benchmark == 'filters':
+        bench_filters(args.rows)
+    elif args.benchmark == 'stages':
+        report = bench_stages(args.scales, args.output, args.repeats)
+        if args.compare:
+            with open(args.compare) as f:
+                slower = compare_stages(report, json.load(f), args.tolerance)
+            print(f"{len(slower)} stage(s) slower than the baseline" if slower else "No stage slower than the baseline")
@@ -0,0 +1,345 @@
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+import pandas as pd
+from datetime import date
+
+from telecom_cleaning import (CLEANING_VERSION, add_tenure, clean_billing, clean_outages, clean_subscribers,
+                              clean_tickets, clean_usage)
+from telecom_config import (CLEANED_CACHE, CLEANED_CACHE_DIR, CLEANING_MODE, DATA_DIR, LOAD_RAW_USAGE,
+                            STORAGE_FORMAT)
+from telecom_cubes import (CUBE_VERSION, build_activity_index, build_date_range, build_ops_cube, build_revenue_cube,
+                           build_usage_cube, build_usage_daily)
+from telecom_model import denormalize_billing, denormalize_tickets, denormalize_usage
+from telecom_polars import polars_clean
+from telecom_schema import TABLE_NAMES, apply_schema
+from telecom_storage import TABLES, append_paths, part_paths, read_table, resolve_format, table_path
+from telecom_streaming import stream_clean
+from telecom_tiers import classify_tiers, rules_version
+from telecom_trace import row_count, span
+
+
+def source_files(data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Files each dataset would be loaded from"""
+    files = []
+    for name in TABLES:
+        table_fmt = resolve_format(name, data_dir, fmt)
+        path = table_path(name, data_dir, table_fmt)
+        files.extend([path] if os.path.exists(path) else part_paths(name, data_dir, table_fmt))
+        files.extend(append_paths(name, data_dir, table_fmt))
+    return files
+
+
+def source_fingerprint(data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Cache key from source file size/mtime plus the cleaning logic version.
+
+    The pandas version is included because the cache is a pickle.
+    """
+    digest = hashlib.sha256(f'v{CLEANING_VERSION}|pandas {pd.__version__}'.encode())
+    for path in source_files(data_dir, fmt):
+        stat = os.stat(path)
+        digest.update(f'|{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def load_cleaned(data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR, use_cache=CLEANED_CACHE,
+                 mode=CLEANING_MODE, with_usage=LOAD_RAW_USAGE):
+    """Cleaned subscribers, usage, billing, tickets and outages in the compact
+    in-memory schema (see telecom_schema.py), with the derived columns added.
+
+    Served from cache_dir when a cache entry for the current sources and
+    cleaning version exists; otherwise the raw files are cleaned and the result
+    is persisted, replacing older entries. Without with_usage, usage is None
+    and the raw usage table is never read.
+    """
+    names = [name for name in TABLE_NAMES if with_usage or name != 'usage_records']
+    datasets = load_datasets(names, data_dir, fmt, cache_dir, use_cache, mode)
+    return tuple(datasets.get(name) for name in TABLE_NAMES)
+
+
+def load_usage_daily(data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR, use_cache=CLEANED_CACHE,
+                     mode=CLEANING_MODE):
+    """Daily subscriber-level usage rollup (see telecom_cubes.py), built
+    alongside the cleaned tables
+    """
+    return cleaned_tables(['usage_daily'], data_dir, fmt, cache_dir, use_cache, mode)['usage_daily']
+
+
+# Everything above the cleaned-data cache is loaded per dataset, on first use:
+# a cleaned table with its post-cache step applied, or an aggregate. Each
+# declares the datasets it is built from, so a caller pays only for what it
+# asks for.
+
+
+def derive_subscribers(subscribers):
+    """Subscribers with tenure and service tier added"""
+    subscribers = add_tenure(subscribers)
+    with span('tiers', dataset='subscribers', rows=len(subscribers)):
+        subscribers['service_tier'] = classify_tiers(subscribers)
+    return subscribers
+
+
+# Post-cache steps for cleaned tables and their inputs. These run after the
+# cache because tenure depends on today's date and tiers on the editable
+# rules table; billing and tickets then carry subscriber attributes (see
+# telecom_model.py).
+DERIVED_TABLES = {
+    'subscribers': (derive_subscribers, []),
+    'billing': (denormalize_billing, ['subscribers']),
+    'tickets': (denormalize_tickets, ['subscribers']),
+}
+
+
+def usage_cube(usage_daily, subscribers):
+    return build_usage_cube(denormalize_usage(usage_daily, subscribers))
+
+
+# Aggregates (see telecom_cubes.py), persisted next to the cleaned tables, and
+# the datasets they are built from
+AGGREGATES = {
+    'revenue_cube': (build_revenue_cube, ['billing']),
+    'ops_cube': (build_ops_cube, ['tickets']),
+    'activity_index': (build_activity_index, ['subscribers', 'billing', 'tickets']),
+    'usage_cube': (usage_cube, ['usage_daily', 'subscribers']),
+    'date_range': (build_date_range, ['billing', 'tickets']),
+}
+
+
+def load_dataset(name, load, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+                 use_cache=CLEANED_CACHE, mode=CLEANING_MODE):
+    """One cleaned table or aggregate by name, fetching the datasets it depends
+    on with load(name), so callers with their own cache (the dashboard) can
+    route dependencies through it
+    """
+    if name in AGGREGATES:
+        build, inputs = AGGREGATES[name]
+        path = aggregate_path(cache_dir, name, source_fingerprint(data_dir, fmt))
+        if use_cache and os.path.exists(path):
+            with span('aggregate', dataset=name, cache='hit') as record:
+                aggregate = pd.read_pickle(path)
+                record['rows'] = row_count(aggregate)
+            return aggregate
+        deps = [load(dep) for dep in inputs]
+        with span('aggregate', dataset=name, cache='miss') as record:
+            aggregate = build(*deps)
+            record['rows'] = row_count(aggregate)
+        if use_cache:
+            save_entry(aggregate, path)
+        return aggregate
+
+    table = cleaned_tables([name], data_dir, fmt, cache_dir, use_cache, mode)[name]
+    if name in DERIVED_TABLES:
+        derive, inputs = DERIVED_TABLES[name]
+        deps = [load(dep) for dep in inputs]
+        with span('derive', dataset=name, rows=len(table)):
+            table = derive(table, *deps)
+    return table
+
+
+def load_datasets(names, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+                  use_cache=CLEANED_CACHE, mode=CLEANING_MODE):
+    """The named datasets by name, loading each dependency once"""
+    loaded = {}
+
+    def load(name):
+        if name not in loaded:
+            loaded[name] = load_dataset(name, load, data_dir, fmt, cache_dir, use_cache, mode)
+        return loaded[name]
+
+    return {name: load(name) for name in names}
+
+
+# A cleaned-data cache entry is a directory, cleaned-<source key>/, holding each
+# cleaned table and the daily usage rollup. In 'memory' and 'polars' mode it
+# fills up one <table>.pkl at a time as tables are first asked for; in 'stream' mode
+# telecom_streaming.py writes every table at once as <table>/part-*.parquet.
+ENTRY_TABLES = TABLE_NAMES + ['usage_daily']
+
+# Per-table cleaning rules (see telecom_cleaning.py)
+TABLE_CLEANERS = {
+    'subscribers': clean_subscribers,
+    'billing': clean_billing,
+    'tickets': clean_tickets,
+    'network_outages': clean_outages,
+}
+
+
+def entry_dir(cache_dir, key):
+    return os.path.join(cache_dir, f'cleaned-{key}')
+
+
+def clean_table(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, mode=CLEANING_MODE):
+    """One ENTRY_TABLES frame cleaned in memory, in the compact schema, with
+    pandas or, in 'polars' mode, with telecom_polars.py
+    """
+    if name == 'usage_daily':
+        usage = clean_table('usage_records', data_dir, fmt, mode)
+        with span('rollup', dataset=name, rows=len(usage)):
+            return build_usage_daily(usage)
+    if mode == 'polars':
+        with span('clean', dataset=name, mode=mode) as record:
+            cleaned = polars_clean([name], data_dir, fmt)[name]
+            record['rows'] = len(cleaned)
+        return apply_schema(cleaned, name)
+    with span('read', dataset=name) as record:
+        raw = read_table(name, data_dir, fmt)
+        record['rows'] = len(raw)
+    with span('clean', dataset=name) as record:
+        if name == 'usage_records':
+            # the activation date check needs subscribers as cleaned, before the schema
+            cleaned = clean_usage(raw, clean_subscribers(read_table('subscribers', data_dir, fmt)))
+        else:
+            cleaned = TABLE_CLEANERS[name](raw)
+        record['rows'] = len(cleaned)
+    with span('schema', dataset=name, rows=len(cleaned)):
+        return apply_schema(cleaned, name)
+
+
+def entry_holds(path, name):
+    """Whether the entry at path has the table yet, in either layout"""
+    return os.path.exists(os.path.join(path, f'{name}.pkl')) or bool(part_paths(name, path, 'parquet'))
+
+
+def read_entry_table(path, name):
+    pickled = os.path.join(path, f'{name}.pkl')
+    if os.path.exists(pickled):
+        return pd.read_pickle(pickled)
+    return apply_schema(read_table(name, path, 'parquet'), name)
+
+
+def entry_table(path, name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, mode=CLEANING_MODE):
+    """An ENTRY_TABLES frame from the memory-mode entry at path, cleaned and
+    added to it on first use
+    """
+    if os.path.exists(os.path.join(path, f'{name}.pkl')):
+        with span('cleaned table', dataset=name, cache='hit') as record:
+            table = read_entry_table(path, name)
+            record['rows'] = len(table)
+        return table
+    with span('cleaned table', dataset=name, cache='miss') as record:
+        if name == 'usage_daily':
+            usage = entry_table(path, 'usage_records', data_dir, fmt, mode)
+            with span('rollup', dataset=name, rows=len(usage)):
+                table = build_usage_daily(usage)
+        else:
+            table = clean_table(name, data_dir, fmt, mode)
+        save_table(table, path, name)
+        record['rows'] = len(table)
+    return table
+
+
+def cleaned_tables(names, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+                   use_cache=CLEANED_CACHE, mode=CLEANING_MODE):
+    """The named ENTRY_TABLES frames, from the cache entry for the current
+    sources, building what is missing first
+    """
+    if mode == 'stream':
+        if not use_cache:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                stream_clean(data_dir, os.path.join(tmp_dir, 'cleaned'), fmt)
+                return {name: read_entry_table(os.path.join(tmp_dir, 'cleaned'), name) for name in names}
+        path = entry_dir(cache_dir, source_fingerprint(data_dir, fmt))
+        # a memory- or polars-mode entry for the same sources fills up lazily, so
+        # it only serves here once it holds every table
+        cache = 'hit' if all(entry_holds(path, name) for name in ENTRY_TABLES) else 'miss'
+        if cache == 'miss':
+            os.makedirs(cache_dir, exist_ok=True)
+            with span('stream clean'):
+                stream_clean(data_dir, path, fmt)
+            prune_entries(path)
+        tables = {}
+        for name in names:
+            with span('cleaned table', dataset=name, cache=cache) as record:
+                tables[name] = read_entry_table(path, name)
+                record['rows'] = len(tables[name])
+        return tables
+
+    if not use_cache:
+        return {name: clean_table(name, data_dir, fmt, mode) for name in names}
+    path = entry_dir(cache_dir, source_fingerprint(data_dir, fmt))
+    return {name: entry_table(path, name, data_dir, fmt, mode) for name in names}
+
+
+def save_table(table, path, name):
+    """Atomically pickle one table into the entry at path, removing other
+    entries when path is new
+    """
+    try:
+        if not os.path.isdir(path):
+            os.makedirs(path)
+            prune_entries(path)
+        target = os.path.join(path, f'{name}.pkl')
+        tmp_path = f'{target}.{os.getpid()}.tmp'
+        pd.to_pickle(table, tmp_path)
+        os.replace(tmp_path, target)
+    except OSError:
+        # A read-only or shared cache dir only costs us the speed-up
+        pass
+
+
+def write_entry(tables, path, link_from=None):
+    """Pickle tables into a new cache entry at path; other tables present in
+    the entry at link_from are hard-linked (or copied) from it
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ENTRY_TABLES:
+            target = os.path.join(tmp_path, f'{name}.pkl')
+            source = os.path.join(link_from or '', f'{name}.pkl')
+            if name in tables:
+                pd.to_pickle(tables[name], target)
+                continue
+            if not os.path.exists(source):
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        prune_entries(path)
+    except OSError:
+        # A read-only or shared cache dir only costs us the speed-up
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def prune_entries(path):
+    """Remove cleaned-data cache entries other than path"""
+    for stale in glob.glob(os.path.join(os.path.dirname(path), 'cleaned-*')):
+        if stale == path or stale.endswith('.tmp'):
+            continue
+        if os.path.isdir(stale):
+            shutil.rmtree(stale, ignore_errors=True)
+        else:
+            os.remove(stale)
+
+
+def save_entry(obj, path):
+    """Atomically pickle obj to path, removing older entries of the same kind"""
+    cache_dir = os.path.dirname(path)
+    kind = os.path.basename(path).split('-')[0]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        pd.to_pickle(obj, tmp_path)
+        os.replace(tmp_path, path)
+        for stale in glob.glob(os.path.join(cache_dir, f'{kind}-*.pkl')):
+            if stale != path:
+                os.remove(stale)
+    except OSError:
+        # A read-only or shared cache dir only costs us the speed-up
+        pass
+
+
+def aggregate_path(cache_dir, name, source_key, today=None):
+    """Aggregates depend on the sources, the cube logic, the tier rules and
+    (through tenure) the date
+    """
+    today = today or date.today()
+    key = f'{source_key}|cubes v{CUBE_VERSION}|{rules_version()}|{today.isoformat()}'
+    key = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f'{name}-{key}.pkl')
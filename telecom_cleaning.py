@@ -0,0 +1,143 @@
+import pandas as pd
+from datetime import datetime
+
+from telecom_config import DATA_DIR, STORAGE_FORMAT
+from telecom_storage import read_table
+
+# Bump whenever the cleaning rules below change so persisted caches are rebuilt
+CLEANING_VERSION = 2
+
+
+def load_raw_data(data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Load all five datasets as stored"""
+    subscribers = read_table('subscribers', data_dir, fmt)
+    usage = read_table('usage_records', data_dir, fmt)
+    billing = read_table('billing', data_dir, fmt)
+    tickets = read_table('tickets', data_dir, fmt)
+    outages = read_table('network_outages', data_dir, fmt)
+    return subscribers, usage, billing, tickets, outages
+
+
+def data_usage_stats(usage):
+    """Per-subscriber sum and count of known data_usage_gb.
+
+    Stats from several chunks combine with `a.add(b, fill_value=0)`.
+    """
+    return usage.groupby('subscriber_id')['data_usage_gb'].agg(['sum', 'count'])
+
+
+def impute_data_usage(usage, stats=None):
+    """Fill missing data_usage_gb with the subscriber's average, or 0.
+
+    Without stats the averages come from `usage` itself. Pass stats from
+    data_usage_stats over the whole dataset to impute one chunk at a time.
+    """
+    if stats is None:
+        subscriber_avg = usage.groupby('subscriber_id')['data_usage_gb'].transform('mean')
+    else:
+        subscriber_avg = usage['subscriber_id'].map(stats['sum'] / stats['count'].where(stats['count'] > 0))
+    usage['data_usage_gb'] = usage['data_usage_gb'].fillna(subscriber_avg).fillna(0)
+    return usage
+
+
+def clean_subscribers(subscribers):
+    """Dedup, label standardization and date parsing for subscribers"""
+    # 1. Remove duplicates
+    subscribers = subscribers.drop_duplicates(subset='subscriber_id', keep='first')
+
+    # 2. Standardize labels
+    subscribers['plan_type'] = subscribers['plan_type'].str.strip().str.lower().str.replace('-', '').str.capitalize()
+    subscribers.loc[subscribers['plan_type'].str.contains('pre', case=False, na=False), 'plan_type'] = 'Prepaid'
+    subscribers.loc[subscribers['plan_type'].str.contains('post', case=False, na=False), 'plan_type'] = 'Postpaid'
+
+    subscribers['city'] = subscribers['city'].str.replace('-', ' ').str.replace('AbuDhabi', 'Abu Dhabi')
+    subscribers.loc[subscribers['city'] == 'AD', 'city'] = 'Abu Dhabi'
+
+    subscribers['activation_date'] = pd.to_datetime(subscribers['activation_date'], errors='coerce')
+    return subscribers
+
+
+def clean_usage(usage, subscribers, stats=None):
+    """Imputation, outlier caps and activation date checks for usage records.
+
+    subscribers must already be cleaned; stats is passed on to impute_data_usage.
+    """
+    # 3. Impute missing data_usage_gb
+    usage = impute_data_usage(usage, stats)
+
+    # 4. Cap outliers
+    usage.loc[usage['data_usage_gb'] > 100, 'data_usage_gb'] = 100
+
+    # 5. Remove impossible date sequences
+    usage['usage_date'] = pd.to_datetime(usage['usage_date'], errors='coerce')
+    usage = usage.merge(subscribers[['subscriber_id', 'activation_date']], on='subscriber_id', how='left')
+    usage = usage[usage['usage_date'] >= usage['activation_date']]
+    return usage.drop('activation_date', axis=1)
+
+
+def clean_billing(billing):
+    """Dedup, outlier caps and negative bill removal for billing"""
+    # 1. Remove duplicates
+    billing = billing.drop_duplicates(subset='bill_id', keep='first')
+
+    # 4. Cap outliers
+    billing.loc[billing['bill_amount'] > 2000, 'bill_amount'] = 2000
+
+    # 6. Remove negative bills
+    billing = billing[billing['bill_amount'] >= 0]
+
+    billing['billing_month'] = pd.to_datetime(billing['billing_month'])
+    billing['payment_date'] = pd.to_datetime(billing['payment_date'], errors='coerce')
+    return billing
+
+
+def clean_tickets(tickets):
+    """Dedup, status standardization and date checks for tickets"""
+    # 1. Remove duplicates
+    tickets = tickets.drop_duplicates(subset='ticket_id', keep='first')
+
+    # 2. Standardize labels
+    tickets['status'] = tickets['status'].str.strip().str.capitalize()
+    tickets.loc[tickets['status'] == 'Closed', 'status'] = 'Resolved'
+
+    # 5. Remove impossible date sequences
+    tickets['ticket_date'] = pd.to_datetime(tickets['ticket_date'])
+    tickets['resolution_date'] = pd.to_datetime(tickets['resolution_date'], errors='coerce')
+    tickets.loc[tickets['resolution_date'] < tickets['ticket_date'], 'resolution_date'] = pd.NaT
+    return tickets
+
+
+def clean_outages(outages):
+    """Missing duration calculation and date parsing for outages"""
+    # 7. Calculate missing outage durations
+    outages['outage_start_time'] = pd.to_datetime(outages['outage_start_time'], errors='coerce')
+    outages['outage_end_time'] = pd.to_datetime(outages['outage_end_time'], errors='coerce')
+    missing_duration = outages['outage_duration_mins'].isna()
+    outages.loc[missing_duration, 'outage_duration_mins'] = (
+        (outages.loc[missing_duration, 'outage_end_time'] -
+         outages.loc[missing_duration, 'outage_start_time']).dt.total_seconds() / 60
+    )
+
+    outages['outage_date'] = pd.to_datetime(outages['outage_date'], errors='coerce')
+    return outages
+
+
+def clean_data(subscribers, usage, billing, tickets, outages):
+    """Apply the cleaning steps to the raw datasets.
+
+    Each table is cleaned on its own, so the same rules also run on appended
+    batches (see telecom_ingest.py); step numbers follow the README.
+    """
+    subscribers = clean_subscribers(subscribers)
+    usage = clean_usage(usage, subscribers)
+    billing = clean_billing(billing)
+    tickets = clean_tickets(tickets)
+    outages = clean_outages(outages)
+    return subscribers, usage, billing, tickets, outages
+
+
+def add_tenure(subscribers, now=None):
+    """Calculate subscriber tenure relative to now"""
+    now = now or datetime.now()
+    subscribers['tenure_years'] = (now - subscribers['activation_date']).dt.days / 365.25
+    return subscribers
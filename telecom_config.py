@@ -0,0 +1,68 @@
+import os
+
+# Dashboard and pipeline settings. Each can be overridden with the matching
+# TELECOM_* environment variable, e.g. TELECOM_STORAGE_FORMAT=parquet.
+
+# Directory holding the five datasets
+DATA_DIR = os.environ.get('TELECOM_DATA_DIR', '.')
+
+# Dataset file format: 'parquet', 'csv', or 'auto' (Parquet when the files
+# exist and pyarrow is installed, otherwise CSV)
+STORAGE_FORMAT = os.environ.get('TELECOM_STORAGE_FORMAT', 'auto')
+
+# Persisted cache of the cleaned datasets, keyed by source files and
+# telecom_cleaning.CLEANING_VERSION. Set TELECOM_CLEANED_CACHE=0 to disable.
+CLEANED_CACHE = os.environ.get('TELECOM_CLEANED_CACHE', '1') != '0'
+CLEANED_CACHE_DIR = os.environ.get('TELECOM_CLEANED_CACHE_DIR', os.path.join(DATA_DIR, '.telecom_cache'))
+
+# Load the cleaned raw usage table. The dashboard only needs the daily usage
+# rollup, so TELECOM_LOAD_RAW_USAGE=0 skips reading usage rows from the cache.
+LOAD_RAW_USAGE = os.environ.get('TELECOM_LOAD_RAW_USAGE', '1') != '0'
+
+# How load_cleaned cleans the raw datasets: 'memory' (whole tables at once),
+# 'stream' (fixed-size chunks into partitioned Parquet, see telecom_streaming.py)
+# or 'polars' (whole tables as multi-threaded Polars queries, see
+# telecom_polars.py; needs the polars package)
+CLEANING_MODE = os.environ.get('TELECOM_CLEANING_MODE', 'memory')
+STREAM_CHUNK_ROWS = int(os.environ.get('TELECOM_STREAM_CHUNK_ROWS', 1_000_000))
+
+# Engine for the Executive and Manager View aggregates: 'pandas' (precomputed
+# cubes) or 'duckdb' (SQL over Parquet copies of the cleaned tables, see
+# telecom_duckdb.py; needs the duckdb package). The DuckDB engine reads the
+# local cleaned tables, so it cannot be used with TELECOM_DATA_PLANE.
+QUERY_ENGINE = os.environ.get('TELECOM_QUERY_ENGINE', 'pandas')
+
+# Tickets raised in an outage's city and zone from the day it started until
+# this many hours after it ended are attributed to it (see telecom_outages.py)
+OUTAGE_TICKET_WINDOW_HOURS = float(os.environ.get('TELECOM_OUTAGE_WINDOW_HOURS', 24))
+
+# Memory budget (MB) for per-view results cached by sidebar filter selection,
+# shared by all sessions (see telecom_results.py). 0 disables the cache.
+RESULT_CACHE_MB = float(os.environ.get('TELECOM_RESULT_CACHE_MB', 256))
+
+# Most points a line chart sends to the browser; longer series are reduced with
+# Largest-Triangle-Three-Buckets downsampling (see telecom_views.py)
+CHART_POINT_BUDGET = int(os.environ.get('TELECOM_CHART_POINTS', 2000))
+
+# Per-stage timing, memory and cache instrumentation (see telecom_trace.py):
+# TELECOM_TRACE=1 shows a debug panel in the sidebar and logs one JSON line per
+# span to stderr, or to the file named by TELECOM_TRACE_LOG
+TRACE = os.environ.get('TELECOM_TRACE', '0') != '0'
+TRACE_LOG = os.environ.get('TELECOM_TRACE_LOG', '')
+
+# Shared data plane for several dashboard processes (see telecom_plane.py):
+# with TELECOM_DATA_PLANE=1 the dashboard memory-maps the Arrow files published
+# by `python telecom_plane.py publish` instead of loading its own copy
+DATA_PLANE = os.environ.get('TELECOM_DATA_PLANE', '0') != '0'
+DATA_PLANE_DIR = os.environ.get(
+    'TELECOM_DATA_PLANE_DIR', '/dev/shm/telecom_plane' if os.path.isdir('/dev/shm') else os.path.join(CLEANED_CACHE_DIR, 'plane')
+)
+
+# Drop directory for new record batches: <dir>/<dataset>/*.csv or *.parquet,
+# picked up by telecom_ingest.py
+INCOMING_DIR = os.environ.get('TELECOM_INCOMING_DIR', os.path.join(DATA_DIR, 'incoming'))
+
+# Service tier rules table (see tier_rules.csv)
+TIER_RULES_PATH = os.environ.get(
+    'TELECOM_TIER_RULES', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tier_rules.csv')
+)
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+from telecom_schema import append_rows
+
+# Pre-aggregated views of the fact tables, built once per data load, so the
+# dashboard answers each filter change from a few thousand cells instead of
+# scanning row-level data.
+
+# Bump whenever the cube keys, measures or activity index layout below change
+# so persisted aggregates are rebuilt
+CUBE_VERSION = 1
+
+# Executive View revenue cube: one row per billing month and subscriber slice.
+# The month key is the billing_month value itself, so the sidebar date range
+# selects exactly the cells whose bills it would select.
+REVENUE_KEYS = ['billing_month', 'city', 'plan_type', 'plan_name', 'status', 'payment_status']
+
+
+def build_revenue_cube(billing):
+    """Bill amount, credit adjustment and bill count summed per REVENUE_KEYS cell.
+
+    billing must carry its subscriber's attributes (see telecom_model.py); bills
+    without a known subscriber never pass the sidebar filters and are dropped.
+    """
+    cube = billing.groupby(REVENUE_KEYS, observed=True, sort=True).agg(
+        bill_amount=('bill_amount', 'sum'),
+        credit_adjustment=('credit_adjustment', 'sum'),
+        bill_count=('bill_amount', 'size'),
+    ).reset_index()
+    return add_month(cube)
+
+
+def add_month(cube):
+    cube['month'] = cube['billing_month'].dt.to_period('M').astype(str).astype('category')
+    return cube
+
+
+def merge_cells(cube, delta, keys):
+    """Cells of two cubes with the same keys, summed where they overlap"""
+    return append_rows(cube, delta).groupby(keys, observed=True, dropna=False, sort=True).sum().reset_index()
+
+
+def extend_revenue_cube(cube, billing):
+    """Revenue cube with newly arrived bills added"""
+    delta = build_revenue_cube(billing)
+    return add_month(merge_cells(cube.drop(columns='month'), delta.drop(columns='month'), REVENUE_KEYS))
+
+
+def slice_revenue(cube, start, end, cities, plan_types, plan_names, statuses):
+    """Cube cells matching the sidebar filters"""
+    return cube[
+        (cube['billing_month'] >= start) &
+        (cube['billing_month'] <= end) &
+        (cube['city'].isin(cities)) &
+        (cube['plan_type'].isin(plan_types)) &
+        (cube['plan_name'].isin(plan_names)) &
+        (cube['status'].isin(statuses))
+    ]
+
+
+# Manager View operations cube: one row per ticket date and ticket slice.
+# plan_type is a key too because the sidebar filters tickets on it.
+OPS_KEYS = ['ticket_date', 'zone', 'city', 'plan_type', 'ticket_channel', 'ticket_category', 'service_tier', 'status']
+BACKLOG_STATUSES = ['Open', 'In Progress', 'Escalated']
+
+
+def build_ops_cube(tickets):
+    """Ticket counts, SLA met/breached counts and resolution-hour sums per
+    OPS_KEYS cell.
+
+    Missing keys (e.g. a subscriber without a tier) stay as their own cells so
+    totals still count those tickets. All measures are sums, so cubes built
+    from separate batches of tickets add up cell by cell.
+    """
+    hours = (tickets['resolution_date'] - tickets['ticket_date']).dt.total_seconds() / 3600
+    facts = tickets[OPS_KEYS].assign(
+        tickets=1,
+        sla_met=(hours <= tickets['sla_target_hours']).astype(np.int64),
+        sla_breached=(hours > tickets['sla_target_hours']).astype(np.int64),
+        resolution_hours=hours.fillna(0),
+        timed_tickets=hours.notna().astype(np.int64),
+    )
+    return facts.groupby(OPS_KEYS, observed=True, dropna=False, sort=True).sum().reset_index()
+
+
+def extend_ops_cube(cube, tickets):
+    """Ops cube with newly arrived tickets added"""
+    return merge_cells(cube, build_ops_cube(tickets), OPS_KEYS)
+
+
+def slice_ops(cube, start, end, cities, plan_types, ticket_cats):
+    """Cube cells matching the sidebar ticket filters"""
+    return cube[
+        (cube['city'].isin(cities)) &
+        (cube['plan_type'].isin(plan_types)) &
+        (cube['ticket_category'].isin(ticket_cats)) &
+        (cube['ticket_date'] >= start) &
+        (cube['ticket_date'] <= end)
+    ]
+
+
+# Daily subscriber-level usage rollup, built when usage is cleaned (and from
+# each ingested batch), so nothing downstream reads raw usage rows.
+USAGE_MEASURES = ['data_usage_gb', 'voice_minutes', 'sms_count', 'roaming_charges', 'addon_charges']
+USAGE_DAILY_KEYS = ['usage_date', 'subscriber_id']
+
+# Usage View cube over the rollup, with the subscriber's plan and location
+USAGE_KEYS = ['usage_date', 'city', 'zone', 'plan_type', 'plan_name', 'status']
+
+
+def build_usage_daily(usage):
+    """Usage measures and record count summed per subscriber and day"""
+    facts = usage[USAGE_DAILY_KEYS + USAGE_MEASURES].assign(records=1)
+    return facts.groupby(USAGE_DAILY_KEYS, sort=True).sum().reset_index()
+
+
+def extend_usage_daily(usage_daily, usage):
+    """Daily usage rollup with newly arrived usage records added"""
+    return merge_cells(usage_daily, build_usage_daily(usage), USAGE_DAILY_KEYS)
+
+
+def build_usage_cube(usage_daily, new_days=None):
+    """Usage measures, records and subscriber-days summed per USAGE_KEYS cell.
+
+    usage_daily must carry its subscriber's attributes (see telecom_model.py).
+    new_days marks which rollup rows are subscriber-days not counted before
+    (all of them by default).
+    """
+    subscriber_days = 1 if new_days is None else np.asarray(new_days, dtype=np.int64)
+    facts = usage_daily[USAGE_KEYS + USAGE_MEASURES + ['records']].assign(subscriber_days=subscriber_days)
+    return facts.groupby(USAGE_KEYS, observed=True, sort=True).sum().reset_index()
+
+
+def extend_usage_cube(cube, usage_daily, delta_daily):
+    """Usage cube with newly arrived usage added.
+
+    delta_daily is the rollup of the new records alone and usage_daily the
+    rollup before they arrived; subscriber-days already in usage_daily are
+    not counted again.
+    """
+    known = pd.MultiIndex.from_frame(usage_daily[USAGE_DAILY_KEYS])
+    new_days = ~pd.MultiIndex.from_frame(delta_daily[USAGE_DAILY_KEYS]).isin(known)
+    return merge_cells(cube, build_usage_cube(delta_daily, new_days), USAGE_KEYS)
+
+
+def build_date_range(billing, tickets):
+    """Earliest and latest bill or ticket date, the sidebar's date range"""
+    dates = pd.concat([billing['billing_month'], tickets['ticket_date']], ignore_index=True)
+    return dates.min(), dates.max()
+
+
+def extend_date_range(date_range, billing, tickets):
+    """Date range widened by newly arrived bills and tickets"""
+    dates = pd.Series([*date_range, *build_date_range(billing, tickets)])
+    return dates.min(), dates.max()
+
+
+def activity_events(subscribers, billing, tickets):
+    """Subscriber row positions and epoch-ms dates of every bill and ticket"""
+    positions = pd.Index(subscribers['subscriber_id']).get_indexer(
+        np.concatenate([billing['subscriber_id'].to_numpy(), tickets['subscriber_id'].to_numpy()])
+    )
+    times = np.concatenate([
+        billing['billing_month'].to_numpy('datetime64[ms]'),
+        tickets['ticket_date'].to_numpy('datetime64[ms]'),
+    ]).astype(np.int64)
+    known = (positions >= 0) & ~np.isnat(times.view('datetime64[ms]'))
+    return positions[known].astype(np.int64), times[known]
+
+
+def build_activity_index(subscribers, billing, tickets):
+    """Billing and ticket dates per subscriber, for "active in date range" tests.
+
+    Each (subscriber, date) pair is packed into one sorted int64 key,
+    position * span + (date - first date), so a date range query is one binary
+    search per subscriber however many bills and tickets there are.
+    """
+    positions, times = activity_events(subscribers, billing, tickets)
+    first = times.min() if len(times) else 0
+    span = (times.max() - first + 1) if len(times) else 1
+    return {
+        'keys': np.unique(positions * span + (times - first)),
+        'first': first,
+        'span': span,
+        'size': len(subscribers),
+    }
+
+
+def extend_activity_index(index, subscribers, billing, tickets):
+    """Activity index with newly arrived bills and tickets added.
+
+    subscribers must be the frame the index was built over. Existing keys are
+    re-based if the new dates widen the range, which keeps them sorted, so
+    merging in the new keys is a linear merge rather than a full sort.
+    """
+    positions, times = activity_events(subscribers, billing, tickets)
+    if not len(times):
+        return index
+    old_first, old_span = index['first'], index['span']
+    if len(index['keys']):
+        first = min(old_first, times.min())
+        span = max(old_first + old_span, times.max() + 1) - first
+    else:
+        first, span = times.min(), times.max() - times.min() + 1
+    keys = index['keys']
+    if (first, span) != (old_first, old_span):
+        keys = (keys // old_span) * span + (keys % old_span + old_first - first)
+    new_keys = np.unique(positions * span + (times - first))
+    keys = np.sort(np.concatenate([keys, new_keys]), kind='stable')
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    return {'keys': keys, 'first': first, 'span': span, 'size': index['size']}
+
+
+def to_ms(value):
+    """Epoch milliseconds of a date or timestamp"""
+    return int(np.datetime64(pd.Timestamp(value), 'ms').astype(np.int64))
+
+
+def active_mask(index, start, end):
+    """Boolean per subscriber row: any bill or ticket dated within [start, end]"""
+    start = max(to_ms(start), index['first']) - index['first']
+    end = min(to_ms(end) - index['first'], index['span'] - 1)
+    if start > end:
+        return np.zeros(index['size'], dtype=bool)
+    base = np.arange(index['size'], dtype=np.int64) * index['span']
+    keys = index['keys']
+    found = np.searchsorted(keys, base + start)
+    hit = found < len(keys)
+    hit[hit] = keys[found[hit]] <= base[hit] + end
+    return hit
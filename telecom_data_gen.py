@@ -1,23 +1,31 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+from telecom_storage import EXTENSIONS, concat_parquet, write_table
 
 # Date ranges
 end_date = datetime(2026, 1, 4)
 start_date = end_date - timedelta(days=119)
 activation_start = end_date - timedelta(days=730)
 
-# Configuration
+# Configuration (defaults, override from the command line)
 SUBSCRIBERS_COUNT = 5000
 USAGE_COUNT = 50000
 BILLING_COUNT = 15000
 TICKETS_COUNT = 6000
 OUTAGES_COUNT = 200
+SEED = 42
+CHUNK_SIZE = 1_000_000
+WORKERS = 1
+
+# Output order; each table gets its own child of the root SeedSequence
+TABLES = ['subscribers', 'usage_records', 'billing', 'network_outages', 'tickets']
 
 # Categories
 CITIES = ['Dubai', 'Abu Dhabi', 'Sharjah', 'Ajman', 'Fujairah']
@@ -33,265 +41,479 @@ TICKET_CHANNELS = ['Call Center', 'App', 'Online Chat', 'Retail Store']
 PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
 TEAMS = ['Tier 1', 'Tier 2', 'Tier 3', 'Field Ops']
 OUTAGE_TYPES = ['Planned Maintenance', 'Equipment Failure', 'Power Outage', 'Fiber Cut', 'Weather']
+ADJUSTMENT_REASONS = ['Network Issue', 'Billing Error', 'Goodwill', 'Promo Credit']
+
+# Injected data quality issues, as a fraction of the table they are drawn from.
+# At the default counts these reproduce the original fixed numbers (80 duplicate
+# subscribers, 500 missing usage values, ...).
+DEFECT_RATES = {
+    'subscriber_duplicates': 80 / 5000,
+    'subscriber_labels': 50 / 5080,
+    'usage_missing': 500 / 50000,
+    'usage_outliers': 30 / 50000,
+    'usage_before_activation': 10 / 50000,
+    'billing_duplicates': 40 / 15000,
+    'billing_missing_payment': 200 / 15040,
+    'billing_negative': 5 / 15040,
+    'billing_outliers': 20 / 15040,
+    'outage_missing_duration': 10 / 200,
+    'outage_outliers': 10 / 200,
+    'ticket_duplicates': 60 / 6000,
+    'ticket_missing_resolution': 100 / 6060,
+    'ticket_status_labels': 150 / 6060,
+    'ticket_resolution_before_open': 15 / 6060,
+}
+
+
+def defect_count(rate_key, n_rows, population=None):
+    """Number of rows to corrupt for a table of n_rows"""
+    count = int(round(DEFECT_RATES[rate_key] * n_rows))
+    return min(count, n_rows if population is None else population)
+
+
+def make_ids(prefix, numbers, width):
+    """Vectorized zero-padded ids, e.g. SUB_00001"""
+    numbers = np.asarray(numbers).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, width)).astype(object)
+
+
+def add_days(base, days):
+    """Offset a datetime by an array of whole days (datetime64[D])"""
+    return np.datetime64(base.date(), 'D') + np.asarray(days).astype('timedelta64[D]')
+
+
+def inject_duplicates(rng, df, count):
+    """Append copies of `count` random rows to the end of df"""
+    dup_indices = rng.choice(len(df), count, replace=False)
+    return pd.concat([df, df.iloc[dup_indices]], ignore_index=True)
+
+
+def generate_subscribers(rng, start, stop):
+    """Build SUBSCRIBERS rows start..stop column by column"""
+    n = stop - start
+    numbers = np.arange(start + 1, stop + 1)
+    city = rng.choice(CITIES, size=n, p=CITY_DIST)
+    zone = rng.choice(ZONES, size=n)
+    plan_type = rng.choice(PLAN_TYPES, size=n, p=[0.6, 0.4])
+    prepaid = plan_type == 'Prepaid'
+
+    plan_name = np.where(
+        prepaid,
+        rng.choice(['Basic', 'Standard'], size=n, p=[0.5, 0.5]),
+        rng.choice(['Standard', 'Premium', 'Unlimited'], size=n, p=[0.4, 0.4, 0.2])
+    )
+
+    # Charge band depends on plan type and name
+    low = np.select([prepaid, plan_name == 'Standard', plan_name == 'Premium'], [50, 100, 200], 350)
+    high = np.select([prepaid, plan_name == 'Standard', plan_name == 'Premium'], [150, 200, 350], 500)
+    monthly_charge = rng.uniform(low, high)
+
+    activation_date = add_days(activation_start, rng.integers(0, 731, size=n))
+    status = rng.choice(STATUSES, size=n, p=[0.85, 0.10, 0.05])
+
+    subscribers_df = pd.DataFrame({
+        'subscriber_id': make_ids('SUB_', numbers, 5),
+        'subscriber_name': np.char.add('Customer ', numbers.astype(str)).astype(object),
+        'city': city.astype(object),
+        'zone': zone.astype(object),
+        'plan_type': plan_type.astype(object),
+        'plan_name': plan_name.astype(object),
+        'monthly_charge': np.round(monthly_charge, 2),
+        'activation_date': activation_date,
+        'status': status.astype(object)
+    })
 
-print("Generating SUBSCRIBERS table...")
-subscribers_data = []
-for i in range(SUBSCRIBERS_COUNT):
-    sub_id = f"SUB_{str(i+1).zfill(5)}"
-    city = np.random.choice(CITIES, p=CITY_DIST)
-    zone = np.random.choice(ZONES)
-    plan_type = np.random.choice(['Prepaid', 'Postpaid'], p=[0.6, 0.4])
-    
-    if plan_type == 'Prepaid':
-        plan_name = np.random.choice(['Basic', 'Standard'], p=[0.5, 0.5])
-        monthly_charge = np.random.uniform(50, 150)
-    else:
-        plan_name = np.random.choice(['Standard', 'Premium', 'Unlimited'], p=[0.4, 0.4, 0.2])
-        if plan_name == 'Standard':
-            monthly_charge = np.random.uniform(100, 200)
-        elif plan_name == 'Premium':
-            monthly_charge = np.random.uniform(200, 350)
-        else:
-            monthly_charge = np.random.uniform(350, 500)
-    
-    activation_date = activation_start + timedelta(days=random.randint(0, 730))
-    status = np.random.choice(['Active', 'Suspended', 'Churned'], p=[0.85, 0.10, 0.05])
-    
-    subscribers_data.append({
-        'subscriber_id': sub_id,
-        'subscriber_name': f'Customer {i+1}',
-        'city': city,
-        'zone': zone,
-        'plan_type': plan_type,
-        'plan_name': plan_name,
-        'monthly_charge': round(monthly_charge, 2),
-        'activation_date': activation_date.date(),
-        'status': status
+    # Inject duplicates
+    subscribers_df = inject_duplicates(rng, subscribers_df, defect_count('subscriber_duplicates', n))
+
+    # Inject inconsistent labels
+    n_labels = defect_count('subscriber_labels', len(subscribers_df), len(subscribers_df) // 3)
+    inconsistent_indices = rng.choice(len(subscribers_df), 3 * n_labels, replace=False)
+    plan_idx = inconsistent_indices[:n_labels]
+    squash_idx = inconsistent_indices[n_labels:2 * n_labels]
+    variant_idx = inconsistent_indices[2 * n_labels:]
+
+    city_col = subscribers_df.columns.get_loc('city')
+    subscribers_df.iloc[plan_idx, subscribers_df.columns.get_loc('plan_type')] = (
+        rng.choice(['PREPAID', 'prepaid', 'Pre-paid'], size=len(plan_idx))
+    )
+    subscribers_df.iloc[squash_idx, city_col] = (
+        subscribers_df['city'].iloc[squash_idx].str.replace(' ', '').values
+    )
+    variant_idx = variant_idx[subscribers_df['city'].values[variant_idx] == 'Abu Dhabi']
+    subscribers_df.iloc[variant_idx, city_col] = rng.choice(['AbuDhabi', 'Abu-Dhabi', 'AD'], size=len(variant_idx))
+
+    return subscribers_df
+
+
+def subscriber_dimension(subscribers_df, n):
+    """Compact per-position attributes of the first n (non-duplicate) subscriber rows"""
+    dim = subscribers_df.iloc[:n][['status', 'monthly_charge', 'activation_date', 'zone', 'city']]
+    return dim.reset_index(drop=True)
+
+
+# Subscriber attributes shared with the fact-table generators. Set once per
+# process by init_worker so pool workers don't receive it with every chunk.
+_SUBSCRIBER_DIM = None
+_ACTIVE_POSITIONS = None
+
+
+def init_worker(dim):
+    global _SUBSCRIBER_DIM, _ACTIVE_POSITIONS
+    _SUBSCRIBER_DIM = dim
+    _ACTIVE_POSITIONS = np.flatnonzero(dim['status'].values == 'Active')
+    # a handful of subscribers may all be inactive; usage then comes from any of them
+    if len(_ACTIVE_POSITIONS) == 0:
+        _ACTIVE_POSITIONS = np.arange(len(dim))
+
+
+def subscriber_lookup(column, positions):
+    """Subscriber attribute by row position (SUB_00001 is position 0).
+
+    Subscriber ids are dense and position-derived, so every per-row lookup in
+    the generator is an O(1) array take rather than a scan of the subscriber table.
+    """
+    return _SUBSCRIBER_DIM[column].values[positions]
+
+
+def generate_usage(rng, start, stop):
+    """Build USAGE_RECORDS rows start..stop for active subscribers"""
+    n = stop - start
+    sub_pos = _ACTIVE_POSITIONS[rng.integers(0, len(_ACTIVE_POSITIONS), size=n)]
+
+    usage_df = pd.DataFrame({
+        'usage_id': make_ids('USG_', np.arange(start + 1, stop + 1), 6),
+        'subscriber_id': make_ids('SUB_', sub_pos + 1, 5),
+        'usage_date': add_days(start_date, rng.integers(0, 120, size=n)),
+        'data_usage_gb': np.round(rng.gamma(2, 5, size=n), 2),
+        'voice_minutes': rng.integers(0, 501, size=n),
+        'sms_count': rng.integers(0, 101, size=n),
+        'roaming_charges': np.round(rng.exponential(20, size=n), 2),
+        'addon_charges': np.round(rng.exponential(15, size=n), 2)
     })
 
-subscribers_df = pd.DataFrame(subscribers_data)
-
-# Inject duplicates (80 records)
-dup_indices = np.random.choice(subscribers_df.index, 80, replace=False)
-duplicates = subscribers_df.loc[dup_indices].copy()
-subscribers_df = pd.concat([subscribers_df, duplicates], ignore_index=True)
-
-# Inject inconsistent labels
-inconsistent_indices = np.random.choice(subscribers_df.index, 200, replace=False)
-for idx in inconsistent_indices[:50]:
-    subscribers_df.at[idx, 'plan_type'] = np.random.choice(['PREPAID', 'prepaid', 'Pre-paid'])
-for idx in inconsistent_indices[50:100]:
-    subscribers_df.at[idx, 'city'] = subscribers_df.at[idx, 'city'].replace(' ', '').replace('Abu Dhabi', 'AbuDhabi')
-for idx in inconsistent_indices[100:150]:
-    if subscribers_df.at[idx, 'city'] == 'Abu Dhabi':
-        subscribers_df.at[idx, 'city'] = np.random.choice(['AbuDhabi', 'Abu-Dhabi', 'AD'])
-
-print(f"Generated {len(subscribers_df)} subscriber records (including duplicates)")
-
-print("Generating USAGE_RECORDS table...")
-active_subs = subscribers_df[subscribers_df['status'] == 'Active']['subscriber_id'].unique()
-usage_data = []
-for i in range(USAGE_COUNT):
-    sub_id = np.random.choice(active_subs)
-    usage_date = start_date + timedelta(days=random.randint(0, 119))
-    
-    usage_data.append({
-        'usage_id': f"USG_{str(i+1).zfill(6)}",
-        'subscriber_id': sub_id,
-        'usage_date': usage_date.date(),
-        'data_usage_gb': round(np.random.gamma(2, 5), 2),
-        'voice_minutes': random.randint(0, 500),
-        'sms_count': random.randint(0, 100),
-        'roaming_charges': round(np.random.exponential(20), 2),
-        'addon_charges': round(np.random.exponential(15), 2)
+    # Inject missing values
+    missing_indices = rng.choice(n, defect_count('usage_missing', n), replace=False)
+    usage_df.loc[missing_indices, 'data_usage_gb'] = np.nan
+
+    # Inject outliers (data > 500 GB)
+    outlier_indices = rng.choice(n, defect_count('usage_outliers', n), replace=False)
+    usage_df.loc[outlier_indices, 'data_usage_gb'] = np.round(rng.uniform(500, 1000, size=len(outlier_indices)), 2)
+
+    # Inject impossible values (usage before activation)
+    impossible_indices = rng.choice(n, defect_count('usage_before_activation', n), replace=False)
+    activation = subscriber_lookup('activation_date', sub_pos[impossible_indices])
+    usage_df.loc[impossible_indices, 'usage_date'] = (
+        activation - rng.integers(1, 31, size=len(impossible_indices)).astype('timedelta64[D]')
+    )
+
+    return usage_df
+
+
+def generate_billing(rng, start, stop):
+    """Build BILLING rows for subscribers start..stop: three monthly bills each"""
+    billing_months = pd.date_range(start=start_date, end=end_date, freq='MS')[:3].values.astype('datetime64[D]')
+    n_months = len(billing_months)
+    sub_pos = np.arange(start, stop)
+    n_rows = len(sub_pos) * n_months
+
+    month = np.tile(billing_months, len(sub_pos))
+    bill_amount = np.repeat(subscriber_lookup('monthly_charge', sub_pos), n_months) + rng.uniform(0, 50, size=n_rows)
+    payment_status = rng.choice(PAYMENT_STATUSES, size=n_rows, p=[0.7, 0.15, 0.10, 0.05])
+
+    paid = payment_status == 'Paid'
+    payment_date = month + rng.integers(1, 31, size=n_rows).astype('timedelta64[D]')
+    payment_date = np.where(paid, payment_date, np.datetime64('NaT'))
+
+    adjusted = rng.random(n_rows) < 0.1
+    credit_adj = np.where(adjusted, np.round(rng.uniform(10, 100, size=n_rows), 2), 0.0)
+    adj_reason = np.where(adjusted, rng.choice(ADJUSTMENT_REASONS, size=n_rows), None)
+
+    billing_df = pd.DataFrame({
+        'bill_id': make_ids('BILL_', np.arange(start * n_months + 1, start * n_months + n_rows + 1), 6),
+        'subscriber_id': np.repeat(make_ids('SUB_', sub_pos + 1, 5), n_months),
+        'billing_month': month,
+        'bill_amount': np.round(bill_amount, 2),
+        'payment_status': payment_status.astype(object),
+        'payment_date': payment_date,
+        'credit_adjustment': credit_adj,
+        'adjustment_reason': adj_reason
     })
 
-usage_df = pd.DataFrame(usage_data)
-
-# Inject missing values (500 records)
-missing_indices = np.random.choice(usage_df.index, 500, replace=False)
-usage_df.loc[missing_indices, 'data_usage_gb'] = np.nan
-
-# Inject outliers (30 records with data > 500 GB)
-outlier_indices = np.random.choice(usage_df.index, 30, replace=False)
-usage_df.loc[outlier_indices, 'data_usage_gb'] = np.random.uniform(500, 1000)
-
-# Inject impossible values (10 records with usage before activation)
-impossible_indices = np.random.choice(usage_df.index, 10, replace=False)
-for idx in impossible_indices:
-    sub_id = usage_df.at[idx, 'subscriber_id']
-    activation = subscribers_df[subscribers_df['subscriber_id'] == sub_id]['activation_date'].values[0]
-    usage_df.at[idx, 'usage_date'] = pd.to_datetime(activation) - timedelta(days=random.randint(1, 30))
-
-print(f"Generated {len(usage_df)} usage records")
-
-print("Generating BILLING table...")
-billing_data = []
-billing_months = pd.date_range(start=start_date, end=end_date, freq='MS')[:3]
-
-for sub_id in subscribers_df['subscriber_id'].unique()[:BILLING_COUNT//3]:
-    sub_info = subscribers_df[subscribers_df['subscriber_id'] == sub_id].iloc[0]
-    
-    for month in billing_months:
-        bill_amount = sub_info['monthly_charge'] + np.random.uniform(0, 50)
-        payment_status = np.random.choice(PAYMENT_STATUSES, p=[0.7, 0.15, 0.10, 0.05])
-        
-        payment_date = None
-        if payment_status == 'Paid':
-            payment_date = month + timedelta(days=random.randint(1, 30))
-        
-        credit_adj = 0
-        adj_reason = None
-        if random.random() < 0.1:
-            credit_adj = round(np.random.uniform(10, 100), 2)
-            adj_reason = np.random.choice(['Network Issue', 'Billing Error', 'Goodwill', 'Promo Credit'])
-        
-        billing_data.append({
-            'bill_id': f"BILL_{len(billing_data)+1:06d}",
-            'subscriber_id': sub_id,
-            'billing_month': month.date(),
-            'bill_amount': round(bill_amount, 2),
-            'payment_status': payment_status,
-            'payment_date': payment_date.date() if payment_date else None,
-            'credit_adjustment': credit_adj,
-            'adjustment_reason': adj_reason
-        })
-
-billing_df = pd.DataFrame(billing_data)
-
-# Inject duplicates (40 records)
-dup_indices = np.random.choice(billing_df.index, 40, replace=False)
-duplicates = billing_df.loc[dup_indices].copy()
-billing_df = pd.concat([billing_df, duplicates], ignore_index=True)
-
-# Inject missing payment_date for Paid status (200 records)
-paid_indices = billing_df[billing_df['payment_status'] == 'Paid'].index
-missing_payment_indices = np.random.choice(paid_indices, min(200, len(paid_indices)), replace=False)
-billing_df.loc[missing_payment_indices, 'payment_date'] = None
-
-# Inject negative bill amounts (5 records)
-negative_indices = np.random.choice(billing_df.index, 5, replace=False)
-billing_df.loc[negative_indices, 'bill_amount'] = -np.random.uniform(10, 100)
-
-# Inject outliers (20 bills > 5000 AED)
-outlier_indices = np.random.choice(billing_df.index, 20, replace=False)
-billing_df.loc[outlier_indices, 'bill_amount'] = np.random.uniform(5000, 10000)
-
-print(f"Generated {len(billing_df)} billing records")
-
-print("Generating NETWORK_OUTAGES table...")
-outages_data = []
-for i in range(OUTAGES_COUNT):
-    city = np.random.choice(CITIES, p=CITY_DIST)
-    zone = np.random.choice(ZONES)
-    outage_date = start_date + timedelta(days=random.randint(0, 119))
-    
-    start_hour = random.randint(0, 23)
-    start_time = outage_date.replace(hour=start_hour, minute=random.randint(0, 59))
-    duration_mins = random.randint(15, 480)
-    end_time = start_time + timedelta(minutes=duration_mins)
-    
-    outages_data.append({
-        'outage_id': f"OUT_{str(i+1).zfill(4)}",
-        'zone': zone,
-        'city': city,
-        'outage_date': outage_date.date(),
+    # Inject duplicates
+    billing_df = inject_duplicates(rng, billing_df, defect_count('billing_duplicates', n_rows))
+    n_rows = len(billing_df)
+
+    # Inject missing payment_date for Paid status
+    paid_indices = np.flatnonzero(billing_df['payment_status'].values == 'Paid')
+    missing_payment_indices = rng.choice(
+        paid_indices, defect_count('billing_missing_payment', n_rows, len(paid_indices)), replace=False
+    )
+    billing_df.loc[missing_payment_indices, 'payment_date'] = pd.NaT
+
+    # Inject negative bill amounts
+    negative_indices = rng.choice(n_rows, defect_count('billing_negative', n_rows), replace=False)
+    billing_df.loc[negative_indices, 'bill_amount'] = -np.round(rng.uniform(10, 100, size=len(negative_indices)), 2)
+
+    # Inject outliers (bills > 5000 AED)
+    outlier_indices = rng.choice(n_rows, defect_count('billing_outliers', n_rows), replace=False)
+    billing_df.loc[outlier_indices, 'bill_amount'] = np.round(rng.uniform(5000, 10000, size=len(outlier_indices)), 2)
+
+    return billing_df
+
+
+def generate_outages(rng, start, stop):
+    """Build NETWORK_OUTAGES rows start..stop"""
+    n = stop - start
+    outage_date = add_days(start_date, rng.integers(0, 120, size=n))
+    start_time = (
+        outage_date.astype('datetime64[m]')
+        + rng.integers(0, 24, size=n).astype('timedelta64[h]')
+        + rng.integers(0, 60, size=n).astype('timedelta64[m]')
+    )
+    duration_mins = rng.integers(15, 481, size=n)
+
+    outages_df = pd.DataFrame({
+        'outage_id': make_ids('OUT_', np.arange(start + 1, stop + 1), 4),
+        'zone': rng.choice(ZONES, size=n).astype(object),
+        'city': rng.choice(CITIES, size=n, p=CITY_DIST).astype(object),
+        'outage_date': outage_date,
         'outage_start_time': start_time,
-        'outage_end_time': end_time,
-        'outage_duration_mins': duration_mins,
-        'outage_type': np.random.choice(OUTAGE_TYPES, p=[0.25, 0.35, 0.20, 0.15, 0.05]),
-        'affected_subscribers': random.randint(50, 5000)
+        'outage_end_time': start_time + duration_mins.astype('timedelta64[m]'),
+        'outage_duration_mins': duration_mins.astype(float),
+        'outage_type': rng.choice(OUTAGE_TYPES, size=n, p=[0.25, 0.35, 0.20, 0.15, 0.05]).astype(object),
+        'affected_subscribers': rng.integers(50, 5001, size=n)
     })
 
-outages_df = pd.DataFrame(outages_data)
-
-# Inject missing duration (10 records)
-missing_indices = np.random.choice(outages_df.index, 10, replace=False)
-outages_df.loc[missing_indices, 'outage_duration_mins'] = np.nan
-
-# Inject outliers (10 outages > 1440 mins)
-outlier_indices = np.random.choice(outages_df.index, 10, replace=False)
-outages_df.loc[outlier_indices, 'outage_duration_mins'] = np.random.randint(1441, 3000)
-
-print(f"Generated {len(outages_df)} outage records")
-
-print("Generating TICKETS table...")
-tickets_data = []
-for i in range(TICKETS_COUNT):
-    sub_id = np.random.choice(subscribers_df['subscriber_id'].unique())
-    sub_info = subscribers_df[subscribers_df['subscriber_id'] == sub_id].iloc[0]
-    
-    ticket_date = start_date + timedelta(days=random.randint(0, 119))
-    category = np.random.choice(TICKET_CATEGORIES, p=[0.35, 0.25, 0.20, 0.12, 0.08])
-    status = np.random.choice(TICKET_STATUSES, p=[0.65, 0.20, 0.10, 0.05])
-    
-    resolution_date = None
-    if status == 'Resolved':
-        resolution_hours = random.randint(1, 120)
-        resolution_date = ticket_date + timedelta(hours=resolution_hours)
-    
-    sla_target = np.random.choice([24, 48, 72], p=[0.3, 0.5, 0.2])
-    
-    tickets_data.append({
-        'ticket_id': f"TKT_{str(i+1).zfill(6)}",
-        'subscriber_id': sub_id,
-        'ticket_date': ticket_date.date(),
-        'ticket_channel': np.random.choice(TICKET_CHANNELS, p=[0.4, 0.3, 0.2, 0.1]),
-        'ticket_category': category,
-        'priority': np.random.choice(PRIORITIES, p=[0.3, 0.4, 0.2, 0.1]),
-        'status': status,
-        'resolution_date': resolution_date.date() if resolution_date else None,
-        'sla_target_hours': sla_target,
-        'assigned_team': np.random.choice(TEAMS, p=[0.4, 0.3, 0.2, 0.1])
+    # Inject missing duration
+    missing_indices = rng.choice(n, defect_count('outage_missing_duration', n), replace=False)
+    outages_df.loc[missing_indices, 'outage_duration_mins'] = np.nan
+
+    # Inject outliers (outages > 1440 mins)
+    outlier_indices = rng.choice(n, defect_count('outage_outliers', n), replace=False)
+    outages_df.loc[outlier_indices, 'outage_duration_mins'] = rng.integers(1441, 3000, size=len(outlier_indices))
+
+    return outages_df
+
+
+def generate_tickets(rng, start, stop):
+    """Build TICKETS rows start..stop, linked to subscriber zone and city"""
+    n = stop - start
+    sub_pos = rng.integers(0, len(_SUBSCRIBER_DIM), size=n)
+
+    ticket_date = add_days(start_date, rng.integers(0, 120, size=n))
+    category = rng.choice(TICKET_CATEGORIES, size=n, p=[0.35, 0.25, 0.20, 0.12, 0.08])
+    status = rng.choice(TICKET_STATUSES, size=n, p=[0.65, 0.20, 0.10, 0.05])
+
+    # Resolution lands on the calendar day reached after 1-120 hours
+    resolution_hours = rng.integers(1, 121, size=n)
+    resolution_date = ticket_date + (resolution_hours // 24).astype('timedelta64[D]')
+    resolution_date = np.where(status == 'Resolved', resolution_date, np.datetime64('NaT'))
+
+    tickets_df = pd.DataFrame({
+        'ticket_id': make_ids('TKT_', np.arange(start + 1, stop + 1), 6),
+        'subscriber_id': make_ids('SUB_', sub_pos + 1, 5),
+        'ticket_date': ticket_date,
+        'ticket_channel': rng.choice(TICKET_CHANNELS, size=n, p=[0.4, 0.3, 0.2, 0.1]).astype(object),
+        'ticket_category': category.astype(object),
+        'priority': rng.choice(PRIORITIES, size=n, p=[0.3, 0.4, 0.2, 0.1]).astype(object),
+        'status': status.astype(object),
+        'resolution_date': resolution_date,
+        'sla_target_hours': rng.choice([24, 48, 72], size=n, p=[0.3, 0.5, 0.2]),
+        'assigned_team': rng.choice(TEAMS, size=n, p=[0.4, 0.3, 0.2, 0.1]).astype(object),
+        # Link tickets to zones from subscribers
+        'zone': subscriber_lookup('zone', sub_pos),
+        'city': subscriber_lookup('city', sub_pos)
     })
 
-tickets_df = pd.DataFrame(tickets_data)
-
-# Link some tickets to zones from subscribers
-tickets_df = tickets_df.merge(
-    subscribers_df[['subscriber_id', 'zone', 'city']].drop_duplicates('subscriber_id'),
-    on='subscriber_id',
-    how='left'
-)
-
-# Inject duplicates (60 records)
-dup_indices = np.random.choice(tickets_df.index, 60, replace=False)
-duplicates = tickets_df.loc[dup_indices].copy()
-tickets_df = pd.concat([tickets_df, duplicates], ignore_index=True)
-
-# Inject missing resolution_date for Resolved (100 records)
-resolved_indices = tickets_df[tickets_df['status'] == 'Resolved'].index
-missing_resolution = np.random.choice(resolved_indices, min(100, len(resolved_indices)), replace=False)
-tickets_df.loc[missing_resolution, 'resolution_date'] = None
-
-# Inject inconsistent status labels
-status_indices = np.random.choice(tickets_df.index, 150, replace=False)
-for idx in status_indices:
-    if tickets_df.at[idx, 'status'] == 'Resolved':
-        tickets_df.at[idx, 'status'] = np.random.choice(['resolved', 'RESOLVED', 'Closed'])
-
-# Inject impossible values (15 records with resolution < ticket date)
-impossible_indices = np.random.choice(
-    tickets_df[tickets_df['resolution_date'].notna()].index, 15, replace=False
-)
-for idx in impossible_indices:
-    ticket_date = pd.to_datetime(tickets_df.at[idx, 'ticket_date'])
-    tickets_df.at[idx, 'resolution_date'] = ticket_date - timedelta(days=random.randint(1, 10))
-
-print(f"Generated {len(tickets_df)} ticket records")
-
-# Save to CSV
-print("\nSaving CSV files...")
-subscribers_df.to_csv('subscribers.csv', index=False)
-usage_df.to_csv('usage_records.csv', index=False)
-billing_df.to_csv('billing.csv', index=False)
-tickets_df.to_csv('tickets.csv', index=False)
-outages_df.to_csv('network_outages.csv', index=False)
-
-print("\n✓ All CSV files generated successfully!")
-print("\nData Quality Issues Injected:")
-print("- Duplicates: Subscribers (80), Billing (40), Tickets (60)")
-print("- Missing Values: Usage (500), Billing payment_date (200), Tickets resolution_date (100), Outages duration (10)")
-print("- Inconsistent Labels: Plan types, Cities, Ticket status")
-print("- Outliers: Usage data (30), Bills (20), Outages (10)")
-print("- Impossible Values: Usage dates (10), Ticket dates (15), Bills (5 negative)")
+    # Inject duplicates
+    tickets_df = inject_duplicates(rng, tickets_df, defect_count('ticket_duplicates', n))
+    n_rows = len(tickets_df)
+
+    # Inject missing resolution_date for Resolved
+    resolved_indices = np.flatnonzero(tickets_df['status'].values == 'Resolved')
+    missing_resolution = rng.choice(
+        resolved_indices, defect_count('ticket_missing_resolution', n_rows, len(resolved_indices)), replace=False
+    )
+    tickets_df.loc[missing_resolution, 'resolution_date'] = pd.NaT
+
+    # Inject inconsistent status labels
+    status_indices = rng.choice(n_rows, defect_count('ticket_status_labels', n_rows), replace=False)
+    status_indices = status_indices[tickets_df['status'].values[status_indices] == 'Resolved']
+    tickets_df.loc[status_indices, 'status'] = rng.choice(['resolved', 'RESOLVED', 'Closed'], size=len(status_indices))
+
+    # Inject impossible values (resolution < ticket date)
+    has_resolution = np.flatnonzero(tickets_df['resolution_date'].notna().values)
+    impossible_indices = rng.choice(
+        has_resolution, defect_count('ticket_resolution_before_open', n_rows, len(has_resolution)), replace=False
+    )
+    tickets_df.loc[impossible_indices, 'resolution_date'] = (
+        tickets_df['ticket_date'].values[impossible_indices]
+        - rng.integers(1, 11, size=len(impossible_indices)).astype('timedelta64[D]')
+    )
+
+    return tickets_df
+
+
+GENERATORS = {
+    'subscribers': generate_subscribers,
+    'usage_records': generate_usage,
+    'billing': generate_billing,
+    'network_outages': generate_outages,
+    'tickets': generate_tickets,
+}
+
+
+def plan_chunks(table, seed_seq, total, chunk_size):
+    """Split a table into (index, start, stop, seed) chunks.
+
+    Chunk seeds are spawned from the table's SeedSequence by chunk index, so
+    the data depends only on the root seed and chunk size - never on how many
+    workers generate it.
+    """
+    if table == 'billing':
+        # Billing is chunked by subscriber, three rows each
+        chunk_size = max(1, chunk_size // 3)
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    seeds = seed_seq.spawn(len(bounds))
+    return [(table, i, start, stop, seeds[i]) for i, (start, stop) in enumerate(bounds)]
+
+
+def chunk_path(parts_dir, table, index, fmt):
+    return os.path.join(parts_dir, table, f'part-{index:05d}.{EXTENSIONS[fmt]}')
+
+
+def write_chunk(task, parts_dir, fmt='csv'):
+    """Generate one chunk and write it as a part file"""
+    table, index, start, stop, seed = task
+    df = GENERATORS[table](np.random.default_rng(seed), start, stop)
+    write_table(df, table, chunk_path(parts_dir, table, index, fmt), fmt)
+
+    dim = subscriber_dimension(df, stop - start) if table == 'subscribers' else None
+    return len(df), dim
+
+
+def concat_parts(part_paths, out_path):
+    """Stream part files into one CSV, keeping only the first header"""
+    with open(out_path, 'wb') as out:
+        for i, path in enumerate(part_paths):
+            with open(path, 'rb') as part:
+                if i > 0:
+                    part.readline()
+                shutil.copyfileobj(part, out)
+
+
+def run_chunks(tasks, parts_dir, workers, dim=None, fmt='csv'):
+    """Generate chunks in order, in-process or across a process pool"""
+    if dim is None:
+        initializer, initargs = None, ()
+    else:
+        initializer, initargs = init_worker, (dim,)
+
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        return [write_chunk(task, parts_dir, fmt) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        return list(pool.map(write_chunk, tasks, [parts_dir] * len(tasks), [fmt] * len(tasks)))
+
+
+def generate_all(subscribers=SUBSCRIBERS_COUNT, usage=USAGE_COUNT, billing=BILLING_COUNT,
+                 tickets=TICKETS_COUNT, outages=OUTAGES_COUNT, seed=SEED,
+                 output_dir='.', chunk_size=CHUNK_SIZE, workers=WORKERS, keep_parts=False, fmt='csv'):
+    """Generate all five tables chunk by chunk and write them to output_dir.
+
+    With keep_parts the chunks are left as <table>/part-NNNNN.<fmt>; otherwise
+    they are concatenated into <table>.<fmt>. Returns row counts per table.
+    """
+    table_seeds = dict(zip(TABLES, np.random.SeedSequence(seed).spawn(len(TABLES))))
+    totals = {
+        'subscribers': subscribers,
+        'usage_records': usage,
+        'billing': min(billing // 3, subscribers),
+        'network_outages': outages,
+        'tickets': tickets,
+    }
+    labels = {
+        'subscribers': 'SUBSCRIBERS',
+        'usage_records': 'USAGE_RECORDS',
+        'billing': 'BILLING',
+        'network_outages': 'NETWORK_OUTAGES',
+        'tickets': 'TICKETS',
+    }
+
+    parts_dir = output_dir if keep_parts else os.path.join(output_dir, '.parts')
+    row_counts = {}
+    dim = None
+    for table in TABLES:
+        print(f"Generating {labels[table]} table...")
+        started = time.perf_counter()
+        os.makedirs(os.path.join(parts_dir, table), exist_ok=True)
+        tasks = plan_chunks(table, table_seeds[table], totals[table], chunk_size)
+        results = run_chunks(tasks, parts_dir, workers, dim, fmt)
+        row_counts[table] = sum(rows for rows, _ in results)
+        if table == 'subscribers':
+            dim = pd.concat([d for _, d in results], ignore_index=True)
+
+        if not keep_parts:
+            part_paths = [chunk_path(parts_dir, table, i, fmt) for i in range(len(tasks))]
+            out_path = os.path.join(output_dir, f'{table}.{EXTENSIONS[fmt]}')
+            if fmt == 'parquet':
+                concat_parquet(part_paths, out_path)
+            else:
+                concat_parts(part_paths, out_path)
+
+        elapsed = time.perf_counter() - started
+        print(f"Generated {row_counts[table]} {table} records ({len(tasks)} chunks) "
+              f"in {elapsed:.2f}s - {row_counts[table] / max(elapsed, 1e-9):,.0f} rows/s")
+
+    if not keep_parts:
+        shutil.rmtree(parts_dir)
+    return row_counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic ConnectUAE telecom datasets")
+    parser.add_argument('--subscribers', type=int, default=SUBSCRIBERS_COUNT, help="SUBSCRIBERS_COUNT")
+    parser.add_argument('--usage', type=int, default=USAGE_COUNT, help="USAGE_COUNT")
+    parser.add_argument('--billing', type=int, default=BILLING_COUNT, help="BILLING_COUNT")
+    parser.add_argument('--tickets', type=int, default=TICKETS_COUNT, help="TICKETS_COUNT")
+    parser.add_argument('--outages', type=int, default=OUTAGES_COUNT, help="OUTAGES_COUNT")
+    parser.add_argument('--seed', type=int, default=SEED, help="Root random seed")
+    parser.add_argument('--output-dir', default='.', help="Directory to write the datasets to")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="Rows generated per chunk; bounds memory and fixes the per-chunk seeds")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Processes generating chunks in parallel")
+    parser.add_argument('--parts', action='store_true',
+                        help="Keep one part file per chunk (<table>/part-NNNNN.<format>) instead of one file per table")
+    parser.add_argument('--format', default='csv', choices=sorted(EXTENSIONS),
+                        help="Output format; parquet stores native timestamp and categorical columns")
+    args = parser.parse_args(argv)
+    for name in ['subscribers', 'usage', 'tickets', 'outages']:
+        if getattr(args, name) < 1:
+            parser.error(f"--{name} must be at least 1")
+    # bills are generated three months per subscriber
+    if args.billing < 3:
+        parser.error("--billing must be at least 3")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    row_counts = generate_all(args.subscribers, args.usage, args.billing, args.tickets, args.outages, args.seed,
+                              args.output_dir, args.chunk_size, args.workers, args.parts, args.format)
+
+    print(f"\n✓ All {args.format.upper()} files generated successfully!")
+    print("\nData Quality Issues Injected:")
+    print(f"- Duplicates: Subscribers ({row_counts['subscribers'] - args.subscribers}), "
+          f"Billing ({row_counts['billing'] - min(args.billing // 3, args.subscribers) * 3}), "
+          f"Tickets ({row_counts['tickets'] - args.tickets})")
+    print("- Missing Values: Usage, Billing payment_date, Tickets resolution_date, Outages duration")
+    print("- Inconsistent Labels: Plan types, Cities, Ticket status")
+    print("- Outliers: Usage data, Bills, Outages")
+    print("- Impossible Values: Usage dates, Ticket dates, Bills (negative)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+import weakref
+
+from telecom_cache import cleaned_tables, entry_dir, source_fingerprint
+from telecom_config import CLEANED_CACHE, CLEANED_CACHE_DIR, CLEANING_MODE, DATA_DIR, STORAGE_FORMAT
+from telecom_cubes import OPS_KEYS, REVENUE_KEYS, add_month
+from telecom_schema import CATEGORIES, to_category
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Optional DuckDB query engine (TELECOM_QUERY_ENGINE=duckdb).
+#
+# The cleaned billing, ticket and outage tables are kept as one Parquet file
+# each in the cleaned-data cache entry, and the Executive and Manager View
+# cells are computed by SQL over them with the sidebar filters in the WHERE
+# clause, so DuckDB prunes row groups and only the matching rows are ever
+# aggregated, on all cores. Subscribers (with tenure and tier, which depend on
+# today's date and the rules table) are copied in from pandas and joined in.
+#
+# Results have the same columns, dtypes and row order as the pandas cube
+# slices (telecom_cubes.py), so the views use either unchanged.
+
+# Cleaned tables the engine reads from Parquet
+ENGINE_TABLES = ['billing', 'tickets', 'network_outages']
+
+# Known categories of each result column, from the table it comes from
+RESULT_CATEGORIES = {
+    **CATEGORIES['network_outages'],
+    **CATEGORIES['tickets'],
+    **CATEGORIES['billing'],
+    **{col: CATEGORIES['subscribers'][col] for col in ['plan_type', 'plan_name']},
+}
+SUBSCRIBER_CATEGORIES = CATEGORIES['subscribers']
+
+
+def require_duckdb():
+    if duckdb is None:
+        raise ImportError("TELECOM_QUERY_ENGINE=duckdb needs duckdb: pip install duckdb")
+
+
+def parquet_path(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+                 use_cache=CLEANED_CACHE, mode=CLEANING_MODE, out_dir=None):
+    """A cleaned table as one Parquet file, written on first use: in its cache
+    entry, or in out_dir when the cleaned cache is disabled
+    """
+    if use_cache:
+        out_dir = entry_dir(cache_dir, source_fingerprint(data_dir, fmt))
+    elif out_dir is None:
+        raise ValueError("parquet_path needs out_dir when the cleaned cache is disabled")
+    path = os.path.join(out_dir, f'{name}.parquet')
+    if not os.path.exists(path):
+        table = cleaned_tables([name], data_dir, fmt, cache_dir, use_cache, mode)[name]
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return path
+
+
+def open_engine(subscribers, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+                use_cache=CLEANED_CACHE, mode=CLEANING_MODE):
+    """In-process DuckDB database with the ENGINE_TABLES as views over their
+    Parquet files and a subscribers table alongside.
+
+    With the cleaned cache disabled the Parquet files go to a temporary
+    directory that is removed along with the connection.
+    """
+    require_duckdb()
+    con = duckdb.connect()
+    out_dir = None
+    if not use_cache:
+        out_dir = tempfile.mkdtemp(prefix='telecom_duckdb_')
+        weakref.finalize(con, shutil.rmtree, out_dir, True)
+    # copied in as a table: registered frames are only visible to this cursor
+    con.register('subscriber_frame', subscribers)
+    con.execute("CREATE TABLE subscribers AS SELECT * FROM subscriber_frame")
+    con.unregister('subscriber_frame')
+    for name in ENGINE_TABLES:
+        path = parquet_path(name, data_dir, fmt, cache_dir, use_cache, mode, out_dir).replace("'", "''")
+        con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{path}', file_row_number = true)")
+    return con
+
+
+def query(con, sql, params):
+    # one cursor per query: Streamlit reruns share the connection across threads
+    return con.cursor().execute(sql, params).df()
+
+
+def is_in(column, values):
+    """SQL membership test with its parameters, like Series.isin(values)"""
+    values = list(values)
+    if not values:
+        return 'FALSE', []
+    return f"{column} IN ({', '.join(['?'] * len(values))})", values
+
+
+def where(*tests):
+    """WHERE clause and parameters from (sql, params) pairs"""
+    return ' AND '.join(sql for sql, params in tests), [p for sql, params in tests for p in params]
+
+
+def as_cells(df, keys=None, categories=RESULT_CATEGORIES):
+    """Query result with the pandas dtypes, sorted by keys like cube cells"""
+    for col in df.columns:
+        if col in categories:
+            df[col] = to_category(df[col].astype(object), categories[col])
+        elif col == 'service_tier':
+            df[col] = df[col].astype('str')
+    if keys:
+        df = df.sort_values(keys, na_position='last', kind='stable', ignore_index=True)
+    return df
+
+
+def revenue_cells(con, start, end, cities, plan_types, plan_names, statuses):
+    """Revenue cube cells (see telecom_cubes.py) for the sidebar filters"""
+    clause, params = where(
+        ('b.billing_month BETWEEN ? AND ?', [start, end]),
+        ('b.payment_status IS NOT NULL', []),
+        is_in('s.city', cities), is_in('s.plan_type', plan_types),
+        is_in('s.plan_name', plan_names), is_in('s.status', statuses),
+    )
+    cells = query(con, f"""
+        SELECT b.billing_month, s.city::VARCHAR AS city, s.plan_type::VARCHAR AS plan_type,
+               s.plan_name::VARCHAR AS plan_name, s.status::VARCHAR AS status, b.payment_status,
+               coalesce(sum(b.bill_amount), 0) AS bill_amount,
+               coalesce(sum(b.credit_adjustment), 0) AS credit_adjustment,
+               count(*) AS bill_count
+        FROM billing b JOIN subscribers s USING (subscriber_id)
+        WHERE {clause}
+        GROUP BY ALL
+    """, params)
+    categories = {**RESULT_CATEGORIES, **SUBSCRIBER_CATEGORIES}
+    return add_month(as_cells(cells, REVENUE_KEYS, categories))
+
+
+def ops_cells(con, start, end, cities, plan_types, ticket_cats):
+    """Ops cube cells (see telecom_cubes.py) for the sidebar filters.
+
+    Tickets keep their own city/zone; the subscriber's only fills gaps.
+    """
+    inner, inner_params = where(('t.ticket_date BETWEEN ? AND ?', [start, end]),
+                                is_in('t.ticket_category', ticket_cats))
+    outer, outer_params = where(is_in('city', cities), is_in('plan_type', plan_types))
+    cells = query(con, f"""
+        SELECT ticket_date, zone, city, plan_type, ticket_channel, ticket_category, service_tier, status,
+               count(*) AS tickets,
+               coalesce(sum((hours <= sla_target_hours)::BIGINT), 0)::BIGINT AS sla_met,
+               coalesce(sum((hours > sla_target_hours)::BIGINT), 0)::BIGINT AS sla_breached,
+               coalesce(sum(hours), 0) AS resolution_hours,
+               count(hours) AS timed_tickets
+        FROM (
+            SELECT t.ticket_date, coalesce(t.zone, s.zone::VARCHAR) AS zone,
+                   coalesce(t.city, s.city::VARCHAR) AS city, s.plan_type::VARCHAR AS plan_type,
+                   t.ticket_channel, t.ticket_category, s.service_tier, t.status, t.sla_target_hours,
+                   epoch(t.resolution_date - t.ticket_date) / 3600 AS hours
+            FROM tickets t LEFT JOIN subscribers s USING (subscriber_id)
+            WHERE {inner}
+        )
+        WHERE {outer}
+        GROUP BY ALL
+    """, inner_params + outer_params)
+    return as_cells(cells, OPS_KEYS)
+
+
+def outage_rows(con, start, end, cities):
+    """Outages in the date range and cities, in date order"""
+    clause, params = where(('outage_date BETWEEN ? AND ?', [start, end]), is_in('city', cities))
+    rows = query(con, f"""
+        SELECT * EXCLUDE (file_row_number) FROM network_outages
+        WHERE {clause}
+        ORDER BY outage_date, file_row_number
+    """, params)
+    return as_cells(rows)
+
+
+def subscriber_masks(con, subscribers, start, end, cities, plan_types, plan_names, statuses):
+    """Boolean masks over subscribers: matching the sidebar filters, and
+    matching them with a bill or ticket dated within [start, end]
+    """
+    clause, params = where(
+        is_in('city', cities), is_in('plan_type', plan_types),
+        is_in('plan_name', plan_names), is_in('status', statuses),
+    )
+    matches = query(con, f"""
+        SELECT subscriber_id, subscriber_id IN (
+            SELECT subscriber_id FROM billing WHERE billing_month BETWEEN ? AND ?
+            UNION SELECT subscriber_id FROM tickets WHERE ticket_date BETWEEN ? AND ?
+        ) AS active
+        FROM subscribers
+        WHERE {clause}
+    """, [start, end, start, end] + params)
+    ids = subscribers['subscriber_id']
+    return ids.isin(matches['subscriber_id']).to_numpy(), ids.isin(matches.loc[matches['active'], 'subscriber_id']).to_numpy()
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from telecom_cubes import to_ms
+
+# Precomputed row bitmaps for the sidebar filters.
+#
+# A filter index keeps a frame sorted by its date column plus, for each filter
+# column, one packed bitmap (np.packbits, 1 bit per row) per distinct value.
+# A filter combination is then a binary search for the date range, an OR of
+# value bitmaps within each column and an AND across columns, all over packed
+# bytes limited to the date range. Missing values get a bitmap of their own
+# (key None) so they drop out exactly as they do with isin.
+
+
+def value_bitmaps(series):
+    """Packed row bitmap per distinct value of series"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    bitmaps = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+    if (codes == -1).any():
+        bitmaps[None] = np.packbits(codes == -1)
+    return bitmaps
+
+
+def build_filter_index(df, columns, date_column=None):
+    """Filter index over df for the given columns and optional date column"""
+    dates = None
+    if date_column is not None:
+        # frames published pre-sorted (telecom_plane.py) are used as they are, not copied
+        if not df[date_column].is_monotonic_increasing:
+            df = df.sort_values(date_column, kind='stable', na_position='last')
+        dated = df[date_column].notna().to_numpy()
+        dates = df[date_column].to_numpy('datetime64[ms]')[dated].astype(np.int64)
+    return {
+        'frame': df,
+        'dates': dates,
+        'bitmaps': {col: value_bitmaps(df[col]) for col in columns},
+    }
+
+
+def date_bounds(index, start=None, end=None):
+    """[lo, hi) row positions dated within [start, end], inclusive"""
+    if index['dates'] is None:
+        return 0, len(index['frame'])
+    dates = index['dates']
+    lo = 0 if start is None else np.searchsorted(dates, to_ms(start), side='left')
+    hi = len(dates) if end is None else np.searchsorted(dates, to_ms(end), side='right')
+    return lo, max(lo, hi)
+
+
+def column_bits(bitmaps, values, byte_lo, byte_hi):
+    """Packed bytes of rows whose value is in values.
+
+    ORs whichever side is smaller, the chosen values or the rest, and
+    negates in the second case. Returns None when every row matches.
+    """
+    values = set(values)
+    chosen = [v for v in bitmaps if v is not None and v in values]
+    rest = [v for v in bitmaps if v is None or v not in values]
+    if not rest:
+        return None
+    negate = len(rest) < len(chosen)
+    bits = np.zeros(byte_hi - byte_lo, dtype=np.uint8)
+    for value in (rest if negate else chosen):
+        bits |= bitmaps[value][byte_lo:byte_hi]
+    return ~bits if negate else bits
+
+
+def match_rows(index, start=None, end=None, **selections):
+    """Resolve a filter combination to (lo, hi, hits).
+
+    Rows lo..hi-1 of index['frame'] are in the date range; hits is a boolean
+    array over those rows, or None when all of them match.
+    """
+    lo, hi = date_bounds(index, start, end)
+    byte_lo, byte_hi = lo // 8, -(-hi // 8)
+    bits = None
+    for col, values in selections.items():
+        col_bits = column_bits(index['bitmaps'][col], values, byte_lo, byte_hi)
+        if col_bits is not None:
+            bits = col_bits if bits is None else bits & col_bits
+    if bits is None:
+        return lo, hi, None
+    return lo, hi, np.unpackbits(bits, count=hi - byte_lo * 8)[lo - byte_lo * 8:].view(bool)
+
+
+def filter_positions(index, start=None, end=None, **selections):
+    """Row positions in index['frame'] matching the date range and, for each
+    keyword column, any of the given values.
+    """
+    lo, hi, hits = match_rows(index, start, end, **selections)
+    return np.arange(lo, hi) if hits is None else lo + np.flatnonzero(hits)
+
+
+def filter_mask(index, start=None, end=None, **selections):
+    """Boolean per row of index['frame'] for the same query as filter_positions"""
+    lo, hi, hits = match_rows(index, start, end, **selections)
+    mask = np.zeros(len(index['frame']), dtype=bool)
+    mask[lo:hi] = True if hits is None else hits
+    return mask
+
+
+def filter_rows(index, start=None, end=None, **selections):
+    """Rows of index['frame'] matching the query, in date order"""
+    lo, hi, hits = match_rows(index, start, end, **selections)
+    if hits is None:
+        return index['frame'].iloc[lo:hi]
+    return index['frame'].take(lo + np.flatnonzero(hits))
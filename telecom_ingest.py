@@ -0,0 +1,320 @@
+import argparse
+import glob
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+from telecom_cache import (AGGREGATES, ENTRY_TABLES, aggregate_path, derive_subscribers, entry_dir,
+                           read_entry_table, save_entry, source_fingerprint, write_entry)
+from telecom_cleaning import (clean_billing, clean_outages, clean_subscribers, clean_tickets, clean_usage,
+                              data_usage_stats)
+from telecom_config import CLEANED_CACHE_DIR, DATA_DIR, INCOMING_DIR, STORAGE_FORMAT
+from telecom_cubes import (USAGE_DAILY_KEYS, USAGE_MEASURES, build_usage_daily, extend_activity_index,
+                           extend_date_range, extend_ops_cube, extend_revenue_cube, extend_usage_cube, merge_cells)
+from telecom_model import denormalize_billing, denormalize_tickets, denormalize_usage
+from telecom_schema import TABLE_NAMES, append_rows, apply_schema, encode_ids
+from telecom_storage import (append_path, decode_categories, read_table, resolve_format, table_columns,
+                             write_table)
+from telecom_streaming import grow_seen
+
+# Incremental ingestion of new record batches.
+#
+# Batches are dropped into <incoming>/<dataset>/ as CSV or Parquet files with
+# the dataset's columns. Each run cleans only the new rows, with the same
+# per-table rules as a full load, then:
+#   - appends the raw batch to the stored dataset as <dataset>/append-*.<fmt>
+#     (read back after the main file by read_table), so a full rebuild sees it
+#   - appends the cleaned rows to the persisted cleaned tables and adds new
+#     usage to the daily usage rollup
+#   - adds them to the persisted revenue/ops/usage cubes and activity index
+# and moves the batch files to <incoming>/<dataset>/processed/.
+#
+# Ids already stored (raw, so including rows cleaning dropped) win over
+# re-sent ones, as with drop_duplicates(keep='first') on a full load. New
+# usage is imputed from per-subscriber averages over all stored and new usage,
+# and earlier imputed rows of subscribers whose average moved are imputed
+# again, so the caches match a full rebuild.
+#
+# What that needs from the stored data is kept as ingest state in
+# <data_dir>/.ingest_state.pkl: a bitmap of seen bill and ticket ids, the
+# per-subscriber usage sums and counts, and the imputed usage rows. Each run
+# reads and updates only the state; it is rebuilt from the stored datasets
+# with one full pass when they changed other than through ingest.
+
+# Appendable datasets and their dedup key
+INGEST_TABLES = {
+    'billing': 'bill_id',
+    'tickets': 'ticket_id',
+    'usage_records': None,
+    'network_outages': None,
+}
+
+# Ingest state file in the data directory, and the usage columns it keeps per imputed row
+INGEST_STATE = '.ingest_state.pkl'
+IMPUTED_COLUMNS = ['usage_id', 'subscriber_id', 'usage_date', 'data_usage_gb']
+
+# Stand-in for bills or tickets with no new rows, for the activity index
+NO_EVENTS = pd.DataFrame({
+    'subscriber_id': pd.Series(dtype='int64'),
+    'billing_month': pd.Series(dtype='datetime64[ms]'),
+    'ticket_date': pd.Series(dtype='datetime64[ms]'),
+})
+
+
+def incoming_batches(name, incoming_dir=INCOMING_DIR):
+    """Batch files waiting for a dataset, oldest name first"""
+    pattern = os.path.join(incoming_dir, name, '*')
+    return sorted(p for p in glob.glob(pattern) if p.endswith(('.csv', '.parquet')))
+
+
+def read_batch(path):
+    if path.endswith('.parquet'):
+        return decode_categories(pd.read_parquet(path))
+    return pd.read_csv(path)
+
+
+def read_batches(name, paths, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """New rows for a dataset, checked against its stored columns"""
+    columns = table_columns(name, data_dir, fmt)
+    frames = []
+    for path in paths:
+        batch = read_batch(path)
+        if set(batch.columns) != set(columns):
+            raise ValueError(f"{path}: expected columns {', '.join(columns)}")
+        frames.append(batch[columns])
+    return pd.concat(frames, ignore_index=True)
+
+
+def state_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, INGEST_STATE)
+
+
+def build_state(subscribers, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Ingest state from one pass over the stored datasets"""
+    seen = {}
+    for name, id_col in INGEST_TABLES.items():
+        if id_col is not None:
+            keys = encode_ids(read_table(name, data_dir, fmt, columns=[id_col])[id_col], id_col).astype(np.int64)
+            seen[id_col] = grow_seen(np.zeros(0, dtype=bool), keys)
+            seen[id_col][keys] = True
+    usage = read_table('usage_records', data_dir, fmt, columns=IMPUTED_COLUMNS)
+    stats = data_usage_stats(usage)
+    missing = usage[usage['data_usage_gb'].isna()]
+    return {
+        'sources': source_fingerprint(data_dir, fmt),
+        'seen': seen,
+        'usage_stats': stats,
+        'imputed': clean_usage(missing.copy(), subscribers, stats)[IMPUTED_COLUMNS],
+    }
+
+
+def load_state(subscribers, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Saved ingest state, or a fresh one if it is missing or the stored
+    datasets changed since it was saved
+    """
+    try:
+        state = pd.read_pickle(state_path(data_dir))
+        if state['sources'] == source_fingerprint(data_dir, fmt):
+            return state
+    except (OSError, EOFError, KeyError, ValueError):
+        pass
+    return build_state(subscribers, data_dir, fmt)
+
+
+def save_state(state, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Persist the state for the stored datasets as they are now"""
+    state['sources'] = source_fingerprint(data_dir, fmt)
+    path = state_path(data_dir)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    pd.to_pickle(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def clean_usage_batch(raw, subscribers, state):
+    """New usage cleaned with the updated per-subscriber averages, and the
+    earlier imputed rows whose average moved, imputed again
+
+    Returns (cleaned, reimputed); reimputed has the new data_usage_gb of each
+    earlier row and its change.
+    """
+    batch_stats = data_usage_stats(raw)
+    stats = state['usage_stats'].add(batch_stats, fill_value=0)
+    imputed = state['imputed']
+    moved = imputed['subscriber_id'].isin(batch_stats.index[batch_stats['count'] > 0]).to_numpy()
+    earlier = imputed[moved]
+    reimputed = clean_usage(earlier.assign(data_usage_gb=np.nan), subscribers, stats)
+    reimputed['change'] = reimputed['data_usage_gb'].to_numpy() - earlier['data_usage_gb'].to_numpy()
+
+    cleaned = clean_usage(raw.copy(), subscribers, stats)
+    new_imputed = cleaned[cleaned['usage_id'].isin(raw.loc[raw['data_usage_gb'].isna(), 'usage_id'])]
+    state['imputed'] = pd.concat([imputed[~moved], reimputed[IMPUTED_COLUMNS], new_imputed[IMPUTED_COLUMNS]],
+                                 ignore_index=True)
+    state['usage_stats'] = stats
+    return cleaned, reimputed
+
+
+def clean_batch(name, raw, subscribers, state):
+    """Cleaning rules for one dataset, applied to new rows only. Returns the
+    cleaned rows and, for usage, the earlier rows imputed again (see
+    clean_usage_batch); state is updated with the batch.
+    """
+    id_col = INGEST_TABLES[name]
+    if id_col is not None:
+        keys = encode_ids(raw[id_col], id_col).astype(np.int64)
+        seen = state['seen'][id_col] = grow_seen(state['seen'][id_col], keys)
+        raw = raw[~seen[keys]]
+        seen[keys] = True
+
+    if name == 'billing':
+        return clean_billing(raw.copy()), None
+    if name == 'tickets':
+        return clean_tickets(raw.copy()), None
+    if name == 'network_outages':
+        return clean_outages(raw.copy()), None
+    return clean_usage_batch(raw, subscribers, state)
+
+
+def store_batch(name, raw, paths, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, incoming_dir=INCOMING_DIR):
+    """Append the raw batch to the stored dataset and retire its files"""
+    table_fmt = resolve_format(name, data_dir, fmt)
+    path = append_path(name, data_dir, table_fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_table(raw, name, path, table_fmt)
+
+    processed_dir = os.path.join(incoming_dir, name, 'processed')
+    os.makedirs(processed_dir, exist_ok=True)
+    for batch_path in paths:
+        shutil.move(batch_path, os.path.join(processed_dir, os.path.basename(batch_path)))
+
+
+def reimputed_daily(reimputed):
+    """Daily usage rollup cells changed by imputing earlier rows again: their
+    data usage moves, nothing else and no records are added
+    """
+    fix = apply_schema(reimputed[['usage_date', 'subscriber_id']], 'usage_records')
+    fix[USAGE_MEASURES] = 0
+    fix['data_usage_gb'] = reimputed['change'].to_numpy()
+    return build_usage_daily(fix).assign(records=0)
+
+
+def update_caches(cleaned, reimputed, old_key, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR):
+    """Append cleaned rows to the persisted cleaned tables, usage rollup and
+    aggregates, and apply the new values of reimputed usage rows.
+
+    Only entries for the sources as they were before this batch are updated,
+    and only pickled ('memory' mode) ones; anything else is rebuilt from the
+    stored datasets on its next load as usual.
+    """
+    old_entry = entry_dir(cache_dir, old_key)
+    stored = {name for name in ENTRY_TABLES if os.path.exists(os.path.join(old_entry, f'{name}.pkl'))}
+    if 'subscribers' not in stored:
+        return False
+
+    tables, deltas = {}, {}
+    for name in TABLE_NAMES:
+        if name in cleaned:
+            delta = apply_schema(cleaned[name], name)
+            if name in stored:
+                old = read_entry_table(old_entry, name)
+                tables[name] = append_rows(old, delta)
+                delta = tables[name].iloc[len(old):]
+            deltas[name] = delta
+    has_reimputed = reimputed is not None and len(reimputed) > 0
+    if has_reimputed and 'usage_records' in tables:
+        usage = tables['usage_records']
+        values = pd.Series(reimputed['data_usage_gb'].to_numpy(), index=encode_ids(reimputed['usage_id'], 'usage_id'))
+        rows = usage['usage_id'].isin(values.index)
+        usage.loc[rows, 'data_usage_gb'] = usage.loc[rows, 'usage_id'].map(values)
+    old_daily = read_entry_table(old_entry, 'usage_daily') if 'usage_daily' in stored else None
+    if 'usage_records' in deltas:
+        delta_daily = build_usage_daily(deltas['usage_records'])
+        if has_reimputed:
+            delta_daily = merge_cells(delta_daily, reimputed_daily(reimputed), USAGE_DAILY_KEYS)
+        if old_daily is not None:
+            tables['usage_daily'] = merge_cells(old_daily, delta_daily, USAGE_DAILY_KEYS)
+    new_key = source_fingerprint(data_dir, fmt)
+
+    old_aggregates = {name: aggregate_path(cache_dir, name, old_key) for name in AGGREGATES}
+    old_aggregates = {name: path for name, path in old_aggregates.items() if os.path.exists(path)}
+    if old_aggregates:
+        subscribers = derive_subscribers(read_entry_table(old_entry, 'subscribers'))
+        billing = denormalize_billing(deltas['billing'], subscribers) if 'billing' in deltas else NO_EVENTS
+        tickets = denormalize_tickets(deltas['tickets'], subscribers) if 'tickets' in deltas else NO_EVENTS
+        extend = {
+            'revenue_cube': lambda cube: extend_revenue_cube(cube, billing),
+            'ops_cube': lambda cube: extend_ops_cube(cube, tickets),
+            'activity_index': lambda index: extend_activity_index(index, subscribers, billing, tickets),
+            'usage_cube': lambda cube: extend_usage_cube(cube, old_daily, denormalize_usage(delta_daily, subscribers)),
+            'date_range': lambda date_range: extend_date_range(date_range, billing, tickets),
+        }
+        changed = {
+            'revenue_cube': 'billing' in deltas,
+            'ops_cube': 'tickets' in deltas,
+            'activity_index': 'billing' in deltas or 'tickets' in deltas,
+            'usage_cube': 'usage_records' in deltas,
+            'date_range': 'billing' in deltas or 'tickets' in deltas,
+        }
+        for name, path in old_aggregates.items():
+            if not changed[name]:
+                aggregate = pd.read_pickle(path)
+            elif name != 'usage_cube' or old_daily is not None:
+                aggregate = extend[name](pd.read_pickle(path))
+            else:
+                # new usage can only be added next to the rollup the cube was built from
+                continue
+            save_entry(aggregate, aggregate_path(cache_dir, name, new_key))
+
+    write_entry(tables, entry_dir(cache_dir, new_key), link_from=old_entry)
+    return True
+
+
+def ingest(data_dir=DATA_DIR, incoming_dir=INCOMING_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR):
+    """Ingest every waiting batch; returns {dataset: (rows received, rows kept)}"""
+    batches = {name: incoming_batches(name, incoming_dir) for name in INGEST_TABLES}
+    batches = {name: paths for name, paths in batches.items() if paths}
+    if not batches:
+        return {}
+
+    old_key = source_fingerprint(data_dir, fmt)
+    subscribers = clean_subscribers(read_table('subscribers', data_dir, fmt))
+    state = load_state(subscribers, data_dir, fmt)
+    cleaned, counts, reimputed = {}, {}, None
+    for name, paths in batches.items():
+        raw = read_batches(name, paths, data_dir, fmt)
+        cleaned[name], redone = clean_batch(name, raw, subscribers, state)
+        reimputed = redone if redone is not None else reimputed
+        store_batch(name, raw, paths, data_dir, fmt, incoming_dir)
+        counts[name] = (len(raw), len(cleaned[name]))
+    save_state(state, data_dir, fmt)
+
+    update_caches(cleaned, reimputed, old_key, data_dir, fmt, cache_dir)
+    return counts
+
+
+def report(counts):
+    for name, (received, kept) in counts.items():
+        print(f"{name}: {received:,} rows received, {kept:,} kept after cleaning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new record batches to the stored datasets")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--incoming-dir', default=None,
+                        help="Drop directory (default: TELECOM_INCOMING_DIR or <data-dir>/incoming)")
+    parser.add_argument('--watch', type=float, default=None, metavar='SECONDS',
+                        help="Keep polling the drop directory at this interval")
+    args = parser.parse_args()
+    incoming_dir = args.incoming_dir or (INCOMING_DIR if args.data_dir == DATA_DIR else os.path.join(args.data_dir, 'incoming'))
+    cache_dir = CLEANED_CACHE_DIR if args.data_dir == DATA_DIR else os.path.join(args.data_dir, '.telecom_cache')
+
+    while True:
+        counts = ingest(args.data_dir, incoming_dir, cache_dir=cache_dir)
+        if counts:
+            report(counts)
+        elif args.watch is None:
+            print(f"No new batches in {incoming_dir}")
+        if args.watch is None:
+            break
+        time.sleep(args.watch)
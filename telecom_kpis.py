@@ -0,0 +1,231 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from telecom_cache import load_dataset
+from telecom_config import CLEANED_CACHE_DIR, DATA_DIR, STORAGE_FORMAT
+from telecom_cubes import active_mask
+from telecom_filters import build_filter_index, filter_mask, filter_rows
+from telecom_views import FILTER_INDEXES, executive_data, manager_data, selected_subscribers
+
+# Headless KPI engine: the Executive and Manager View KPIs for one filter
+# selection, with no Streamlit involved.
+#
+# Every function takes load(name), returning a dataset (see telecom_cache.py),
+# and index(name), returning a sidebar filter index (see FILTER_INDEXES). The
+# dashboard passes its cached loaders; batch jobs use headless_loaders. Filter
+# arguments are lists of selected values, as from the sidebar multiselects;
+# compute_kpis fills in the sidebar's full option lists for any left as None.
+#
+# `python telecom_kpis.py --by city plan_type month` computes the KPIs for
+# every combination of the given dimensions across a process pool and writes
+# one row per combination to Parquet or JSON.
+
+# Flat KPI values per selection, in output order
+KPI_COLUMNS = ['subscribers', 'total_revenue', 'arpu', 'retention_ratio', 'overdue_revenue', 'credit_adjustments',
+               'sla_rate', 'ticket_backlog', 'avg_resolution', 'total_outage_mins', 'linked_share',
+               'top_problem_zone', 'problem_zones']
+
+# Grid dimensions: compute_kpis argument, and the dataset and column their values come from
+DIMENSIONS = {
+    'city': ('cities', 'subscribers', 'city'),
+    'plan_type': ('plan_types', 'subscribers', 'plan_type'),
+    'plan_name': ('plan_names', 'subscribers', 'plan_name'),
+    'status': ('statuses', 'subscribers', 'status'),
+    'ticket_category': ('ticket_categories', 'ops_cube', 'ticket_category'),
+    'month': (None, 'date_range', None),
+}
+
+WORKERS = os.cpu_count() or 1
+
+
+def headless_loaders(data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR):
+    """(load, index) over the persisted caches, each dataset and filter index
+    built once per process
+    """
+    datasets, indexes = {}, {}
+
+    def load(name):
+        if name not in datasets:
+            datasets[name] = load_dataset(name, load, data_dir, fmt, cache_dir)
+        return datasets[name]
+
+    def index(name):
+        if name not in indexes:
+            dataset, columns, date_column = FILTER_INDEXES[name]
+            indexes[name] = build_filter_index(load(dataset), columns, date_column)
+        return indexes[name]
+
+    return load, index
+
+
+def filter_options(load):
+    """Values the sidebar offers for each filter, all selected by default"""
+    subscribers = load('subscribers')
+    return {
+        'cities': sorted(subscribers['city'].unique()),
+        'plan_types': ['Prepaid', 'Postpaid'],
+        'plan_names': sorted(subscribers['plan_name'].unique()),
+        'statuses': ['Active', 'Suspended', 'Churned'],
+        'ticket_categories': sorted(load('ops_cube')['ticket_category'].unique()),
+    }
+
+
+def select_subscribers(load, index, start, end, cities, plan_types, plan_names, statuses):
+    """Subscribers matching the attribute filters with billing or ticket
+    activity in [start, end], or all that match when none are active
+    """
+    initial = filter_mask(index('subscribers'), city=cities, plan_type=plan_types, plan_name=plan_names,
+                          status=statuses)
+    active = initial & active_mask(load('activity_index'), start, end)
+    return selected_subscribers(load('subscribers'), initial, active)
+
+
+def select_revenue(index, start, end, cities, plan_types, plan_names, statuses):
+    """Revenue cube cells in [start, end] matching the filters"""
+    return filter_rows(index('revenue'), start, end, city=cities, plan_type=plan_types, plan_name=plan_names,
+                       status=statuses)
+
+
+def select_ops(index, start, end, cities, plan_types, ticket_categories):
+    """Ops cube cells and outage rows in [start, end] matching the filters"""
+    ops = filter_rows(index('ops'), start, end, city=cities, plan_type=plan_types, ticket_category=ticket_categories)
+    outages = filter_rows(index('outages'), start, end, city=cities)
+    return ops, outages
+
+
+def compute_kpis(load, index, start=None, end=None, cities=None, plan_types=None, plan_names=None, statuses=None,
+                 ticket_categories=None):
+    """KPI_COLUMNS values for one filter selection; start and end default to
+    the whole date range, filters to everything the sidebar offers
+    """
+    min_date, max_date = load('date_range')
+    start = min_date if start is None else pd.Timestamp(start)
+    end = max_date if end is None else pd.Timestamp(end)
+    options = filter_options(load)
+    cities = options['cities'] if cities is None else cities
+    plan_types = options['plan_types'] if plan_types is None else plan_types
+    plan_names = options['plan_names'] if plan_names is None else plan_names
+    statuses = options['statuses'] if statuses is None else statuses
+    ticket_categories = options['ticket_categories'] if ticket_categories is None else ticket_categories
+
+    subscribers = select_subscribers(load, index, start, end, cities, plan_types, plan_names, statuses)
+    executive = executive_data(select_revenue(index, start, end, cities, plan_types, plan_names, statuses), subscribers)
+    ops, outages = select_ops(index, start, end, cities, plan_types, ticket_categories)
+    manager = manager_data(ops, outages, subscribers)
+    problem_zones = manager['zone_analysis']['Zone'].astype(str).tolist()
+
+    return {
+        'subscribers': len(subscribers),
+        'total_revenue': float(executive['total_revenue']),
+        'arpu': float(executive['arpu']),
+        'retention_ratio': float(executive['retention_ratio']),
+        'overdue_revenue': float(executive['overdue_revenue']),
+        'credit_adjustments': float(executive['credit_adjustments']),
+        'sla_rate': float(manager['sla_rate']),
+        'ticket_backlog': int(manager['ticket_backlog']),
+        'avg_resolution': float(manager['avg_resolution']),
+        'total_outage_mins': float(manager['total_outage_mins']),
+        'linked_share': float(manager['linked_share']),
+        'top_problem_zone': problem_zones[0] if problem_zones else None,
+        'problem_zones': problem_zones,
+    }
+
+
+def month_ranges(date_range):
+    """(label, start, end) per calendar month within the date range"""
+    min_date, max_date = date_range
+    ranges = []
+    for month in pd.period_range(min_date, max_date, freq='M'):
+        start = max(month.start_time, min_date)
+        end = min(month.end_time.normalize(), max_date)
+        ranges.append((str(month), start, end))
+    return ranges
+
+
+def filter_grid(load, dimensions):
+    """One (labels, compute_kpis arguments) pair per combination of the
+    values of each dimension
+    """
+    axes = []
+    for dimension in dimensions:
+        argument, dataset, column = DIMENSIONS[dimension]
+        if dimension == 'month':
+            axes.append([({dimension: label}, {'start': start, 'end': end})
+                         for label, start, end in month_ranges(load(dataset))])
+        else:
+            values = sorted(load(dataset)[column].dropna().astype(str).unique())
+            axes.append([({dimension: value}, {argument: [value]}) for value in values])
+
+    grid = []
+    for combination in itertools.product(*axes):
+        labels, arguments = {}, {}
+        for label, argument in combination:
+            labels.update(label)
+            arguments.update(argument)
+        grid.append((labels, arguments))
+    return grid
+
+
+# Per-process loaders for pool workers, set by init_worker
+_loaders = None
+
+
+def init_worker(data_dir, fmt, cache_dir):
+    global _loaders
+    _loaders = headless_loaders(data_dir, fmt, cache_dir)
+
+
+def grid_kpis(cell):
+    """KPI row for one grid cell, in a worker"""
+    labels, arguments = cell
+    return {**labels, **compute_kpis(*_loaders, **arguments)}
+
+
+def run_grid(dimensions, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR, workers=WORKERS):
+    """KPIs for every combination of dimensions, one row each, computed
+    in-process or across a process pool
+    """
+    # loading here first also fills the on-disk caches the workers start from
+    load, _ = headless_loaders(data_dir, fmt, cache_dir)
+    for name in ['subscribers', 'activity_index', 'revenue_cube', 'ops_cube', 'network_outages']:
+        load(name)
+    grid = filter_grid(load, dimensions)
+
+    if workers <= 1:
+        init_worker(data_dir, fmt, cache_dir)
+        rows = [grid_kpis(cell) for cell in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(data_dir, fmt, cache_dir)) as pool:
+            rows = list(pool.map(grid_kpis, grid, chunksize=max(1, len(grid) // (workers * 4))))
+    return pd.DataFrame(rows, columns=list(dimensions) + KPI_COLUMNS)
+
+
+def write_kpis(kpis, path):
+    """KPI rows to Parquet, or JSON records for a .json path"""
+    if path.endswith('.json'):
+        kpis.to_json(path, orient='records', indent=2)
+    else:
+        kpis.to_parquet(path, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute dashboard KPIs for every combination of filter values")
+    parser.add_argument('--by', nargs='+', default=['city', 'plan_type', 'month'], choices=list(DIMENSIONS),
+                        help="Dimensions to combine (default: city plan_type month)")
+    parser.add_argument('--output', default='kpi_results.parquet', help="Parquet file, or .json for JSON records")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+    cache_dir = CLEANED_CACHE_DIR if args.data_dir == DATA_DIR else os.path.join(args.data_dir, '.telecom_cache')
+
+    started = time.perf_counter()
+    kpis = run_grid(args.by, args.data_dir, cache_dir=cache_dir, workers=args.workers)
+    write_kpis(kpis, args.output)
+    elapsed = time.perf_counter() - started
+    print(f"{len(kpis):,} filter combinations in {elapsed:.2f}s ({args.workers} workers) -> {args.output}")
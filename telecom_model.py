@@ -0,0 +1,53 @@
+import pandas as pd
+
+# Subscriber attributes copied onto each fact row at load time, so dashboard
+# charts group billing and tickets directly instead of merging per rerun.
+BILLING_ATTRIBUTES = ['plan_type', 'plan_name', 'city', 'zone', 'status', 'service_tier']
+TICKET_ATTRIBUTES = ['city', 'zone', 'plan_type', 'service_tier']
+USAGE_ATTRIBUTES = ['city', 'zone', 'plan_type', 'plan_name', 'status']
+
+
+def fill_from(series, other):
+    """series.fillna(other), widening categories when needed"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        new = set(other.dropna().unique()) - set(series.cat.categories)
+        if new:
+            series = series.cat.add_categories(sorted(new))
+    return series.fillna(other)
+
+
+def denormalize_billing(billing, subscribers):
+    """Billing rows carrying their subscriber's plan, location, status and tier"""
+    return billing.merge(
+        subscribers[['subscriber_id'] + BILLING_ATTRIBUTES],
+        on='subscriber_id',
+        how='left',
+        validate='many_to_one'
+    )
+
+
+def denormalize_tickets(tickets, subscribers):
+    """Ticket rows carrying their subscriber's plan type and tier.
+
+    Tickets keep their own city/zone; the subscriber's only fills gaps.
+    """
+    tickets = tickets.merge(
+        subscribers[['subscriber_id'] + TICKET_ATTRIBUTES],
+        on='subscriber_id',
+        how='left',
+        suffixes=('', '_sub'),
+        validate='many_to_one'
+    )
+    tickets['city'] = fill_from(tickets['city'], tickets['city_sub'])
+    tickets['zone'] = fill_from(tickets['zone'], tickets['zone_sub'])
+    return tickets.drop(['city_sub', 'zone_sub'], axis=1)
+
+
+def denormalize_usage(usage_daily, subscribers):
+    """Daily usage rollup rows carrying their subscriber's plan, location and status"""
+    return usage_daily.merge(
+        subscribers[['subscriber_id'] + USAGE_ATTRIBUTES],
+        on='subscriber_id',
+        how='left',
+        validate='many_to_one'
+    )
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from telecom_config import OUTAGE_TICKET_WINDOW_HOURS
+
+# Outage -> ticket attribution.
+#
+# A ticket is linked to an outage when it was raised in the same city and zone
+# between the day the outage started and `window_hours` after it ended.
+# Tickets carry only a date, so the window opens at midnight on the start day.
+#
+# Outages are sorted by start within each (city, zone), and each gets the
+# furthest window end reached so far in that order (a running max), with the
+# outage that reached it. One backward merge_asof then finds, for every ticket,
+# the last outage in its zone that started on or before the ticket date. The
+# ticket is covered by some outage exactly when that running max reaches its
+# date, and it goes to the covering outage whose window ends last. The cost is
+# a sort and a binary search per ticket, never tickets x outages, so it works
+# on millions of ticket rows or on ops cube cells weighted by their `tickets`.
+
+
+def zone_keys(outages, tickets):
+    """Integer (city, zone) keys for outages and tickets; tickets in zones
+    without outages get -1
+    """
+    pairs = pd.MultiIndex.from_arrays([outages['city'].astype(str), outages['zone'].astype(str)])
+    keys = pairs.unique()
+    ticket_pairs = pd.MultiIndex.from_arrays([tickets['city'].astype(str), tickets['zone'].astype(str)])
+    return keys.get_indexer(pairs), keys.get_indexer(ticket_pairs)
+
+
+def outage_windows(outages, window_hours=OUTAGE_TICKET_WINDOW_HOURS):
+    """Each outage's attribution window: from midnight of its start day to
+    window_hours after it ended. Missing times fall back to outage_date and
+    the recorded duration.
+    """
+    start = outages['outage_start_time'].fillna(outages['outage_date'])
+    end = outages['outage_end_time'].fillna(start + pd.to_timedelta(outages['outage_duration_mins'], unit='m'))
+    end = end.fillna(start)
+    return pd.DataFrame({
+        'window_start': start.dt.normalize(),
+        'window_end': end + pd.Timedelta(hours=window_hours),
+    }, index=outages.index)
+
+
+def attribute_tickets(tickets, outages, window_hours=OUTAGE_TICKET_WINDOW_HOURS):
+    """outage_id each ticket row is attributed to, aligned with tickets (NA
+    when no outage in its city and zone covers its date)
+    """
+    outage_key, ticket_key = zone_keys(outages, tickets)
+    windows = outage_windows(outages, window_hours)
+    right = pd.DataFrame({
+        'key': outage_key,
+        'window_start': windows['window_start'].to_numpy(),
+        'window_end': windows['window_end'].to_numpy(),
+        'outage_id': outages['outage_id'].to_numpy(),
+    }).dropna(subset=['window_start'])
+    right = right.sort_values(['key', 'window_start', 'window_end'], kind='stable')
+
+    # furthest window end so far within each zone, and the outage reaching it
+    right['reach'] = right.groupby('key')['window_end'].cummax()
+    right['reach_id'] = right['outage_id'].where(right['window_end'] == right['reach'])
+    right['reach_id'] = right.groupby('key')['reach_id'].ffill()
+    right = right.sort_values('window_start', kind='stable')
+
+    left = pd.DataFrame({
+        'key': ticket_key,
+        'ticket_date': tickets['ticket_date'].to_numpy(),
+        'row': np.arange(len(tickets)),
+    })
+    left = left[(left['key'] >= 0) & left['ticket_date'].notna()].sort_values('ticket_date', kind='stable')
+    if left['ticket_date'].dtype != right['window_start'].dtype:
+        left['ticket_date'] = left['ticket_date'].astype(right['window_start'].dtype)
+
+    matched = pd.merge_asof(left, right[['key', 'window_start', 'reach', 'reach_id']],
+                            left_on='ticket_date', right_on='window_start', by='key', direction='backward')
+    covered = matched['ticket_date'] <= matched['reach']
+
+    attributed = pd.Series(pd.NA, index=tickets.index, dtype='Int64')
+    attributed.iloc[matched.loc[covered, 'row'].to_numpy()] = matched.loc[covered, 'reach_id'].astype('int64').to_numpy()
+    return attributed
+
+
+def outage_ticket_counts(tickets, outages, window_hours=OUTAGE_TICKET_WINDOW_HOURS, weight=None):
+    """Outages with the number of tickets attributed to each ('linked_tickets').
+
+    With weight, tickets are aggregated rows (e.g. ops cube cells) and each
+    counts for its weight column.
+    """
+    attributed = attribute_tickets(tickets, outages, window_hours)
+    counts = tickets[weight] if weight is not None else pd.Series(1, index=tickets.index)
+    linked = counts.groupby(attributed).sum()
+    outages = outages.copy()
+    outages['linked_tickets'] = outages['outage_id'].map(linked).fillna(0).astype('int64')
+    return outages
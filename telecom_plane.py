@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from telecom_cache import load_datasets, source_fingerprint
+from telecom_config import CLEANED_CACHE_DIR, DATA_DIR, DATA_PLANE_DIR, STORAGE_FORMAT
+from telecom_cubes import CUBE_VERSION
+from telecom_storage import pa, require_pyarrow
+from telecom_tiers import rules_version
+from telecom_views import FILTER_INDEXES
+
+# Shared-memory data plane for multi-process deployments (TELECOM_DATA_PLANE=1).
+#
+# One publisher process (`python telecom_plane.py publish --watch 60`) loads
+# the datasets the dashboard reads and writes each as an uncompressed Arrow IPC
+# file into a version directory under DATA_PLANE_DIR (/dev/shm by default, so
+# the files live in shared memory). Once the directory is complete, a CURRENT
+# file naming it is swapped in with os.replace, so readers see either the old
+# version or the new one, never a partial write.
+#
+# Dashboard workers memory-map the files of the version named by CURRENT and
+# wrap the Arrow buffers as pandas columns without copying: every worker shares
+# one physical copy through the page cache, and the frames are read-only. The
+# last two versions stay attached, so a rerun that started on the old version
+# finishes on it; the publisher keeps them on disk for the same reason.
+
+# What the dashboard loads: the sidebar tables and the per-view aggregates
+PLANE_DATASETS = ['subscribers', 'network_outages', 'ops_cube', 'revenue_cube', 'usage_cube',
+                  'activity_index', 'date_range']
+
+# Versions kept on disk and attached per worker
+KEEP_VERSIONS = 2
+
+# Published frames are sorted by their filter index date column, so
+# build_filter_index uses them as they are instead of keeping a sorted copy
+SORT_COLUMNS = {dataset: column for dataset, _, column in FILTER_INDEXES.values() if column is not None}
+
+_lock = threading.Lock()
+_attached = OrderedDict()
+
+
+def data_version(data_dir=DATA_DIR, fmt=STORAGE_FORMAT, today=None):
+    """Version of the published data: sources, cube logic, tier rules and
+    (through tenure) the date, as for the persisted aggregates
+    """
+    today = today or date.today()
+    key = f'{source_fingerprint(data_dir, fmt)}|cubes v{CUBE_VERSION}|{rules_version()}|{today.isoformat()}'
+    return 'v-' + hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def to_ipc_table(obj):
+    """Arrow table for one dataset. Frames keep their dtypes through pandas
+    metadata; the activity index becomes its key column with the scalars as
+    metadata, the date range metadata only.
+    """
+    if isinstance(obj, pd.DataFrame):
+        table, meta = pa.Table.from_pandas(obj), {'kind': 'frame'}
+    elif isinstance(obj, dict):
+        arrays = {name: value for name, value in obj.items() if isinstance(value, np.ndarray)}
+        scalars = {name: int(value) for name, value in obj.items() if name not in arrays}
+        table, meta = pa.table(arrays), {'kind': 'dict', 'scalars': scalars}
+    else:
+        table, meta = pa.table({}), {'kind': 'timestamps', 'values': [pd.Timestamp(v).isoformat() for v in obj]}
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), b'telecom_plane': json.dumps(meta)})
+
+
+def from_ipc_table(table):
+    """Dataset from a memory-mapped Arrow table, sharing its buffers"""
+    meta = json.loads(table.schema.metadata[b'telecom_plane'])
+    if meta['kind'] == 'frame':
+        # split_blocks keeps each column its own block so none are copied together
+        return table.to_pandas(split_blocks=True)
+    if meta['kind'] == 'dict':
+        arrays = {name: table.column(name).to_numpy() for name in table.column_names}
+        return {**arrays, **{name: np.int64(value) for name, value in meta['scalars'].items()}}
+    return tuple(pd.Timestamp(value) for value in meta['values'])
+
+
+def write_ipc(obj, path):
+    table = to_ipc_table(obj)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def current_version(plane_dir=DATA_PLANE_DIR):
+    """Published version named by CURRENT; FileNotFoundError before the first
+    publish
+    """
+    with open(os.path.join(plane_dir, 'CURRENT')) as f:
+        return f.read().strip()
+
+
+def publish(plane_dir=DATA_PLANE_DIR, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR,
+            force=False):
+    """Publish the current data if its version is not the one in CURRENT;
+    returns the version published, or None when already current
+    """
+    require_pyarrow()
+    version = data_version(data_dir, fmt)
+    try:
+        if current_version(plane_dir) == version and not force:
+            return None
+    except FileNotFoundError:
+        pass
+
+    datasets = load_datasets(PLANE_DATASETS, data_dir, fmt, cache_dir)
+    os.makedirs(plane_dir, exist_ok=True)
+    path = os.path.join(plane_dir, version)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, obj in datasets.items():
+        if name in SORT_COLUMNS:
+            obj = obj.sort_values(SORT_COLUMNS[name], kind='stable', na_position='last')
+        write_ipc(obj, os.path.join(tmp_path, f'{name}.arrow'))
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+    # swap the pointer, then drop versions no worker should still be reading
+    pointer = os.path.join(plane_dir, 'CURRENT')
+    with open(f'{pointer}.{os.getpid()}.tmp', 'w') as f:
+        f.write(version)
+    os.replace(f'{pointer}.{os.getpid()}.tmp', pointer)
+    prune_versions(plane_dir, version)
+    return version
+
+
+def prune_versions(plane_dir, current):
+    """Remove all but the KEEP_VERSIONS newest version directories. Workers
+    still mapping a removed file keep its pages until they let go of it.
+    """
+    versions = [os.path.join(plane_dir, name) for name in os.listdir(plane_dir)
+                if name.startswith('v-') and not name.endswith('.tmp')]
+    versions.sort(key=os.path.getmtime, reverse=True)
+    for stale in versions[KEEP_VERSIONS:]:
+        if os.path.basename(stale) != current:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def attach(name, version, plane_dir=DATA_PLANE_DIR):
+    """One published dataset of the given version, memory-mapped on first use.
+
+    Attaching a new version drops the oldest one once more than KEEP_VERSIONS
+    are attached, releasing its mappings when nothing else holds its frames.
+    """
+    with _lock:
+        datasets = _attached.get(version)
+        if datasets is None:
+            datasets = _attached[version] = {}
+            while len(_attached) > KEEP_VERSIONS:
+                _attached.popitem(last=False)
+        if name not in datasets:
+            source = pa.memory_map(os.path.join(plane_dir, version, f'{name}.arrow'), 'r')
+            datasets[name] = from_ipc_table(pa.ipc.open_file(source).read_all())
+        return datasets[name]
+
+
+def memory_mb():
+    """Private (anonymous) and shared resident memory of this process"""
+    fields = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(('RssAnon:', 'RssShmem:', 'RssFile:')):
+                    fields[line.split(':')[0]] = int(line.split()[1]) / 1024
+    except OSError:
+        return None, None
+    return fields.get('RssAnon'), fields.get('RssShmem', 0) + fields.get('RssFile', 0)
+
+
+def check_plane(plane_dir=DATA_PLANE_DIR, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, cache_dir=CLEANED_CACHE_DIR):
+    """Compare each attached dataset of the current version with a direct
+    load; returns (mismatches, private MB, shared MB) with the memory taken
+    by attaching
+    """
+    version = current_version(plane_dir)
+    private_before, shared_before = memory_mb()
+    attached_sets = {name: attach(name, version, plane_dir) for name in PLANE_DATASETS}
+    private_after, shared_after = memory_mb()
+    if private_before is None or private_after is None:
+        private = shared = None
+    else:
+        private, shared = private_after - private_before, shared_after - shared_before
+
+    loaded = load_datasets(PLANE_DATASETS, data_dir, fmt, cache_dir)
+    mismatches = []
+    for name in PLANE_DATASETS:
+        expected, attached = loaded[name], attached_sets[name]
+        if isinstance(expected, pd.DataFrame):
+            if name in SORT_COLUMNS:
+                expected = expected.sort_values(SORT_COLUMNS[name], kind='stable', na_position='last')
+            same = expected.equals(attached) and (expected.dtypes == attached.dtypes).all()
+        elif isinstance(expected, dict):
+            same = expected.keys() == attached.keys() and all(np.array_equal(expected[k], attached[k]) for k in expected)
+        else:
+            same = tuple(expected) == attached
+        if not same:
+            mismatches.append(f'{name}: attached data differs from a direct load')
+    return mismatches, private, shared
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish the dashboard datasets as shared memory-mapped Arrow files")
+    parser.add_argument('command', choices=['publish', 'check'])
+    parser.add_argument('--plane-dir', default=DATA_PLANE_DIR)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--watch', type=float, default=None, metavar='SECONDS',
+                        help="Keep republishing when the data version changes, polling at this interval")
+    parser.add_argument('--force', action='store_true', help="Publish even if the version is already current")
+    args = parser.parse_args()
+    cache_dir = CLEANED_CACHE_DIR if args.data_dir == DATA_DIR else os.path.join(args.data_dir, '.telecom_cache')
+
+    if args.command == 'check':
+        mismatches, private, shared = check_plane(args.plane_dir, args.data_dir, cache_dir=cache_dir)
+        print('\n'.join(mismatches) if mismatches else "Attached datasets match a direct load")
+        if private is not None:
+            print(f"Attaching took {private:,.1f} MB private and {shared:,.1f} MB shared memory")
+    else:
+        while True:
+            version = publish(args.plane_dir, args.data_dir, cache_dir=cache_dir, force=args.force)
+            if version:
+                print(f"Published {version} to {args.plane_dir}")
+            elif args.watch is None:
+                print(f"{current_version(args.plane_dir)} is already published")
+            if args.watch is None:
+                break
+            args.force = False
+            time.sleep(args.watch)
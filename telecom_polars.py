@@ -0,0 +1,191 @@
+import pandas as pd
+
+from telecom_config import DATA_DIR, STORAGE_FORMAT
+from telecom_storage import TABLE_SCHEMAS
+from telecom_streaming import source_paths
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Polars cleaning backend (TELECOM_CLEANING_MODE=polars).
+#
+# The same cleaning rules as telecom_cleaning.py, written as Polars lazy
+# queries: each table's source files are scanned, every step becomes part of
+# one query plan that Polars optimizes (projection pushdown, fused string and
+# date expressions, the activation date join) and runs on all cores, and the
+# result is handed back as a pandas frame. Output, index included, matches the
+# pandas cleaner exactly; tests/test_polars.py checks this.
+
+# Row position in the stored dataset, kept as the pandas index
+ROW = '__row'
+
+# Rows sampled to infer CSV column types; date and enum columns are always read
+# as strings, like pd.read_csv does
+INFER_ROWS = 10_000
+
+
+def require_polars():
+    if pl is None:
+        raise ImportError("TELECOM_CLEANING_MODE=polars needs polars: pip install polars")
+
+
+def scan_table(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Lazy scan of one dataset's files, appended batches included, with row positions"""
+    require_polars()
+    paths, fmt = source_paths(name, data_dir, fmt)
+    if fmt == 'parquet':
+        scans = [pl.scan_parquet(p) for p in paths]
+    else:
+        # files are written by to_csv, so missing values are empty fields
+        strings = {col: pl.String for col in TABLE_SCHEMAS[name]['dates'] + TABLE_SCHEMAS[name]['categories']}
+        scans = [pl.scan_csv(p, infer_schema_length=INFER_ROWS, schema_overrides=strings) for p in paths]
+    scan = pl.concat(scans, how='vertical_relaxed')
+    # dictionary-encoded enums come back as plain strings, as with read_table
+    scan = scan.with_columns(pl.col(pl.Categorical).cast(pl.String))
+    return scan.with_row_index(ROW)
+
+
+def parse_dates(scan, columns, strict=()):
+    """Date strings parsed to datetimes (missing when unparseable, unless the
+    column is in strict); columns already stored as datetimes pass through
+    """
+    schema = scan.collect_schema()
+    parsed = []
+    for col in columns:
+        if schema[col] == pl.String:
+            parsed.append(pl.col(col).str.to_datetime(time_unit='us', strict=col in strict))
+    return scan.with_columns(parsed) if parsed else scan
+
+
+def dedup(scan, id_col):
+    return scan.unique(subset=id_col, keep='first', maintain_order=True)
+
+
+def capitalize(expr):
+    """str.capitalize: first character upper case, the rest lower case"""
+    return pl.concat_str([expr.str.slice(0, 1).str.to_uppercase(), expr.str.slice(1).str.to_lowercase()])
+
+
+def clean_subscribers(scan):
+    """Dedup, label standardization and date parsing for subscribers"""
+    # 1. Remove duplicates
+    scan = dedup(scan, 'subscriber_id')
+
+    # 2. Standardize labels
+    plan_type = capitalize(pl.col('plan_type').str.strip_chars().str.to_lowercase().str.replace_all('-', '', literal=True))
+    scan = scan.with_columns(
+        pl.when(plan_type.str.contains('(?i)post')).then(pl.lit('Postpaid'))
+        .when(plan_type.str.contains('(?i)pre')).then(pl.lit('Prepaid'))
+        .otherwise(plan_type).alias('plan_type'),
+        pl.col('city').str.replace_all('-', ' ', literal=True).str.replace_all('AbuDhabi', 'Abu Dhabi', literal=True)
+        .replace('AD', 'Abu Dhabi').alias('city'),
+    )
+    return parse_dates(scan, ['activation_date'])
+
+
+def subscriber_averages(scan):
+    """Per-subscriber mean data_usage_gb as a lazy frame.
+
+    Averaged with the pandas groupby (compensated summation) over the two
+    collected columns, so imputed values match the pandas cleaner to the bit;
+    Polars' own mean can differ in the last place.
+    """
+    usage = scan.select('subscriber_id', 'data_usage_gb').collect().to_pandas()
+    averages = usage.groupby('subscriber_id')['data_usage_gb'].mean().rename('subscriber_avg').reset_index()
+    return pl.from_pandas(averages, nan_to_null=True).lazy()
+
+
+def clean_usage(scan, subscribers):
+    """Imputation, outlier caps and activation date checks for usage records.
+
+    subscribers is the cleaned subscribers query.
+    """
+    # 3. Impute missing data_usage_gb
+    usage = pl.col('data_usage_gb')
+    scan = scan.join(subscriber_averages(scan), on='subscriber_id', how='left', maintain_order='left')
+    scan = scan.with_columns(usage.fill_null(pl.col('subscriber_avg')).fill_null(0)).drop('subscriber_avg')
+
+    # 4. Cap outliers
+    scan = scan.with_columns(pl.when(usage > 100).then(pl.lit(100.0)).otherwise(usage).alias('data_usage_gb'))
+
+    # 5. Remove impossible date sequences
+    scan = parse_dates(scan, ['usage_date'])
+    scan = scan.join(subscribers.select('subscriber_id', 'activation_date'), on='subscriber_id', how='left',
+                     maintain_order='left')
+    return scan.filter(pl.col('usage_date') >= pl.col('activation_date')).drop('activation_date')
+
+
+def clean_billing(scan):
+    """Dedup, outlier caps and negative bill removal for billing"""
+    # 1. Remove duplicates
+    scan = dedup(scan, 'bill_id')
+
+    # 4. Cap outliers, 6. remove negative bills
+    amount = pl.col('bill_amount')
+    scan = scan.with_columns(pl.when(amount > 2000).then(pl.lit(2000.0)).otherwise(amount).alias('bill_amount'))
+    scan = scan.filter(amount >= 0)
+    return parse_dates(scan, ['billing_month', 'payment_date'], strict=['billing_month'])
+
+
+def clean_tickets(scan):
+    """Dedup, status standardization and date checks for tickets"""
+    # 1. Remove duplicates
+    scan = dedup(scan, 'ticket_id')
+
+    # 2. Standardize labels
+    status = capitalize(pl.col('status').str.strip_chars())
+    scan = scan.with_columns(status.replace('Closed', 'Resolved').alias('status'))
+
+    # 5. Remove impossible date sequences
+    scan = parse_dates(scan, ['ticket_date', 'resolution_date'], strict=['ticket_date'])
+    resolution = pl.col('resolution_date')
+    return scan.with_columns(
+        pl.when(resolution < pl.col('ticket_date')).then(None).otherwise(resolution).alias('resolution_date')
+    )
+
+
+def clean_outages(scan):
+    """Missing duration calculation and date parsing for outages"""
+    # 7. Calculate missing outage durations
+    scan = parse_dates(scan, ['outage_start_time', 'outage_end_time', 'outage_date'])
+    duration = (pl.col('outage_end_time') - pl.col('outage_start_time')).dt.total_microseconds() / 1e6 / 60
+    return scan.with_columns(pl.col('outage_duration_mins').fill_null(duration))
+
+
+def clean_query(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Lazy query for one cleaned dataset"""
+    scan = scan_table(name, data_dir, fmt)
+    if name == 'subscribers':
+        return clean_subscribers(scan)
+    if name == 'usage_records':
+        return clean_usage(scan, clean_subscribers(scan_table('subscribers', data_dir, fmt)))
+    if name == 'billing':
+        return clean_billing(scan)
+    if name == 'tickets':
+        return clean_tickets(scan)
+    return clean_outages(scan)
+
+
+def to_pandas(df):
+    """Collected frame as the pandas cleaner returns it: string columns as
+    str and the stored row positions as index
+    """
+    frame = df.to_pandas()
+    for col in frame.columns:
+        if df.schema[col] == pl.String:
+            frame[col] = frame[col].astype('str')
+    rows = frame.pop(ROW).astype('int64')
+    # untouched tables keep a plain RangeIndex, as in pandas
+    frame.index = pd.RangeIndex(len(frame)) if rows.equals(pd.Series(range(len(frame)))) else pd.Index(rows.to_numpy())
+    return frame
+
+
+def polars_clean(names, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Cleaned datasets by name, as pandas frames. The queries run together,
+    so scans they share (subscribers for usage) are read once.
+    """
+    require_polars()
+    frames = pl.collect_all([clean_query(name, data_dir, fmt) for name in names])
+    return {name: to_pandas(frame) for name, frame in zip(names, frames)}
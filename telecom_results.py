@@ -0,0 +1,152 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from telecom_config import RESULT_CACHE_MB
+
+# Process-wide cache of per-view results, keyed by the sidebar filter values.
+#
+# Streamlit runs every session in the same process, so analysts picking the
+# same city/plan/date combination share one computed result. Entries are
+# evicted least recently used first once their estimated size passes
+# RESULT_CACHE_MB, and the whole cache is dropped when the data version (source
+# fingerprint, tier rules, query engine) changes. Cached results are shared
+# between sessions and must not be modified by callers.
+#
+# Figures are cached the same way, keyed by a fingerprint of the aggregated
+# data they are drawn from, so different filter selections with identical
+# chart inputs share one set of figures.
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_state = {'version': None, 'bytes': 0}
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'oversized': 0}
+
+
+def estimate_bytes(obj):
+    """Approximate memory held by a result: frames, series and arrays by their
+    buffers, containers by their contents
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, 'to_plotly_json'):
+        return estimate_bytes(obj.to_plotly_json())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(value) for value in obj)
+    return sys.getsizeof(obj)
+
+
+def data_fingerprint(*objs):
+    """Content hash of frames, series, arrays, containers and scalars"""
+    digest = hashlib.blake2b(digest_size=16)
+
+    def feed(obj):
+        if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+            if isinstance(obj, pd.DataFrame):
+                labels, dtypes = list(obj.columns), list(obj.dtypes)
+            else:
+                labels, dtypes = [obj.name], [obj.dtype]
+            digest.update(repr((type(obj).__name__, labels, dtypes)).encode())
+            digest.update(pd.util.hash_pandas_object(obj, index=not isinstance(obj, pd.Index)).to_numpy().tobytes())
+        elif isinstance(obj, np.ndarray):
+            digest.update(repr((obj.dtype, obj.shape)).encode())
+            digest.update(np.ascontiguousarray(obj).tobytes())
+        elif isinstance(obj, dict):
+            for name in sorted(obj, key=str):
+                feed(name)
+                feed(obj[name])
+        elif isinstance(obj, (list, tuple)):
+            digest.update(f'{type(obj).__name__}{len(obj)}'.encode())
+            for value in obj:
+                feed(value)
+        else:
+            digest.update(repr(obj).encode())
+
+    for obj in objs:
+        feed(obj)
+    return digest.hexdigest()
+
+
+def filter_key(view, start_dt, end_dt, **filters):
+    """Normalized cache key for one view and filter selection: selections are
+    order-independent, and dates are compared as timestamps
+    """
+    selections = tuple((name, tuple(sorted(map(str, values)))) for name, values in sorted(filters.items()))
+    return (view, pd.Timestamp(start_dt), pd.Timestamp(end_dt), selections)
+
+
+def _evict(budget):
+    """Drop least recently used entries until the cache fits budget (lock held)"""
+    while _entries and _state['bytes'] > budget:
+        _, (_, size) = _entries.popitem(last=False)
+        _state['bytes'] -= size
+        _stats['evictions'] += 1
+
+
+def cached_result(key, version, compute, budget_mb=None):
+    """compute() for key, reusing the stored result while version is unchanged.
+
+    Returns (result, hit). Results larger than the whole budget are returned
+    without being stored; a budget of 0 disables the cache.
+    """
+    budget = (RESULT_CACHE_MB if budget_mb is None else budget_mb) * 1e6
+    if budget <= 0:
+        return compute(), False
+    with _lock:
+        if version != _state['version']:
+            if _entries:
+                _stats['invalidations'] += 1
+            _entries.clear()
+            _state['version'], _state['bytes'] = version, 0
+        if key in _entries:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return _entries[key][0], True
+        _stats['misses'] += 1
+
+    # computed outside the lock; two sessions missing on one key both compute it
+    result = compute()
+    size = estimate_bytes(result)
+    with _lock:
+        if version != _state['version']:
+            return result, False
+        if size > budget:
+            _stats['oversized'] += 1
+            return result, False
+        if key in _entries:
+            _state['bytes'] -= _entries.pop(key)[1]
+        _entries[key] = (result, size)
+        _state['bytes'] += size
+        _evict(budget)
+    return result, False
+
+
+def result_cache_stats():
+    """Hit/miss/eviction counters plus current entries and size"""
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return {
+            **_stats,
+            'hit_rate': round(_stats['hits'] / lookups * 100, 1) if lookups else 0.0,
+            'entries': len(_entries),
+            'size_mb': round(_state['bytes'] / 1e6, 2),
+            'budget_mb': RESULT_CACHE_MB,
+        }
+
+
+def clear_results():
+    """Empty the cache and reset its counters"""
+    with _lock:
+        _entries.clear()
+        _state['version'], _state['bytes'] = None, 0
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,131 @@
+import pandas as pd
+
+import telecom_data_gen as gen
+
+TABLE_NAMES = ['subscribers', 'usage_records', 'billing', 'tickets', 'network_outages']
+
+# Known enum values per column, from the generator. Values outside these lists
+# (e.g. uncleaned labels) are kept as extra categories rather than dropped.
+CATEGORIES = {
+    'subscribers': {
+        'city': gen.CITIES,
+        'zone': gen.ZONES,
+        'plan_type': gen.PLAN_TYPES,
+        'plan_name': gen.PLAN_NAMES,
+        'status': gen.STATUSES,
+    },
+    'usage_records': {},
+    'billing': {
+        'payment_status': gen.PAYMENT_STATUSES,
+        'adjustment_reason': gen.ADJUSTMENT_REASONS,
+    },
+    'tickets': {
+        'ticket_channel': gen.TICKET_CHANNELS,
+        'ticket_category': gen.TICKET_CATEGORIES,
+        'priority': gen.PRIORITIES,
+        'status': gen.TICKET_STATUSES,
+        'assigned_team': gen.TEAMS,
+        'zone': gen.ZONES,
+        'city': gen.CITIES,
+    },
+    'network_outages': {
+        'zone': gen.ZONES,
+        'city': gen.CITIES,
+        'outage_type': gen.OUTAGE_TYPES,
+    },
+    'usage_daily': {},
+}
+
+# String ids stored as integer keys (SUB_00042 -> 42): prefix and padded width
+ID_COLUMNS = {
+    'subscriber_id': ('SUB_', 5),
+    'bill_id': ('BILL_', 6),
+    'ticket_id': ('TKT_', 6),
+    'usage_id': ('USG_', 6),
+    'outage_id': ('OUT_', 4),
+}
+
+
+def encode_ids(values, column):
+    """Integer keys from prefixed string ids"""
+    prefix, _ = ID_COLUMNS[column]
+    return pd.to_numeric(pd.Series(values).str.slice(len(prefix)), downcast='integer').values
+
+
+def decode_ids(keys, column):
+    """Prefixed string ids from integer keys (zero-padded as generated)"""
+    prefix, width = ID_COLUMNS[column]
+    return gen.make_ids(prefix, keys, width)
+
+
+def to_category(series, known):
+    """Category dtype over the known values plus any others present.
+
+    Categories are kept sorted so groupbys order the same as on strings.
+    """
+    extras = set(series.dropna().unique()) - set(known)
+    return series.astype(pd.CategoricalDtype(sorted(set(known) | extras)))
+
+
+def downcast(series):
+    """Smallest integer dtype that holds every value.
+
+    Floats stay float64: even when each value fits float32 exactly, sums over
+    float32 columns drift and would change the dashboard KPIs.
+    """
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+    return series
+
+
+def apply_schema(df, name):
+    """Category enums, integer id keys and downcast numerics for one table"""
+    df = df.copy()
+    for col, known in CATEGORIES[name].items():
+        df[col] = to_category(df[col], known)
+    for col in df.columns:
+        if col in ID_COLUMNS:
+            df[col] = encode_ids(df[col], col)
+        elif col not in CATEGORIES[name]:
+            df[col] = downcast(df[col])
+    return df
+
+
+def apply_schema_all(frames):
+    """apply_schema over (subscribers, usage, billing, tickets, outages)"""
+    return tuple(apply_schema(df, name) for df, name in zip(frames, TABLE_NAMES))
+
+
+def append_rows(df, delta):
+    """df followed by delta (both in this schema), keeping category columns
+    categorical, date columns in df's resolution and the index unique
+    """
+    start = df.index.max() + 1 if len(df) else 0
+    delta = delta.set_axis(pd.RangeIndex(start, start + len(delta)))
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and isinstance(delta[col].dtype, pd.CategoricalDtype):
+            categories = sorted(set(df[col].cat.categories) | set(delta[col].cat.categories))
+            df[col] = df[col].cat.set_categories(categories)
+            delta[col] = delta[col].cat.set_categories(categories)
+        elif pd.api.types.is_datetime64_dtype(df[col].dtype) and delta[col].dtype != df[col].dtype:
+            delta[col] = delta[col].astype(df[col].dtype)
+    return pd.concat([df, delta])
+
+
+def memory_report(before, after):
+    """Deep memory use per table before and after apply_schema, in MB"""
+    rows = []
+    for name, df_before, df_after in zip(TABLE_NAMES, before, after):
+        mb_before = df_before.memory_usage(deep=True).sum() / 1e6
+        mb_after = df_after.memory_usage(deep=True).sum() / 1e6
+        rows.append({'table': name, 'rows': len(df_after), 'before_mb': round(mb_before, 2),
+                     'after_mb': round(mb_after, 2), 'saved_pct': round(100 * (1 - mb_after / mb_before), 1)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from telecom_cleaning import clean_data, load_raw_data
+
+    cleaned = clean_data(*load_raw_data())
+    print(memory_report(cleaned, apply_schema_all(cleaned)).to_string(index=False))
@@ -0,0 +1,197 @@
+import argparse
+import glob
+import os
+import pandas as pd
+from datetime import datetime
+
+from telecom_config import DATA_DIR, STORAGE_FORMAT
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TABLES = ['subscribers', 'usage_records', 'billing', 'tickets', 'network_outages']
+
+# Date/timestamp and enum columns of each dataset. Columnar files store these
+# natively (timestamp and dictionary-encoded types) so they are never re-parsed.
+TABLE_SCHEMAS = {
+    'subscribers': {
+        'dates': ['activation_date'],
+        'categories': ['city', 'zone', 'plan_type', 'plan_name', 'status'],
+    },
+    'usage_records': {
+        'dates': ['usage_date'],
+        'categories': [],
+    },
+    'billing': {
+        'dates': ['billing_month', 'payment_date'],
+        'categories': ['payment_status', 'adjustment_reason'],
+    },
+    'tickets': {
+        'dates': ['ticket_date', 'resolution_date'],
+        'categories': ['ticket_channel', 'ticket_category', 'priority', 'status', 'assigned_team', 'zone', 'city'],
+    },
+    'network_outages': {
+        'dates': ['outage_date', 'outage_start_time', 'outage_end_time'],
+        'categories': ['zone', 'city', 'outage_type'],
+    },
+    # derived: daily usage rollup written next to cleaned tables
+    'usage_daily': {
+        'dates': ['usage_date'],
+        'categories': [],
+    },
+}
+
+EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet'}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet storage needs pyarrow: pip install pyarrow")
+
+
+def table_path(name, data_dir=DATA_DIR, fmt='csv'):
+    """Single-file path of a dataset, e.g. ./billing.parquet"""
+    return os.path.join(data_dir, f'{name}.{EXTENSIONS[fmt]}')
+
+
+def part_paths(name, data_dir=DATA_DIR, fmt='csv'):
+    """Part files written by `telecom_data_gen.py --parts`, in chunk order"""
+    return sorted(glob.glob(os.path.join(data_dir, name, f'part-*.{EXTENSIONS[fmt]}')))
+
+
+def append_paths(name, data_dir=DATA_DIR, fmt='csv'):
+    """Batches added by `telecom_ingest.py`, in arrival order"""
+    return sorted(glob.glob(os.path.join(data_dir, name, f'append-*.{EXTENSIONS[fmt]}')))
+
+
+def append_path(name, data_dir=DATA_DIR, fmt='csv'):
+    """Path for the next appended batch of a dataset"""
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    return os.path.join(data_dir, name, f'append-{stamp}.{EXTENSIONS[fmt]}')
+
+
+def dataset_exists(name, data_dir=DATA_DIR, fmt='csv'):
+    return os.path.exists(table_path(name, data_dir, fmt)) or bool(part_paths(name, data_dir, fmt))
+
+
+def resolve_format(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Pick the concrete format for a dataset, falling back to CSV under 'auto'"""
+    if fmt != 'auto':
+        return fmt
+    if pa is not None and dataset_exists(name, data_dir, 'parquet'):
+        return 'parquet'
+    return 'csv'
+
+
+def table_columns(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Column names of a stored dataset, read from the first file's header"""
+    fmt = resolve_format(name, data_dir, fmt)
+    path = table_path(name, data_dir, fmt)
+    paths = [path] if os.path.exists(path) else part_paths(name, data_dir, fmt)
+    if not paths:
+        raise FileNotFoundError(path)
+    if fmt == 'parquet':
+        require_pyarrow()
+        return pq.read_schema(paths[0]).names
+    return list(pd.read_csv(paths[0], nrows=0).columns)
+
+
+def to_arrow(df, name):
+    """Arrow table with native timestamp and dictionary types for a dataset.
+
+    Types are fixed per column (timestamp[ms], dictionary<int32, string>) so part
+    files generated from different chunks share one schema.
+    """
+    require_pyarrow()
+    schema = TABLE_SCHEMAS[name]
+    df = df.copy()
+    for col in schema['dates']:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in schema['categories']:
+        df[col] = df[col].astype('category')
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in table.schema:
+        if field.name in schema['dates']:
+            field = field.with_type(pa.timestamp('ms'))
+        elif field.name in schema['categories']:
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_large_string(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def write_table(df, name, path, fmt='csv'):
+    """Write one dataset (or one part of it) to path"""
+    if fmt == 'parquet':
+        pq.write_table(to_arrow(df, name), path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def concat_parquet(paths, out_path):
+    """Stream Parquet part files into one file, one row group per part"""
+    require_pyarrow()
+    writer = None
+    try:
+        for path in paths:
+            table = pq.read_table(path)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def decode_categories(df):
+    """Turn dictionary-encoded columns back into plain strings"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+
+def read_table(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, columns=None):
+    """Load one dataset from a single file or its part files, followed by any
+    appended batches.
+
+    Dates come back as datetime64 from Parquet and as strings from CSV; enum
+    columns are returned as plain strings either way.
+    """
+    fmt = resolve_format(name, data_dir, fmt)
+    path = table_path(name, data_dir, fmt)
+    paths = [path] if os.path.exists(path) else part_paths(name, data_dir, fmt)
+    if not paths:
+        raise FileNotFoundError(path)
+    paths += append_paths(name, data_dir, fmt)
+
+    if fmt == 'parquet':
+        require_pyarrow()
+        frames = [decode_categories(pd.read_parquet(p, columns=columns)) for p in paths]
+    else:
+        frames = [pd.read_csv(p, usecols=columns) for p in paths]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def convert(data_dir=DATA_DIR, fmt='parquet'):
+    """Rewrite the CSV datasets in data_dir in another storage format"""
+    for name in TABLES:
+        df = read_table(name, data_dir, 'csv')
+        out_path = table_path(name, data_dir, fmt)
+        write_table(df, name, out_path, fmt)
+        csv_size = os.path.getsize(table_path(name, data_dir, 'csv'))
+        print(f"{name}: {len(df)} rows, {csv_size / 1e6:.2f} MB csv -> {os.path.getsize(out_path) / 1e6:.2f} MB {fmt}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the CSV datasets to columnar storage")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--format', default='parquet', choices=['parquet'])
+    args = parser.parse_args()
+    convert(args.data_dir, args.format)
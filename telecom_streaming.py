@@ -0,0 +1,229 @@
+import argparse
+import glob
+import os
+import shutil
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from telecom_cleaning import (clean_billing, clean_outages, clean_subscribers, clean_tickets, clean_usage,
+                              data_usage_stats)
+from telecom_config import DATA_DIR, STORAGE_FORMAT, STREAM_CHUNK_ROWS
+from telecom_cubes import USAGE_DAILY_KEYS, USAGE_MEASURES, build_usage_daily
+from telecom_schema import encode_ids
+from telecom_storage import (TABLES, append_paths, decode_categories, part_paths, pq, read_table,
+                             require_pyarrow, resolve_format, table_path, to_arrow, write_table)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Chunked cleaning for datasets larger than memory.
+#
+# Usage, billing and tickets flow through a generator pipeline a fixed number
+# of rows at a time: read -> drop ids seen in earlier chunks -> clean -> write
+# one Parquet part per chunk. The subscriber dimension is cleaned up front and
+# shared with every usage chunk for the activation date check, and usage
+# imputation uses per-subscriber averages from a first pass over two columns.
+# Peak memory is one chunk plus dimension-sized state (subscribers, usage
+# averages and a bitmap of seen bill/ticket ids), whatever the input size.
+#
+# Output is <out_dir>/<dataset>/part-NNNNN.parquet, readable with read_table,
+# plus the daily usage rollup (see telecom_cubes.py) as <out_dir>/usage_daily/.
+# Each usage chunk's rollup is spilled as it passes, hash partitioned by
+# subscriber into about one partition per chunk of input, and the partitions
+# are summed one at a time at the end, so the rollup too is built in bounded
+# memory. Its parts are sorted by day and subscriber within each partition.
+
+# Streamed datasets and their dedup key
+STREAMED_TABLES = {
+    'usage_records': None,
+    'billing': 'bill_id',
+    'tickets': 'ticket_id',
+}
+
+
+def source_paths(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT):
+    """Files a dataset is stored in, in read order, and their format"""
+    fmt = resolve_format(name, data_dir, fmt)
+    path = table_path(name, data_dir, fmt)
+    paths = [path] if os.path.exists(path) else part_paths(name, data_dir, fmt)
+    if not paths:
+        raise FileNotFoundError(path)
+    return paths + append_paths(name, data_dir, fmt), fmt
+
+
+def read_chunks(name, data_dir=DATA_DIR, fmt=STORAGE_FORMAT, chunk_size=STREAM_CHUNK_ROWS, columns=None):
+    """Raw rows of a dataset, chunk_size at a time"""
+    paths, fmt = source_paths(name, data_dir, fmt)
+    for path in paths:
+        if fmt == 'parquet':
+            require_pyarrow()
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+                yield decode_categories(batch.to_pandas())
+        else:
+            yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def grow_seen(seen, keys):
+    """Bitmap of seen integer id keys, extended (at least doubling) to hold keys"""
+    if len(keys) and keys.max() >= len(seen):
+        seen = np.concatenate([seen, np.zeros(max(keys.max() + 1, 2 * len(seen)) - len(seen), dtype=bool)])
+    return seen
+
+
+def drop_seen(chunks, id_col):
+    """Chunks without rows whose id appeared earlier, in this or a previous
+    chunk (drop_duplicates(keep='first') across the whole stream).
+
+    Seen ids are kept as a bitmap over their integer keys.
+    """
+    seen = np.zeros(0, dtype=bool)
+    for chunk in chunks:
+        keys = encode_ids(chunk[id_col], id_col).astype(np.int64)
+        seen = grow_seen(seen, keys)
+        first = ~seen[keys] & ~pd.Series(keys).duplicated().to_numpy()
+        seen[keys] = True
+        yield chunk[first]
+
+
+def usage_stats(data_dir=DATA_DIR, fmt=STORAGE_FORMAT, chunk_size=STREAM_CHUNK_ROWS):
+    """data_usage_stats over the whole usage dataset, one chunk at a time,
+    and its row count
+    """
+    stats, rows = None, 0
+    for chunk in read_chunks('usage_records', data_dir, fmt, chunk_size, ['subscriber_id', 'data_usage_gb']):
+        chunk_stats = data_usage_stats(chunk)
+        stats = chunk_stats if stats is None else stats.add(chunk_stats, fill_value=0)
+        rows += len(chunk)
+    return stats, rows
+
+
+def clean_chunks(name, chunks, subscribers, stats=None):
+    """The table's cleaning rules applied chunk by chunk"""
+    for chunk in chunks:
+        if name == 'usage_records':
+            yield clean_usage(chunk, subscribers, stats)
+        elif name == 'billing':
+            yield clean_billing(chunk)
+        else:
+            yield clean_tickets(chunk)
+
+
+def rollup_partition(subscriber_ids, partitions):
+    """Spill partition of each row's subscriber, so a subscriber's rollup
+    rows from every chunk land in one partition
+    """
+    return pd.util.hash_array(np.asarray(subscriber_ids, dtype=object)) % np.uint64(partitions)
+
+
+def rollup_usage(chunks, spill_dir, partitions):
+    """Pass usage chunks through, spilling each chunk's daily rollup, hash
+    partitioned by subscriber, as one file per partition and chunk
+    """
+    for number, chunk in enumerate(chunks):
+        daily = build_usage_daily(chunk)
+        partition = rollup_partition(daily['subscriber_id'], partitions)
+        # one conversion per chunk, then a contiguous slice per partition
+        order = np.argsort(partition, kind='stable')
+        table = to_arrow(daily, 'usage_daily').take(order)
+        indexes, starts, counts = np.unique(partition[order], return_index=True, return_counts=True)
+        for index, start, count in zip(indexes, starts, counts):
+            # a closed file per chunk, as an open writer per partition would keep
+            # the footer of every row group written so far in memory
+            path = os.path.join(spill_dir, f'partition-{index:05d}', f'part-{number:05d}.parquet')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(table.slice(start, count), path)
+        yield chunk
+
+
+def combine_rollups(spill_dir):
+    """usage_daily from the spilled rollups, one partition at a time. Each
+    partition holds every row of its subscribers, so summing it alone gives
+    their final cells, and memory stays at one partition's worth.
+    """
+    paths = sorted(glob.glob(os.path.join(spill_dir, 'partition-*')))
+    if not paths:
+        yield pd.DataFrame(columns=USAGE_DAILY_KEYS + USAGE_MEASURES + ['records'])
+    for path in paths:
+        parts = decode_categories(pd.read_parquet(path))
+        yield parts.groupby(USAGE_DAILY_KEYS, observed=True, sort=True).sum().reset_index()
+
+
+def write_parts(name, chunks, out_dir):
+    """Write each chunk as a Parquet part file; returns the row count"""
+    os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+    rows = 0
+    for index, chunk in enumerate(chunks):
+        write_table(chunk, name, os.path.join(out_dir, name, f'part-{index:05d}.parquet'), 'parquet')
+        rows += len(chunk)
+    return rows
+
+
+def stream_clean(data_dir=DATA_DIR, out_dir='cleaned', fmt=STORAGE_FORMAT, chunk_size=STREAM_CHUNK_ROWS):
+    """Clean all five datasets into partitioned Parquet under out_dir.
+
+    Written to a temporary sibling directory first and moved into place at the
+    end, so out_dir is either complete or absent. Returns rows written per dataset.
+    """
+    require_pyarrow()
+    tmp_dir = f'{out_dir.rstrip(os.sep)}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    subscribers = clean_subscribers(read_table('subscribers', data_dir, fmt))
+    outages = clean_outages(read_table('network_outages', data_dir, fmt))
+    rows = {
+        'subscribers': write_parts('subscribers', [subscribers], tmp_dir),
+        'network_outages': write_parts('network_outages', [outages], tmp_dir),
+    }
+    stats, usage_rows = usage_stats(data_dir, fmt, chunk_size)
+    # about a chunk's worth of usage per partition, whatever the input size
+    partitions = max(1, -(-usage_rows // chunk_size))
+    spill_dir = f'{tmp_dir}.rollup'
+    shutil.rmtree(spill_dir, ignore_errors=True)
+    for name, id_col in STREAMED_TABLES.items():
+        chunks = read_chunks(name, data_dir, fmt, chunk_size)
+        if id_col is not None:
+            chunks = drop_seen(chunks, id_col)
+        chunks = clean_chunks(name, chunks, subscribers, stats)
+        if name == 'usage_records':
+            chunks = rollup_usage(chunks, spill_dir, partitions)
+        rows[name] = write_parts(name, chunks, tmp_dir)
+    rows['usage_daily'] = write_parts('usage_daily', combine_rollups(spill_dir), tmp_dir)
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return rows
+
+
+def read_cleaned(out_dir):
+    """(subscribers, usage, billing, tickets, outages) from stream_clean output"""
+    return tuple(read_table(name, out_dir, 'parquet') for name in TABLES)
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process so far, where the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the datasets in fixed-size chunks into partitioned Parquet")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--out-dir', default='cleaned')
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = stream_clean(args.data_dir, args.out_dir, chunk_size=args.chunk_size)
+    for name, count in rows.items():
+        print(f"{name}: {count:,} rows")
+    peak = peak_memory_mb()
+    print(f"Cleaned into {args.out_dir} in {time.perf_counter() - started:.1f}s"
+          + (f", peak memory {peak:,.0f} MB" if peak is not None else ""))
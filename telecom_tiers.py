@@ -0,0 +1,50 @@
+import os
+import numpy as np
+import pandas as pd
+
+from telecom_config import TIER_RULES_PATH
+
+# Rule-based service tier classification, driven by a rules table.
+#
+# Each row of the table is one condition; a subscriber gets the tier of the
+# lowest `rank` with any matching row. Within a row every filled-in column must
+# match: plan_type and plan_name by equality, tenure_above_years as tenure
+# strictly greater than the value. A row with no conditions matches everyone.
+RULE_COLUMNS = ['rank', 'service_tier', 'plan_type', 'plan_name', 'tenure_above_years']
+
+
+def load_tier_rules(path=TIER_RULES_PATH):
+    """Read and validate the tier rules table"""
+    rules = pd.read_csv(path, dtype={'plan_type': str, 'plan_name': str})
+    missing = set(RULE_COLUMNS) - set(rules.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    return rules.sort_values('rank', kind='stable')
+
+
+def rules_version(path=TIER_RULES_PATH):
+    """Changes whenever the rules file is edited"""
+    stat = os.stat(path)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def classify_tiers(subscribers, rules=None):
+    """Service tier for every subscriber in one vectorized pass"""
+    rules = load_tier_rules() if rules is None else rules
+    conditions, choices = [], []
+    for _, tier_rules in rules.groupby('rank', sort=True):
+        tier_match = np.zeros(len(subscribers), dtype=bool)
+        for rule in tier_rules.itertuples(index=False):
+            row_match = np.ones(len(subscribers), dtype=bool)
+            if pd.notna(rule.plan_type):
+                row_match &= (subscribers['plan_type'] == rule.plan_type).to_numpy()
+            if pd.notna(rule.plan_name):
+                row_match &= (subscribers['plan_name'] == rule.plan_name).to_numpy()
+            if pd.notna(rule.tenure_above_years):
+                row_match &= (subscribers['tenure_years'] > rule.tenure_above_years).to_numpy()
+            tier_match |= row_match
+        conditions.append(tier_match)
+        choices.append(tier_rules['service_tier'].iloc[0])
+
+    tiers = np.select(conditions, np.array(choices, dtype=object), default=None)
+    return pd.Series(tiers, index=subscribers.index, name='service_tier')
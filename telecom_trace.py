@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from telecom_config import TRACE, TRACE_LOG
+
+# Opt-in stage instrumentation (TELECOM_TRACE=1).
+#
+# `with span('clean', dataset='billing') as record:` times the block and
+# records elapsed ms, the change in resident memory and any fields the block
+# adds to record (row counts, cache hit/miss). Spans nest; each is logged as
+# one JSON line on the telecom.trace logger (stderr, or TELECOM_TRACE_LOG) and,
+# within a dashboard rerun (start_run/finish_run), collected for the sidebar
+# debug panel. Switched off, span() yields a throwaway dict and records nothing.
+
+logger = logging.getLogger('telecom.trace')
+
+# Per-thread state: Streamlit runs each session's reruns on its own thread
+_local = threading.local()
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def configure_logging():
+    """JSON lines to stderr or TRACE_LOG, once, when tracing is on"""
+    if not TRACE or logger.handlers:
+        return
+    handler = logging.FileHandler(TRACE_LOG) if TRACE_LOG else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+configure_logging()
+
+
+def rss_mb():
+    """Current resident memory of this process, where /proc reports it"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def row_count(obj):
+    """Rows in a frame or series, None for anything else"""
+    return len(obj) if isinstance(obj, (pd.DataFrame, pd.Series)) else None
+
+
+def start_run():
+    """Begin collecting spans for one dashboard rerun"""
+    _local.run = uuid.uuid4().hex[:8]
+    _local.spans = []
+    _local.stack = []
+
+
+def finish_run():
+    """Spans collected since start_run, in start order, each with self_ms
+    (its time minus its direct children's)
+    """
+    spans = getattr(_local, 'spans', None) or []
+    _local.spans = None
+    for record in spans:
+        record['self_ms'] = record.get('ms', 0)
+    for record in spans:
+        parent = record.get('parent')
+        if parent is not None:
+            spans[parent]['self_ms'] = round(spans[parent]['self_ms'] - record.get('ms', 0), 3)
+    return spans
+
+
+@contextmanager
+def span(name, **fields):
+    """Time the enclosed block as one span; yields its record for the block to
+    add fields to
+    """
+    if not TRACE:
+        yield {}
+        return
+
+    stack = _local.__dict__.setdefault('stack', [])
+    spans = getattr(_local, 'spans', None)
+    record = {
+        'ts': datetime.now().isoformat(timespec='milliseconds'),
+        'run': getattr(_local, 'run', None),
+        'span': name,
+        'depth': len(stack),
+        **fields,
+    }
+    if spans is not None:
+        record['parent'] = stack[-1][1] if stack else None
+        spans.append(record)
+    stack.append((record, len(spans) - 1 if spans is not None else None))
+    before = rss_mb()
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as error:
+        record['error'] = type(error).__name__
+        raise
+    finally:
+        record['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        after = rss_mb()
+        record['mem_delta_mb'] = round(after - before, 1) if before is not None and after is not None else None
+        stack.pop()
+        logger.info(json.dumps(record, default=str))
+
+
+def annotate(**fields):
+    """Add fields to the innermost open span, e.g. cache='miss' from inside a
+    cached function body
+    """
+    stack = getattr(_local, 'stack', None)
+    if TRACE and stack:
+        stack[-1][0].update(fields)
+
+
+def trace_table(spans):
+    """Spans as a frame for display, names indented by nesting depth"""
+    columns = ['span', 'dataset', 'cache', 'rows', 'ms', 'self_ms', 'mem_delta_mb']
+    table = pd.DataFrame(spans).reindex(columns=columns + ['depth'])
+    table['span'] = ['· ' * int(depth) + name for depth, name in zip(table['depth'], table['span'])]
+    return table[columns]
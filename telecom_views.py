@@ -0,0 +1,513 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from telecom_config import CHART_POINT_BUDGET
+from telecom_cubes import BACKLOG_STATUSES
+from telecom_outages import outage_ticket_counts
+
+# Per-view aggregations and figures, kept apart from the Streamlit layout so
+# they can be timed (telecom_benchmark.py) and reused outside the dashboard.
+#
+# Each view has a *_data function turning its filtered frames into KPI values
+# and chart tables, and a *_figures function building the Plotly figures from
+# that result. The dashboard renders both; neither touches Streamlit.
+#
+# Line charts are downsampled to CHART_POINT_BUDGET points and scatter plots
+# use WebGL traces, so what reaches the browser stays bounded as date ranges
+# and zone counts grow.
+
+# Sidebar filter indexes (see telecom_filters.py): dataset, filter columns and date column
+FILTER_INDEXES = {
+    'subscribers': ('subscribers', ['city', 'plan_type', 'plan_name', 'status'], None),
+    'revenue': ('revenue_cube', ['city', 'plan_type', 'plan_name', 'status'], 'billing_month'),
+    'ops': ('ops_cube', ['city', 'plan_type', 'ticket_category'], 'ticket_date'),
+    'outages': ('network_outages', ['city'], 'outage_date'),
+    'usage': ('usage_cube', ['city', 'plan_type', 'plan_name', 'status'], 'usage_date'),
+}
+
+
+def selected_subscribers(subscribers, initial, active):
+    """Subscribers with activity in the date range, falling back to all that
+    match the attribute filters when none are active
+    """
+    if active.any():
+        return subscribers[active].copy()
+    return subscribers[initial].copy()
+
+
+def annotate(fig, text):
+    """The grey hint line shown above every chart"""
+    fig.add_annotation(text=text,
+                       xref="paper", yref="paper", x=0.5, y=1.1, showarrow=False,
+                       font=dict(size=10, color="white"), bgcolor="gray")
+    return fig
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the threshold points Largest-Triangle-Three-Buckets keeps
+    from the series (x, y), x ascending: the first and last points, plus the
+    point in each bucket spanning the largest triangle with the point kept
+    before it and the next bucket's average
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = (end, edges[bucket + 2]) if bucket + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(areas.argmax())
+        keep[bucket + 1] = previous
+    return keep
+
+
+def downsample(frame, x, y, max_points=CHART_POINT_BUDGET):
+    """frame (sorted by x) cut to at most max_points rows with LTTB, keeping
+    the peaks and troughs of y; shorter frames are returned as they are
+    """
+    if len(frame) <= max_points:
+        return frame
+    xs = frame[x].to_numpy()
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype('datetime64[ns]').astype('int64')
+    elif not np.issubdtype(xs.dtype, np.number):
+        xs = np.arange(len(xs))
+    ys = frame[y].to_numpy(dtype='float64', na_value=0.0)
+    return frame.iloc[lttb_indices(xs.astype('float64'), ys, max_points)]
+
+
+def executive_data(filtered_revenue, filtered_subs):
+    """Executive View KPIs and chart tables from revenue cube cells and the
+    filtered subscribers
+    """
+    # Calculate KPIs
+    total_revenue = filtered_revenue['bill_amount'].sum()
+    active_count = filtered_subs[filtered_subs['status'] == 'Active'].shape[0]
+    arpu = total_revenue / active_count if active_count > 0 else 0
+
+    # Retention ratio (simplified as active vs total)
+    # Calculate retention ratio based on active subscribers in the filtered data
+    total_filtered_subs = len(filtered_subs)
+    active_filtered_subs = len(filtered_subs[filtered_subs['status'] == 'Active'])
+    retention_ratio = (active_filtered_subs / total_filtered_subs * 100) if total_filtered_subs > 0 else 0
+
+    overdue_revenue = filtered_revenue[filtered_revenue['payment_status'] == 'Overdue']['bill_amount'].sum()
+
+    # Monthly ARPU Trend
+    monthly_rev = filtered_revenue.groupby('month', observed=True)['bill_amount'].sum()
+    monthly_arpu = monthly_rev / active_count if active_count > 0 else monthly_rev * 0
+
+    # Revenue by Plan Type by Month
+    rev_pivot = filtered_revenue.groupby(['month', 'plan_type'], observed=True)['bill_amount'].sum().reset_index()
+
+    # Revenue by City
+    city_rev = filtered_revenue.groupby('city', observed=True)['bill_amount'].sum().sort_values(ascending=True)
+
+    # Payment Status Distribution
+    payment_dist = filtered_revenue.groupby('payment_status', observed=True)['bill_count'].sum().sort_values(ascending=False)
+
+    # Insights
+    postpaid_rev = filtered_revenue[filtered_revenue['plan_type'] == 'Postpaid']['bill_amount'].sum()
+    postpaid_pct = (postpaid_rev / total_revenue * 100) if total_revenue > 0 else 0
+    top_overdue_city = filtered_revenue[filtered_revenue['payment_status'] == 'Overdue'].groupby('city', observed=True)['bill_amount'].sum().idxmax() if overdue_revenue > 0 else "N/A"
+
+    return {
+        'total_revenue': total_revenue,
+        'arpu': arpu,
+        'retention_ratio': retention_ratio,
+        'overdue_revenue': overdue_revenue,
+        'monthly_arpu': monthly_arpu,
+        'rev_pivot': rev_pivot,
+        'city_rev': city_rev,
+        'payment_dist': payment_dist,
+        'postpaid_pct': postpaid_pct,
+        'top_overdue_city': top_overdue_city,
+        'credit_adjustments': filtered_revenue['credit_adjustment'].sum(),
+    }
+
+
+def executive_figures(data):
+    """Executive View charts, by name"""
+    monthly_arpu = data['monthly_arpu']
+
+    # Create a DataFrame for the ARPU data
+    arpu_df = pd.DataFrame({
+        'month': monthly_arpu.index,
+        'arpu': monthly_arpu.values
+    })
+    arpu_trend = px.line(
+        downsample(arpu_df, 'month', 'arpu'),
+        x='month',
+        y='arpu',
+        title="Monthly ARPU Trend",
+        labels={'x': 'Month', 'y': 'ARPU (AED)'}
+    )
+    arpu_trend.update_traces(mode='lines+markers')
+    annotate(arpu_trend, "Shows ARPU trends over time. Look for seasonal patterns or declining trends.")
+
+    revenue_by_plan = px.bar(
+        data['rev_pivot'],
+        x='month',
+        y='bill_amount',
+        color='plan_type',
+        title="Revenue by Plan Type (Monthly)",
+        labels={'bill_amount': 'Revenue (AED)', 'month': 'Month'},
+        barmode='stack'
+    )
+    annotate(revenue_by_plan, "Compare revenue contribution of different plan types over time.")
+
+    # Create a DataFrame for the city revenue data
+    city_rev = data['city_rev']
+    city_rev_df = pd.DataFrame({
+        'revenue': city_rev.values,
+        'city': city_rev.index
+    })
+    revenue_by_city = px.bar(
+        city_rev_df,
+        x='revenue',
+        y='city',
+        orientation='h',
+        title="Revenue by City",
+        labels={'x': 'Revenue (AED)', 'y': 'City'}
+    )
+    annotate(revenue_by_city, "Identify highest and lowest revenue-generating cities.")
+
+    payment_dist = data['payment_dist']
+    payment_status = px.pie(
+        values=payment_dist.values,
+        names=payment_dist.index,
+        title="Payment Status Distribution"
+    )
+    annotate(payment_status, "Visualize payment status distribution and identify overdue accounts.")
+
+    return {
+        'arpu_trend': arpu_trend,
+        'revenue_by_plan': revenue_by_plan,
+        'revenue_by_city': revenue_by_city,
+        'payment_status': payment_status,
+    }
+
+
+def manager_data(filtered_ops, filtered_outages, filtered_subs):
+    """Manager View KPIs and chart tables from ops cube cells, outage rows and
+    the filtered subscribers. The daily ticket trend has its own date range
+    control; see daily_ticket_volume.
+    """
+    # Calculate operational KPIs
+    resolved_ops = filtered_ops[filtered_ops['status'] == 'Resolved']
+    backlog_ops = filtered_ops[filtered_ops['status'].isin(BACKLOG_STATUSES)]
+    resolved_count = resolved_ops['tickets'].sum()
+
+    sla_compliant = resolved_ops['sla_met'].sum()
+    sla_rate = (sla_compliant / resolved_count * 100) if resolved_count > 0 else 0
+
+    ticket_backlog = backlog_ops['tickets'].sum()
+
+    timed_count = resolved_ops['timed_tickets'].sum()
+    avg_resolution = resolved_ops['resolution_hours'].sum() / timed_count if timed_count > 0 else 0
+    total_outage_mins = filtered_outages['outage_duration_mins'].sum()
+
+    # Ticket Backlog by Zone (Top 10)
+    backlog_by_zone = backlog_ops.groupby('zone', observed=True)['tickets'].sum().sort_values(ascending=False).head(10)
+
+    # SLA Compliance by Channel
+    channel_sla = resolved_ops.groupby('ticket_channel', observed=True)[['sla_met', 'tickets']].sum()
+    channel_stats = (channel_sla['sla_met'] / channel_sla['tickets'] * 100).reset_index()
+    channel_stats.columns = ['Channel', 'SLA Rate']
+
+    # Outage Minutes vs Ticket Count by Zone
+    zone_outages = filtered_outages.groupby('zone', observed=True)['outage_duration_mins'].sum().reset_index()
+    zone_tickets = filtered_ops.groupby('zone', observed=True)['tickets'].sum().reset_index(name='ticket_count')
+    zone_corr = zone_outages.merge(zone_tickets, on='zone', how='outer').fillna(0)
+
+    # Tickets raised during or shortly after an outage in their zone, per outage
+    outage_links = outage_ticket_counts(filtered_ops, filtered_outages, weight='tickets')
+    total_tickets = filtered_ops['tickets'].sum()
+    linked_share = (outage_links['linked_tickets'].sum() / total_tickets * 100) if total_tickets > 0 else 0
+
+    # Top Problem Zones Table
+    open_tickets = backlog_ops.groupby('zone', observed=True)['tickets'].sum().reset_index(name='Open Tickets')
+
+    # Calculate average resolution hours by zone (zones without resolved tickets get 0 below)
+    zone_resolution = resolved_ops.groupby('zone', observed=True)[['resolution_hours', 'timed_tickets']].sum()
+    avg_resolution_by_zone = (
+        zone_resolution['resolution_hours'] / zone_resolution['timed_tickets']
+    ).reset_index(name='Avg Resolution Hours')
+
+    # Merge the data
+    zone_analysis = open_tickets.merge(avg_resolution_by_zone, on='zone', how='left').fillna(0)
+    zone_analysis.columns = ['Zone', 'Open Tickets', 'Avg Resolution Hours']
+
+    zone_outage_mins = filtered_outages.groupby('zone', observed=True)['outage_duration_mins'].sum().reset_index()
+    zone_outage_mins.rename(columns={'zone': 'Zone'}, inplace=True)  # Rename to match
+    zone_analysis = zone_analysis.merge(zone_outage_mins, on='Zone', how='left').fillna(0)
+
+    # SLA breaches
+    sla_breaches = resolved_ops.groupby('zone', observed=True)['sla_breached'].sum().reset_index(name='SLA Breach Count')
+    sla_breaches.rename(columns={'zone': 'Zone'}, inplace=True)  # Rename to match
+    zone_analysis = zone_analysis.merge(sla_breaches, on='Zone', how='left').fillna(0)
+
+    zone_analysis = zone_analysis.sort_values('Open Tickets', ascending=False).head(10)
+    zone_analysis['Avg Resolution Hours'] = zone_analysis['Avg Resolution Hours'].round(1)
+    zone_analysis['outage_duration_mins'] = zone_analysis['outage_duration_mins'].round(0)
+    zone_analysis['SLA Breach Count'] = zone_analysis['SLA Breach Count'].astype(int)
+
+    # Service tiers
+    tier_dist = filtered_subs['service_tier'].value_counts()
+    backlog_by_tier = backlog_ops.groupby('service_tier')['tickets'].sum().reset_index(name='Backlog')
+    tier_sla = resolved_ops.groupby('service_tier')[['sla_met', 'tickets']].sum()
+    tier_sla_stats = (tier_sla['sla_met'] / tier_sla['tickets'] * 100).reset_index()
+    tier_sla_stats.columns = ['Service Tier', 'SLA Rate']
+
+    return {
+        'sla_rate': sla_rate,
+        'ticket_backlog': ticket_backlog,
+        'avg_resolution': avg_resolution,
+        'total_outage_mins': total_outage_mins,
+        'backlog_by_zone': backlog_by_zone,
+        'channel_stats': channel_stats,
+        'zone_corr': zone_corr,
+        'zone_analysis': zone_analysis,
+        'outage_links': outage_links,
+        'linked_share': linked_share,
+        'tier_dist': tier_dist,
+        'backlog_by_tier': backlog_by_tier,
+        'tier_sla_stats': tier_sla_stats,
+    }
+
+
+def daily_ticket_volume(filtered_ops, chart_date_range=()):
+    """Tickets per day, within the ticket trend's own (start, end) date range
+    when one is given
+    """
+    # Filter data based on the chart-specific date range
+    if len(chart_date_range) == 2:
+        chart_start_date, chart_end_date = chart_date_range
+        chart_filtered_ops = filtered_ops[
+            (filtered_ops['ticket_date'] >= pd.to_datetime(chart_start_date)) &
+            (filtered_ops['ticket_date'] <= pd.to_datetime(chart_end_date))
+        ]
+    else:
+        chart_filtered_ops = filtered_ops
+
+    return chart_filtered_ops.groupby('ticket_date')['tickets'].sum().reset_index(name='count')
+
+
+def manager_figures(data, daily_tickets):
+    """Manager View charts, by name"""
+    ticket_trend = px.line(
+        downsample(daily_tickets, 'ticket_date', 'count'),
+        x='ticket_date',
+        y='count',
+        title="Daily Ticket Volume Trend",
+        labels={'ticket_date': 'Date', 'count': 'Tickets'}
+    )
+    ticket_trend.update_traces(mode='lines+markers')
+
+    # Add range selector buttons and date range selector for interactivity
+    ticket_trend.update_layout(
+        xaxis=dict(
+            rangeslider=dict(visible=True),
+            type="date"
+        )
+    )
+    annotate(ticket_trend, "Track ticket volume trends. Spikes may indicate service issues or system outages.")
+
+    # Create a DataFrame for the backlog data
+    backlog_by_zone = data['backlog_by_zone']
+    backlog_df = pd.DataFrame({
+        'tickets': backlog_by_zone.values,
+        'zone': backlog_by_zone.index
+    })
+    zone_backlog = px.bar(
+        backlog_df,
+        x='tickets',
+        y='zone',
+        orientation='h',
+        title="Ticket Backlog by Zone (Top 10)",
+        labels={'x': 'Open Tickets', 'y': 'Zone'}
+    )
+    annotate(zone_backlog, "Identify zones with highest ticket backlogs requiring attention.")
+
+    channel_sla = px.bar(
+        data['channel_stats'],
+        x='Channel',
+        y='SLA Rate',
+        title="SLA Compliance by Channel",
+        labels={'SLA Rate': 'SLA Compliance (%)'}
+    )
+    annotate(channel_sla, "Evaluate performance across different support channels.")
+
+    outage_tickets = px.scatter(
+        data['zone_corr'],
+        x='outage_duration_mins',
+        y='ticket_count',
+        text='zone',
+        render_mode='webgl',
+        title="Outage Minutes vs Ticket Count by Zone",
+        labels={'outage_duration_mins': 'Outage Minutes', 'ticket_count': 'Tickets'}
+    )
+    outage_tickets.update_traces(textposition='top center', marker=dict(size=12))
+    annotate(outage_tickets, "Correlate network outages with ticket volume by zone.")
+
+    outage_links = px.scatter(
+        data['outage_links'],
+        x='outage_duration_mins',
+        y='linked_tickets',
+        color='city',
+        hover_data=['zone', 'outage_type', 'outage_start_time'],
+        render_mode='webgl',
+        title="Tickets Linked to Each Outage",
+        labels={'outage_duration_mins': 'Outage Minutes', 'linked_tickets': 'Linked Tickets'}
+    )
+    annotate(outage_links, "Tickets raised in the outage's zone while it lasted or shortly after.")
+
+    tier_dist = data['tier_dist']
+    tier_share = px.pie(
+        values=tier_dist.values,
+        names=tier_dist.index,
+        title="Service Tier Distribution"
+    )
+    annotate(tier_share, "Visualize the distribution of customers across service tiers.")
+
+    tier_backlog = px.bar(
+        data['backlog_by_tier'],
+        x='service_tier',
+        y='Backlog',
+        title="Ticket Backlog by Service Tier",
+        labels={'service_tier': 'Service Tier'}
+    )
+    annotate(tier_backlog, "Compare ticket backlogs across service tiers.")
+
+    tier_sla = px.bar(
+        data['tier_sla_stats'],
+        x='Service Tier',
+        y='SLA Rate',
+        title="SLA Compliance Rate by Service Tier",
+        labels={'SLA Rate': 'SLA Compliance (%)'}
+    )
+    annotate(tier_sla, "Evaluate SLA compliance across different service tiers.")
+
+    return {
+        'ticket_trend': ticket_trend,
+        'zone_backlog': zone_backlog,
+        'channel_sla': channel_sla,
+        'outage_tickets': outage_tickets,
+        'outage_links': outage_links,
+        'tier_share': tier_share,
+        'tier_backlog': tier_backlog,
+        'tier_sla': tier_sla,
+    }
+
+
+def usage_data(filtered_usage):
+    """Usage View KPIs and chart tables from usage cube cells"""
+    # Calculate usage KPIs
+    total_data = filtered_usage['data_usage_gb'].sum()
+    total_voice = filtered_usage['voice_minutes'].sum()
+    total_sms = filtered_usage['sms_count'].sum()
+    extra_charges = filtered_usage['roaming_charges'].sum() + filtered_usage['addon_charges'].sum()
+    subscriber_days = filtered_usage['subscriber_days'].sum()
+    data_per_day = total_data / subscriber_days if subscriber_days > 0 else 0
+
+    # Daily data usage trend
+    daily_usage = filtered_usage.groupby('usage_date')[['data_usage_gb', 'voice_minutes']].sum().reset_index()
+
+    # Usage by plan
+    plan_usage = filtered_usage.groupby('plan_name', observed=True)[
+        ['data_usage_gb', 'voice_minutes', 'sms_count']
+    ].sum().reset_index()
+
+    # Usage by city
+    city_usage = filtered_usage.groupby('city', observed=True)[
+        ['data_usage_gb', 'voice_minutes', 'sms_count']
+    ].sum().reset_index()
+
+    # Data usage by zone (Top 10)
+    zone_usage = filtered_usage.groupby('zone', observed=True)['data_usage_gb'].sum().sort_values(ascending=False).head(10)
+
+    # Roaming and add-on charges by city
+    charges = filtered_usage.groupby('city', observed=True)[['roaming_charges', 'addon_charges']].sum().reset_index()
+    roaming_pct = (filtered_usage['roaming_charges'].sum() / extra_charges * 100) if extra_charges > 0 else 0
+
+    return {
+        'total_data': total_data,
+        'total_voice': total_voice,
+        'total_sms': total_sms,
+        'extra_charges': extra_charges,
+        'subscriber_days': subscriber_days,
+        'data_per_day': data_per_day,
+        'daily_usage': daily_usage,
+        'plan_usage': plan_usage,
+        'city_usage': city_usage,
+        'zone_usage': zone_usage,
+        'charges': charges,
+        'roaming_pct': roaming_pct,
+    }
+
+
+def usage_figures(data):
+    """Usage View charts, by name"""
+    data_trend = px.line(
+        downsample(data['daily_usage'], 'usage_date', 'data_usage_gb'),
+        x='usage_date',
+        y='data_usage_gb',
+        title="Daily Data Usage Trend",
+        labels={'usage_date': 'Date', 'data_usage_gb': 'Data (GB)'}
+    )
+    annotate(data_trend, "Track daily data consumption across the filtered subscriber base.")
+
+    plan_data = px.bar(
+        data['plan_usage'],
+        x='plan_name',
+        y='data_usage_gb',
+        title="Data Usage by Plan",
+        labels={'plan_name': 'Plan', 'data_usage_gb': 'Data (GB)'},
+        hover_data=['voice_minutes', 'sms_count']
+    )
+    annotate(plan_data, "Compare data consumption across plans. Hover for voice and SMS.")
+
+    city_voice_sms = px.bar(
+        data['city_usage'],
+        x='city',
+        y=['voice_minutes', 'sms_count'],
+        barmode='group',
+        title="Voice Minutes and SMS by City",
+        labels={'city': 'City', 'value': 'Volume', 'variable': 'Measure'}
+    )
+    annotate(city_voice_sms, "Voice and messaging volumes per city.")
+
+    zone_usage = data['zone_usage']
+    zone_data = px.bar(
+        x=zone_usage.values,
+        y=zone_usage.index,
+        orientation='h',
+        title="Data Usage by Zone (Top 10)",
+        labels={'x': 'Data (GB)', 'y': 'Zone'}
+    )
+    zone_data.update_layout(yaxis={'categoryorder': 'total ascending'})
+    annotate(zone_data, "Zones with the heaviest data demand.")
+
+    city_charges = px.bar(
+        data['charges'],
+        x='city',
+        y=['roaming_charges', 'addon_charges'],
+        title="Roaming and Add-on Charges by City",
+        labels={'city': 'City', 'value': 'Charges (AED)', 'variable': 'Charge'}
+    )
+    annotate(city_charges, "Usage-based charges on top of plan fees.")
+
+    return {
+        'data_trend': data_trend,
+        'plan_data': plan_data,
+        'city_voice_sms': city_voice_sms,
+        'zone_data': zone_data,
+        'city_charges': city_charges,
+    }
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from telecom_cache import load_cleaned
+
+# Tests run on the CSVs bundled at the repository root, with the cleaned-data
+# cache in a temporary directory so they never read or touch a real one.
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('telecom_cache'))
+
+
+@pytest.fixture(scope='session')
+def cleaned(cache_dir):
+    """(subscribers, usage, billing, tickets, outages), cleaned and in the compact schema"""
+    return load_cleaned(DATA_DIR, 'csv', cache_dir, with_usage=True)
@@ -0,0 +1,16 @@
+import pytest
+
+from telecom_cache import cleaned_tables
+from tests.conftest import DATA_DIR
+
+pytest.importorskip('pyarrow')
+
+
+def test_stream_mode_rebuilds_partial_memory_entry(tmp_path):
+    cache_dir = str(tmp_path)
+    cleaned_tables(['subscribers'], DATA_DIR, 'csv', cache_dir, mode='memory')
+    streamed = cleaned_tables(['billing', 'usage_daily'], DATA_DIR, 'csv', cache_dir, mode='stream')
+    in_memory = cleaned_tables(['billing', 'usage_daily'], DATA_DIR, 'csv', cache_dir, use_cache=False, mode='memory')
+    for name, table in in_memory.items():
+        assert len(streamed[name]) == len(table)
+        assert sorted(streamed[name].columns) == sorted(table.columns)
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import telecom_cache
+import telecom_plane
+from telecom_cubes import (BACKLOG_STATUSES, USAGE_DAILY_KEYS, USAGE_MEASURES, active_mask, build_activity_index,
+                           build_ops_cube, build_revenue_cube, build_usage_cube, build_usage_daily, slice_ops,
+                           slice_revenue)
+from telecom_model import denormalize_usage
+
+STATUSES = ['Active', 'Suspended', 'Churned']
+
+
+def revenue_selections(subscribers, billing):
+    """Sidebar selections (start, end, cities, plan types, plan names, statuses) by label"""
+    months = sorted(billing['billing_month'].dropna().unique())
+    cities, plan_names = list(subscribers['city'].unique()), list(subscribers['plan_name'].unique())
+    return {
+        'everything': (months[0], months[-1], cities, ['Prepaid', 'Postpaid'], plan_names, STATUSES),
+        'Dubai postpaid': (months[0], months[-1], ['Dubai'], ['Postpaid'], plan_names, STATUSES),
+        'mid-month range': (months[len(months) // 2] + pd.Timedelta(days=10), months[-1] + pd.Timedelta(days=5),
+                            cities, ['Prepaid'], plan_names[:2], ['Active', 'Churned']),
+    }
+
+
+@pytest.fixture(scope='module')
+def revenue(cleaned):
+    subscribers, _, billing, tickets, _ = cleaned
+    return build_revenue_cube(billing), build_activity_index(subscribers, billing, tickets)
+
+
+@pytest.fixture(params=['everything', 'Dubai postpaid', 'mid-month range'])
+def revenue_selection(request, cleaned, revenue):
+    """Row-level bills, cube cells and filters for one selection"""
+    subscribers, _, billing, _, _ = cleaned
+    start, end, cities, plan_types, plan_names, statuses = revenue_selections(subscribers, billing)[request.param]
+    subs = subscribers[
+        subscribers['city'].isin(cities) & subscribers['plan_type'].isin(plan_types) &
+        subscribers['plan_name'].isin(plan_names) & subscribers['status'].isin(statuses)
+    ]
+    rows = billing[
+        billing['subscriber_id'].isin(subs['subscriber_id']) &
+        (billing['billing_month'] >= start) & (billing['billing_month'] <= end)
+    ]
+    cells = slice_revenue(revenue[0], start, end, cities, plan_types, plan_names, statuses)
+    return start, end, subs, rows, cells
+
+
+def test_revenue_cube_total(revenue_selection):
+    _, _, _, rows, cells = revenue_selection
+    assert np.isclose(rows['bill_amount'].sum(), cells['bill_amount'].sum())
+
+
+def test_revenue_cube_bill_count(revenue_selection):
+    _, _, _, rows, cells = revenue_selection
+    assert len(rows) == cells['bill_count'].sum()
+
+
+def test_active_subscribers(cleaned, revenue, revenue_selection):
+    subscribers, _, _, tickets, _ = cleaned
+    start, end, subs, rows, _ = revenue_selection
+    active_ids = set(rows['subscriber_id']) | set(tickets.loc[
+        tickets['subscriber_id'].isin(subs['subscriber_id']) &
+        (tickets['ticket_date'] >= start) & (tickets['ticket_date'] <= end), 'subscriber_id'])
+    mask = active_mask(revenue[1], start, end) & subscribers['subscriber_id'].isin(subs['subscriber_id']).to_numpy()
+    assert set(subscribers.loc[mask, 'subscriber_id']) == active_ids
+
+
+def test_cube_version_keys_persisted_aggregates(monkeypatch):
+    path, version = telecom_cache.aggregate_path('cache', 'revenue_cube', 'key'), telecom_plane.data_version()
+    monkeypatch.setattr(telecom_cache, 'CUBE_VERSION', telecom_cache.CUBE_VERSION + 1)
+    monkeypatch.setattr(telecom_plane, 'CUBE_VERSION', telecom_plane.CUBE_VERSION + 1)
+    assert telecom_cache.aggregate_path('cache', 'revenue_cube', 'key') != path
+    assert telecom_plane.data_version() != version
+
+
+def ops_selections(tickets):
+    """Manager View selections (start, end, cities, plan types, categories) by label"""
+    start, end = tickets['ticket_date'].min(), tickets['ticket_date'].max()
+    cities, cats = list(tickets['city'].unique()), list(tickets['ticket_category'].unique())
+    return {
+        'everything': (start, end, cities, ['Prepaid', 'Postpaid'], cats),
+        'Dubai prepaid': (start, end, ['Dubai'], ['Prepaid'], cats),
+        'one category, later half': (start + (end - start) / 2, end, cities, ['Prepaid', 'Postpaid'], cats[:1]),
+    }
+
+
+@pytest.fixture(params=['everything', 'Dubai prepaid', 'one category, later half'])
+def ops_selection(request, cleaned):
+    """Row-level tickets, resolution hours of the resolved ones, and ops cube
+    cells for one selection
+    """
+    tickets = cleaned[3]
+    start, end, cities, plan_types, cats = ops_selections(tickets)[request.param]
+    rows = tickets[
+        tickets['city'].isin(cities) & tickets['plan_type'].isin(plan_types) &
+        tickets['ticket_category'].isin(cats) &
+        (tickets['ticket_date'] >= start) & (tickets['ticket_date'] <= end)
+    ]
+    resolved = rows[rows['status'] == 'Resolved']
+    hours = (resolved['resolution_date'] - resolved['ticket_date']).dt.total_seconds() / 3600
+    cells = slice_ops(build_ops_cube(tickets), start, end, cities, plan_types, cats)
+    return rows, resolved, hours, cells
+
+
+def test_ops_cube_tickets(ops_selection):
+    rows, _, _, cells = ops_selection
+    assert len(rows) == cells['tickets'].sum()
+
+
+def test_ops_cube_backlog(ops_selection):
+    rows, _, _, cells = ops_selection
+    backlog_cells = cells[cells['status'].isin(BACKLOG_STATUSES)]
+    assert rows['status'].isin(BACKLOG_STATUSES).sum() == backlog_cells['tickets'].sum()
+
+
+def test_ops_cube_sla_met(ops_selection):
+    _, resolved, hours, cells = ops_selection
+    assert (hours <= resolved['sla_target_hours']).sum() == cells.loc[cells['status'] == 'Resolved', 'sla_met'].sum()
+
+
+def test_ops_cube_sla_breaches_by_zone(ops_selection):
+    _, resolved, hours, cells = ops_selection
+    expected = (hours > resolved['sla_target_hours']).groupby(resolved['zone'], observed=True).sum()
+    actual = cells[cells['status'] == 'Resolved'].groupby('zone', observed=True)['sla_breached'].sum()
+    assert np.array_equal(expected.to_numpy(), actual.to_numpy())
+
+
+def test_ops_cube_avg_resolution(ops_selection):
+    _, _, hours, cells = ops_selection
+    resolved_cells = cells[cells['status'] == 'Resolved']
+    assert np.isclose(hours.mean(), resolved_cells['resolution_hours'].sum() / resolved_cells['timed_tickets'].sum())
+
+
+@pytest.fixture(scope='module')
+def usage_cube(cleaned):
+    subscribers, usage, _, _, _ = cleaned
+    cube = build_usage_cube(denormalize_usage(build_usage_daily(usage), subscribers))
+    rows = usage.merge(subscribers[['subscriber_id', 'city', 'plan_name']], on='subscriber_id')
+    return rows, cube
+
+
+@pytest.mark.parametrize('key', [None, 'city', 'plan_name', 'usage_date'])
+def test_usage_cube_measures(usage_cube, key):
+    rows, cube = usage_cube
+    expected = rows[USAGE_MEASURES].sum() if key is None else rows.groupby(key, observed=True)[USAGE_MEASURES].sum()
+    actual = cube[USAGE_MEASURES].sum() if key is None else cube.groupby(key, observed=True)[USAGE_MEASURES].sum()
+    assert np.allclose(expected.to_numpy(), actual.to_numpy(), rtol=1e-5)
+
+
+def test_usage_cube_subscriber_days(cleaned, usage_cube):
+    usage = cleaned[1]
+    assert usage_cube[1]['subscriber_days'].sum() == len(usage[USAGE_DAILY_KEYS].drop_duplicates())
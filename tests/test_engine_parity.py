@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telecom_cache import load_datasets
+from telecom_duckdb import open_engine, ops_cells, outage_rows, revenue_cells, subscriber_masks
+from telecom_filters import build_filter_index
+from telecom_kpis import select_ops, select_revenue, select_subscribers
+from telecom_views import FILTER_INDEXES, executive_data, manager_data, selected_subscribers
+from tests.conftest import DATA_DIR
+
+pytest.importorskip('duckdb')
+
+INDEX_NAMES = ['subscribers', 'revenue', 'ops', 'outages']
+
+SELECTIONS = ['everything', 'Dubai', 'Postpaid', 'Premium and Unlimited, active', 'network issues', 'churned',
+              'one month', 'Ajman and Fujairah prepaid, mid-range', 'nothing']
+
+# executive_data and manager_data results, by name
+KPIS = ['total_revenue', 'arpu', 'retention_ratio', 'overdue_revenue', 'monthly_arpu', 'rev_pivot', 'city_rev',
+        'payment_dist', 'postpaid_pct', 'top_overdue_city', 'credit_adjustments',
+        'sla_rate', 'ticket_backlog', 'avg_resolution', 'total_outage_mins', 'backlog_by_zone', 'channel_stats',
+        'zone_corr', 'zone_analysis', 'outage_links', 'linked_share', 'tier_dist', 'backlog_by_tier',
+        'tier_sla_stats']
+
+
+def selections(subscribers, ops_cube, date_range):
+    """Sidebar selections (start, end, cities, plan types, plan names, statuses, ticket categories) by label"""
+    cities = sorted(subscribers['city'].unique())
+    plan_names = sorted(subscribers['plan_name'].unique())
+    cats = sorted(ops_cube['ticket_category'].unique())
+    first, last = date_range
+    months = pd.period_range(first, last, freq='M')
+    # a whole month inside the range, and the middle half of the range
+    month = months[1] if len(months) > 2 else months[0]
+    quarter = (last - first) / 4
+    everything = dict(start=first, end=last, cities=cities, plan_types=['Prepaid', 'Postpaid'],
+                      plan_names=plan_names, statuses=['Active', 'Suspended', 'Churned'], cats=cats)
+    return {
+        'everything': everything,
+        'Dubai': {**everything, 'cities': ['Dubai']},
+        'Postpaid': {**everything, 'plan_types': ['Postpaid']},
+        'Premium and Unlimited, active': {**everything, 'plan_names': ['Premium', 'Unlimited'], 'statuses': ['Active']},
+        'network issues': {**everything, 'cats': ['Network Issue']},
+        'churned': {**everything, 'statuses': ['Churned']},
+        'one month': {**everything, 'start': max(month.start_time, first),
+                      'end': min(month.end_time.normalize(), last)},
+        'Ajman and Fujairah prepaid, mid-range': {**everything, 'cities': ['Ajman', 'Fujairah'],
+                                                  'plan_types': ['Prepaid'], 'start': (first + quarter).normalize(),
+                                                  'end': (last - quarter).normalize()},
+        'nothing': {**everything, 'cities': []},
+    }
+
+
+@pytest.fixture(scope='module')
+def engines(cache_dir):
+    """View results for a selection label from the pandas cubes and from DuckDB, computed once per label"""
+    dataset_names = ['date_range', 'activity_index'] + [FILTER_INDEXES[name][0] for name in INDEX_NAMES]
+    datasets = load_datasets(dataset_names, DATA_DIR, 'csv', cache_dir)
+    subscribers = datasets['subscribers']
+    con = open_engine(subscribers, DATA_DIR, 'csv', cache_dir)
+    indexes = {}
+    for name in INDEX_NAMES:
+        dataset, columns, date_column = FILTER_INDEXES[name]
+        indexes[name] = build_filter_index(datasets[dataset], columns, date_column)
+    by_label = selections(subscribers, datasets['ops_cube'], datasets['date_range'])
+    load, index = datasets.__getitem__, indexes.__getitem__
+    results = {}
+
+    def run(label):
+        if label in results:
+            return results[label]
+        sel = by_label[label]
+        start, end = sel['start'], sel['end']
+        attributes = [sel['cities'], sel['plan_types'], sel['plan_names'], sel['statuses']]
+
+        subs = select_subscribers(load, index, start, end, *attributes)
+        ops, outages = select_ops(index, start, end, sel['cities'], sel['plan_types'], sel['cats'])
+        expected = {**executive_data(select_revenue(index, start, end, *attributes), subs),
+                    **manager_data(ops, outages, subs)}
+
+        subs = selected_subscribers(subscribers, *subscriber_masks(con, subscribers, start, end, *attributes))
+        ops = ops_cells(con, start, end, sel['cities'], sel['plan_types'], sel['cats'])
+        actual = {**executive_data(revenue_cells(con, start, end, *attributes), subs),
+                  **manager_data(ops, outage_rows(con, start, end, sel['cities']), subs)}
+        results[label] = expected, actual
+        return results[label]
+
+    return run
+
+
+def assert_same_result(expected, actual):
+    """View result values agree, floats to a relative 1e-12.
+
+    Frames are compared by position, since their row labels are never shown,
+    and dtypes only by kind: the engines may differ in unused categories and
+    timestamp resolution.
+    """
+    loose = dict(check_dtype=False, check_categorical=False, check_index_type=False, rtol=1e-12)
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True), **loose)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(expected, actual, **loose)
+    elif isinstance(expected, str):
+        assert expected == actual
+    else:
+        assert np.isclose(expected, actual, rtol=1e-12, equal_nan=True)
+
+
+def test_view_results_cover_kpis(engines):
+    expected, actual = engines('everything')
+    assert sorted(expected) == sorted(actual) == sorted(KPIS)
+
+
+@pytest.mark.parametrize('kpi', KPIS)
+@pytest.mark.parametrize('label', SELECTIONS)
+def test_duckdb_matches_pandas(engines, label, kpi):
+    expected, actual = engines(label)
+    assert_same_result(expected[kpi], actual[kpi])
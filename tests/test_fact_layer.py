@@ -0,0 +1,69 @@
+import pytest
+
+from telecom_cache import derive_subscribers
+from telecom_cleaning import clean_data, load_raw_data
+from telecom_model import denormalize_billing, denormalize_tickets
+from telecom_schema import apply_schema_all
+from tests.conftest import DATA_DIR
+
+SUBSETS = {
+    'all': lambda subs: subs,
+    'Dubai': lambda subs: subs[subs['city'] == 'Dubai'],
+    'Postpaid active': lambda subs: subs[(subs['plan_type'] == 'Postpaid') & (subs['status'] == 'Active')],
+}
+
+
+@pytest.fixture(scope='module')
+def tables():
+    """Cleaned tables before the fact layer: subscribers with tenure and tier,
+    billing and tickets without subscriber attributes
+    """
+    subscribers, usage, billing, tickets, outages = apply_schema_all(clean_data(*load_raw_data(DATA_DIR, 'csv')))
+    return derive_subscribers(subscribers), billing, tickets
+
+
+@pytest.fixture(scope='module')
+def billing_facts(tables):
+    subscribers, billing, _ = tables
+    return denormalize_billing(billing, subscribers)
+
+
+@pytest.fixture(params=list(SUBSETS), scope='module')
+def subset(request, tables, billing_facts):
+    """(subscribers, their bills, their billing facts) for one subscriber subset"""
+    subscribers, billing, _ = tables
+    subs = SUBSETS[request.param](subscribers)
+    return (subs, billing[billing['subscriber_id'].isin(subs['subscriber_id'])],
+            billing_facts[billing_facts['subscriber_id'].isin(subs['subscriber_id'])])
+
+
+def test_revenue_by_plan_type(subset):
+    subs, billing, facts = subset
+    expected = billing.merge(subs[['subscriber_id', 'plan_type']], on='subscriber_id')
+    assert expected.groupby('plan_type', observed=True)['bill_amount'].sum().equals(
+        facts.groupby('plan_type', observed=True)['bill_amount'].sum())
+
+
+def test_revenue_by_city(subset):
+    subs, billing, facts = subset
+    expected = billing.merge(subs[['subscriber_id', 'city']], on='subscriber_id')
+    assert expected.groupby('city', observed=True)['bill_amount'].sum().equals(
+        facts.groupby('city', observed=True)['bill_amount'].sum())
+
+
+def test_postpaid_revenue(subset):
+    subs, billing, facts = subset
+    expected = billing.merge(subs[subs['plan_type'] == 'Postpaid'][['subscriber_id']], on='subscriber_id')
+    assert expected['bill_amount'].sum() == facts.loc[facts['plan_type'] == 'Postpaid', 'bill_amount'].sum()
+
+
+def test_overdue_by_city(subset):
+    subs, billing, facts = subset
+    overdue = billing[billing['payment_status'] == 'Overdue'].merge(subs[['subscriber_id', 'city']], on='subscriber_id')
+    assert overdue.groupby('city', observed=True)['bill_amount'].sum().equals(
+        facts[facts['payment_status'] == 'Overdue'].groupby('city', observed=True)['bill_amount'].sum())
+
+
+def test_ticket_join_keeps_rows(tables):
+    subscribers, _, tickets = tables
+    assert len(denormalize_tickets(tickets, subscribers)) == len(tickets)
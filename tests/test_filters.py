@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from telecom_filters import build_filter_index, filter_rows
+
+# (cleaned table position, filter columns, date column) per index, as in telecom_views.FILTER_INDEXES
+INDEXES = {
+    'subscribers': (0, ['city', 'plan_type', 'plan_name', 'status'], None),
+    'billing': (2, ['city', 'plan_type', 'plan_name', 'status'], 'billing_month'),
+    'tickets': (3, ['city', 'plan_type', 'ticket_category'], 'ticket_date'),
+    'outages': (4, ['city'], 'outage_date'),
+}
+TRIALS = 20
+
+
+def random_selection(rng, df, columns, date_column):
+    """Random value lists per filter column, and a date range when the index has one"""
+    selections = {}
+    for col in columns:
+        values = df[col].dropna().unique()
+        selections[col] = list(rng.choice(values, size=rng.integers(1, len(values) + 1), replace=False))
+    start = end = None
+    if date_column is not None:
+        dates = df[date_column].dropna().sort_values()
+        start, end = dates.iloc[rng.integers(len(dates) // 2)], dates.iloc[rng.integers(len(dates) // 2, len(dates))]
+    return selections, start, end
+
+
+@pytest.mark.parametrize('name', list(INDEXES))
+def test_filter_index_matches_isin(cleaned, name):
+    position, columns, date_column = INDEXES[name]
+    df = cleaned[position]
+    index = build_filter_index(df, columns, date_column)
+    rng = np.random.default_rng(0)
+    for _ in range(TRIALS):
+        selections, start, end = random_selection(rng, df, columns, date_column)
+        mask = np.ones(len(df), dtype=bool)
+        for col, values in selections.items():
+            mask &= df[col].isin(values).to_numpy()
+        if date_column is not None:
+            mask &= ((df[date_column] >= start) & (df[date_column] <= end)).to_numpy()
+        actual = filter_rows(index, start, end, **selections).index
+        assert df.index[mask].sort_values().equals(actual.sort_values()), selections
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from telecom_config import OUTAGE_TICKET_WINDOW_HOURS
+from telecom_outages import attribute_tickets, outage_windows
+
+# the configured window, and tickets raised while the outage lasted
+WINDOW_HOURS = [OUTAGE_TICKET_WINDOW_HOURS, 0]
+
+
+def naive_attribution(tickets, outages, window_hours):
+    """attribute_tickets by brute force over every ticket/outage pair"""
+    windows = outage_windows(outages, window_hours)
+    result = pd.Series(pd.NA, index=tickets.index, dtype='Int64')
+    for pos in range(len(tickets)):
+        ticket = tickets.iloc[pos]
+        same_zone = ((outages['city'].astype(str) == str(ticket['city']))
+                     & (outages['zone'].astype(str) == str(ticket['zone'])))
+        covering = (same_zone & (windows['window_start'] <= ticket['ticket_date'])
+                    & (ticket['ticket_date'] <= windows['window_end']))
+        if covering.any():
+            # the covering outage whose window ends last
+            result.iloc[pos] = outages.loc[windows.loc[covering, 'window_end'].idxmax(), 'outage_id']
+    return result
+
+
+@pytest.fixture(scope='module', params=WINDOW_HOURS)
+def attributions(request, cleaned):
+    """(fast, brute-force) attribution of a sample of tickets, and the outage windows by id"""
+    _, _, _, tickets, outages = cleaned
+    sample = tickets.sample(min(2000, len(tickets)), random_state=0)
+    windows = outage_windows(outages, request.param).set_axis(outages['outage_id'])
+    return (attribute_tickets(sample, outages, request.param), naive_attribution(sample, outages, request.param),
+            windows)
+
+
+def test_same_tickets_linked(attributions):
+    fast, slow, _ = attributions
+    pd.testing.assert_series_equal(fast.notna(), slow.notna())
+
+
+def test_linked_to_outage_with_last_window_end(attributions):
+    # several outages can cover a ticket with the same window end; any of them is right
+    fast, slow, windows = attributions
+    both = fast.notna() & slow.notna()
+    fast_end = windows['window_end'].reindex(fast[both].astype('int64')).to_numpy()
+    slow_end = windows['window_end'].reindex(slow[both].astype('int64')).to_numpy()
+    assert (fast_end == slow_end).all()
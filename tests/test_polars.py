@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from telecom_cleaning import clean_data, load_raw_data
+from telecom_polars import polars_clean
+from telecom_storage import TABLES
+from tests.conftest import DATA_DIR
+
+pytest.importorskip('polars')
+
+
+@pytest.fixture(scope='module')
+def cleaners():
+    """Every table from the pandas and the Polars cleaner, by name"""
+    expected = dict(zip(TABLES, clean_data(*load_raw_data(DATA_DIR, 'csv'))))
+    return expected, polars_clean(TABLES, DATA_DIR, 'csv')
+
+
+@pytest.mark.parametrize('name', TABLES)
+def test_polars_matches_pandas(cleaners, name):
+    expected, actual = cleaners
+    pd.testing.assert_frame_equal(actual[name], expected[name], check_exact=True)
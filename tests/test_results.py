@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import telecom_results
+from telecom_results import (cached_result, clear_results, data_fingerprint, estimate_bytes, filter_key,
+                             result_cache_stats)
+
+FRAME = pd.DataFrame({'value': np.arange(125_000, dtype='float64')})  # ~1 MB
+# room for two results of FRAME's size, not three
+BUDGET_MB = 2.5 * estimate_bytes(FRAME) / 1e6
+
+KEY_A = filter_key('Executive View', '2025-09-07', '2026-01-04', city=['Dubai', 'Ajman'])
+KEY_B = filter_key('Executive View', '2025-10-01', '2026-01-04', city=['Dubai'])
+KEY_C = filter_key('Manager View', '2025-10-01', '2026-01-04', city=['Dubai'])
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_results()
+    yield
+    clear_results()
+
+
+def counted(calls):
+    """compute for cached_result, appending to calls each time it runs"""
+    return lambda: calls.append(1) or FRAME.copy()
+
+
+def test_equivalent_selections_share_key():
+    assert KEY_A == filter_key('Executive View', pd.Timestamp('2025-09-07'), '2026-01-04', city=['Ajman', 'Dubai'])
+
+
+def test_repeated_selection_is_a_hit():
+    calls = []
+    cached_result(KEY_A, 'v1', counted(calls), BUDGET_MB)
+    _, hit = cached_result(KEY_A, 'v1', counted(calls), BUDGET_MB)
+    assert hit and len(calls) == 1
+
+
+def test_evicts_least_recently_used():
+    for key in [KEY_A, KEY_B, KEY_A, KEY_C]:
+        cached_result(key, 'v1', counted([]), BUDGET_MB)
+    assert KEY_B not in telecom_results._entries and KEY_A in telecom_results._entries
+    assert result_cache_stats()['evictions'] == 1
+
+
+def test_stays_within_budget():
+    for key in [KEY_A, KEY_B, KEY_C]:
+        cached_result(key, 'v1', counted([]), BUDGET_MB)
+    assert telecom_results._state['bytes'] <= BUDGET_MB * 1e6
+
+
+def test_data_fingerprint_follows_contents():
+    fingerprint = data_fingerprint({'a': FRAME})
+    assert fingerprint == data_fingerprint({'a': FRAME.copy()})
+    assert fingerprint != data_fingerprint({'a': FRAME + 1})
+
+
+def test_version_change_invalidates():
+    cached_result(KEY_A, 'v1', counted([]), BUDGET_MB)
+    cached_result(KEY_B, 'v1', counted([]), BUDGET_MB)
+    _, hit = cached_result(KEY_A, 'v2', counted([]), BUDGET_MB)
+    assert not hit and result_cache_stats()['entries'] == 1
+    assert result_cache_stats()['invalidations'] == 1
+
+
+def test_oversized_result_not_stored():
+    cached_result(KEY_B, 'v1', lambda: pd.concat([FRAME] * 3), BUDGET_MB)
+    assert KEY_B not in telecom_results._entries and result_cache_stats()['oversized'] == 1
@@ -0,0 +1,49 @@
+import re
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from telecom_cubes import USAGE_DAILY_KEYS, build_usage_daily
+from telecom_storage import read_table
+from telecom_streaming import stream_clean
+from tests.conftest import DATA_DIR
+
+pytest.importorskip('pyarrow')
+
+CHUNK_SIZE = 10000
+# peak memory wobbles by a few MB between runs, but must not follow the input
+# (merging all spilled rollups at once grew it by ~50 MB between these sizes)
+RSS_MARGIN_MB = 20
+
+
+def test_usage_daily_matches_in_memory_rollup(tmp_path):
+    out_dir = str(tmp_path / 'cleaned')
+    stream_clean(DATA_DIR, out_dir, 'csv', chunk_size=CHUNK_SIZE)
+    expected = build_usage_daily(read_table('usage_records', out_dir, 'parquet'))
+    actual = read_table('usage_daily', out_dir, 'parquet').sort_values(USAGE_DAILY_KEYS, ignore_index=True)
+    pd.testing.assert_frame_equal(actual, expected.sort_values(USAGE_DAILY_KEYS, ignore_index=True))
+
+
+def run_script(*args):
+    result = subprocess.run([sys.executable, *args], cwd=DATA_DIR, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def stream_peak_mb(tmp_path, usage_rows):
+    """Peak memory of a telecom_streaming run over generated data with usage_rows usage records"""
+    data_dir, out_dir = str(tmp_path / f'data-{usage_rows}'), str(tmp_path / f'cleaned-{usage_rows}')
+    run_script('telecom_data_gen.py', '--subscribers', '1000', '--usage', str(usage_rows), '--billing', '3000',
+               '--tickets', '1000', '--outages', '50', '--workers', '1', '--output-dir', data_dir)
+    output = run_script('telecom_streaming.py', '--data-dir', data_dir, '--out-dir', out_dir,
+                        '--chunk-size', str(CHUNK_SIZE))
+    match = re.search(r'peak memory ([\d,]+) MB', output)
+    if match is None:
+        pytest.skip('peak memory is not reported on this platform')
+    return int(match.group(1).replace(',', ''))
+
+
+def test_peak_memory_flat_as_chunks_grow(tmp_path):
+    small, large = stream_peak_mb(tmp_path, 2 * CHUNK_SIZE), stream_peak_mb(tmp_path, 32 * CHUNK_SIZE)
+    assert large <= small + RSS_MARGIN_MB